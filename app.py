@@ -1,10 +1,12 @@
 from flask import Flask, render_template, jsonify
 from flask_cors import CORS
 from config import Config
+from services.serialization import FastJSONProvider
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
     
     # Enable CORS
     CORS(app)
@@ -16,6 +18,15 @@ def create_app(config_class=Config):
     from routes.main import main_bp
     app.register_blueprint(main_bp)
     
+    # Register CLI commands
+    from commands import register_commands
+    register_commands(app)
+    
+    # Keep hot analytics entries warm (one lease holder across workers)
+    if config_class.CACHE_PREWARM_ENABLED:
+        from routes.api import cache_prewarmer
+        cache_prewarmer.start()
+    
     return app
 
 app = create_app()
@@ -0,0 +1,124 @@
+"""Cold-start benchmark for the valuation model.
+
+Starts fresh interpreter processes and measures app startup, the first
+valuation and resident memory, once with a model published to the
+registry and once with the in-process training fallback.
+
+    python -m benchmarks.bench_cold_start [--sold 5000] [--uri mongodb://...]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SAMPLE_PROPERTY = {
+    'city': 'toronto',
+    'property_type': 'house',
+    'square_feet': 2000,
+    'bedrooms': 3,
+    'bathrooms': 2,
+    'lot_size': 5000,
+    'year_built': 1990
+}
+
+def seed_sold_properties(db, count: int) -> None:
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    docs = []
+    for i in range(count):
+        square_feet = rng.randint(700, 4000)
+        sold = now - timedelta(days=rng.randint(1, 720))
+        docs.append({
+            'address': f'{i} Cold Start Rd',
+            'city': 'toronto',
+            'property_type': rng.choice(['house', 'condo', 'townhouse']),
+            'price': square_feet * rng.uniform(400, 900),
+            'square_feet': square_feet,
+            'bedrooms': rng.randint(1, 6),
+            'bathrooms': rng.randint(1, 4),
+            'lot_size': rng.randint(0, 9000),
+            'year_built': rng.randint(1920, 2023),
+            'listed_date': sold - timedelta(days=rng.randint(5, 90)),
+            'sold_date': sold
+        })
+    if docs:
+        db.properties.insert_many(docs)
+
+def rss_mb() -> float:
+    """Current resident set size in MB"""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+def run_child(args) -> None:
+    from benchmarks.common import use_database
+
+    db = use_database(args.uri)
+    seed_sold_properties(db, args.sold)
+    baseline_rss = rss_mb()
+
+    start = time.perf_counter()
+    from app import create_app
+    create_app()
+    from routes.api import valuation_service
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    valuation_service.get_valuation(dict(SAMPLE_PROPERTY))
+    first_valuation_ms = (time.perf_counter() - start) * 1000
+
+    if args.publish:
+        valuation_service.train_and_publish()
+
+    print(json.dumps({
+        'startup_ms': round(startup_ms, 1),
+        'first_valuation_ms': round(first_valuation_ms, 1),
+        'model_version': valuation_service.model_version,
+        'rss_delta_mb': round(rss_mb() - baseline_rss, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }))
+
+def spawn(args, registry_dir: str, publish: bool = False) -> dict:
+    command = [
+        sys.executable, '-m', 'benchmarks.bench_cold_start', '--child',
+        '--sold', str(args.sold)
+    ]
+    if args.uri:
+        command += ['--uri', args.uri]
+    if publish:
+        command.append('--publish')
+
+    env = dict(os.environ, MODEL_REGISTRY_DIR=registry_dir)
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uri', help='MongoDB URI (default: in-memory mongomock)')
+    parser.add_argument('--sold', type=int, default=5000, help='Sold properties to seed')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--publish', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    with tempfile.TemporaryDirectory() as registry_dir:
+        results = {'train on first use': spawn(args, registry_dir, publish=True)}
+        results['registry (mmap)'] = spawn(args, registry_dir)
+
+    print(f"{'mode':<20} {'startup ms':>11} {'1st valuation ms':>17} {'rss delta MB':>13} {'peak rss MB':>12}")
+    for mode, r in results.items():
+        print(f"{mode:<20} {r['startup_ms']:>11} {r['first_valuation_ms']:>17} "
+              f"{r['rss_delta_mb']:>13} {r['peak_rss_mb']:>12}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
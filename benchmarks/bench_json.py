@@ -0,0 +1,62 @@
+"""Microbenchmark: response encoding with Flask's default provider vs. FastJSONProvider.
+
+Encodes the largest API payloads (a daily market forecast, the
+neighborhood analysis for a city and a full search page of raw property
+documents) from a seeded synthetic market with both providers.
+
+    python -m benchmarks.bench_json [--listings 10000] [--repeat 50]
+"""
+import argparse
+import sys
+import tempfile
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from benchmarks.common import percentiles, time_calls, use_database
+from benchmarks.generator import MarketGenerator
+from services.serialization import FastJSONProvider, orjson
+
+def build_payloads(db, generator: MarketGenerator):
+    from models.market_predictor import MarketPredictor
+    from services.analytics_service import AnalyticsService
+    from services.property_service import PropertyService
+
+    city = generator.cities[0]
+    return {
+        'predict_market[daily, 24m]': MarketPredictor().predict_market(city, 24, 'daily'),
+        'neighborhood_analysis': AnalyticsService().get_neighborhood_analysis(city),
+        'search_properties_page[100]': PropertyService().search_properties_page(city, limit=100)
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from config import Config
+    Config.MODEL_REGISTRY_DIR = tempfile.mkdtemp(prefix='bench-registry-')
+
+    db = use_database()
+    generator = MarketGenerator(seed=args.seed)
+    generator.populate(db, args.listings)
+    payloads = build_payloads(db, generator)
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    print(f"serializer: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'payload':<30} {'KB':>8} {'default p50 ms':>15} {'fast p50 ms':>12} {'speedup':>8}")
+    for name, payload in payloads.items():
+        size = len(fast.dumps(payload).encode()) / 1024
+        default_ms = percentiles(time_calls(lambda: default.dumps(payload), args.repeat))['p50']
+        fast_ms = percentiles(time_calls(lambda: fast.dumps(payload), args.repeat))['p50']
+        print(
+            f"{name:<30} {size:>8.1f} {default_ms:>15} {fast_ms:>12} "
+            f"{default_ms / fast_ms if fast_ms else float('inf'):>7.1f}x"
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Benchmark: per-request vs. micro-batched ValuationModel inference.
+
+Drives ``predict`` from N concurrent client threads and reports throughput
+and latency for the original one-row path (DataFrame, scaler, forest per
+call) and for the MicroBatcher at each max wait.
+
+    python -m benchmarks.bench_microbatch [--concurrency 1,4,16,64] [--max-wait 0,2,5]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.common import percentiles
+from models.batching import MicroBatcher
+from models.valuation import ValuationModel, FEATURES
+
+def random_rows(rng, n) -> np.ndarray:
+    return np.column_stack([
+        rng.normal(2000, 500, n),        # square_feet
+        rng.integers(1, 6, n),           # bedrooms
+        rng.integers(1, 4, n),           # bathrooms
+        rng.integers(1950, 2024, n),     # year_built
+        rng.normal(5000, 1000, n)        # lot_size
+    ]).astype(float)
+
+def per_request(model: ValuationModel):
+    """The original predict path: a one-row DataFrame per call"""
+    def predict(row):
+        features_df = pd.DataFrame([dict(zip(FEATURES, row))])
+        return model.model.predict(model.scaler.transform(features_df))[0]
+    return predict
+
+def drive(predict, rows: np.ndarray, concurrency: int):
+    """Run every row through ``predict`` from ``concurrency`` threads"""
+    latencies = [[] for _ in range(concurrency)]
+
+    def client(i):
+        for row in rows[i::concurrency]:
+            start = time.perf_counter()
+            predict(row)
+            latencies[i].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(rows) / elapsed, percentiles([l for per_client in latencies for l in per_client])
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,4,16,64', help='Comma-separated client thread counts')
+    parser.add_argument('--max-wait', default='0,2,5', help='Comma-separated batcher max waits (ms)')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000, help='Predictions per run')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='bench-valuation-') as model_dir:
+        model = ValuationModel(model_dir=model_dir)
+    rows = random_rows(np.random.default_rng(0), args.requests)
+
+    print(f"{'path':<26} {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'batch':>6}")
+    for concurrency in [int(c) for c in args.concurrency.split(',')]:
+        # The per-request path is slow; a slice is enough to measure it
+        throughput, latency = drive(per_request(model), rows[:max(200, concurrency * 10)], concurrency)
+        print(
+            f"{'per-request':<26} {concurrency:>7} {throughput:>9.0f} "
+            f"{latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} {1:>6}"
+        )
+        for max_wait in [float(w) for w in args.max_wait.split(',')]:
+            batcher = MicroBatcher(model.predict_values, max_batch_size=args.max_batch, max_wait_ms=max_wait)
+            throughput, latency = drive(batcher.predict, rows, concurrency)
+            print(
+                f"{f'batched (wait {max_wait:g} ms)':<26} {concurrency:>7} {throughput:>9.0f} "
+                f"{latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} "
+                f"{batcher.stats()['avg_batch_size']:>6}"
+            )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
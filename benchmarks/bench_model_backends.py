@@ -0,0 +1,109 @@
+"""Benchmark: valuation model backends on the same training data.
+
+Trains every backend in models.backends on the sold listings of a seeded
+synthetic market, then reports the artifact size and load time as the
+registry stores them, single-row and batch predict latency, and accuracy
+on a held-out split against the current forest.
+
+    python -m benchmarks.bench_model_backends [--listings 50000] [--backends forest,hist_gb]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+from benchmarks.common import percentiles, time_calls
+from benchmarks.generator import MarketGenerator
+from models.backends import MODEL_BACKENDS, create_model
+from services.valuation_service import FEATURE_NAMES
+
+def training_data(listings: int, seed: int):
+    """Feature matrix (FEATURE_NAMES order) and prices of the sold listings"""
+    rows, prices = [], []
+    for batch in MarketGenerator(seed=seed).listings(listings):
+        for doc in batch:
+            if 'sold_date' in doc:
+                rows.append([float(doc[name]) for name in FEATURE_NAMES])
+                prices.append(doc['price'])
+    return np.array(rows), np.array(prices)
+
+def measure(backend: str, X_train, y_train, X_test, y_test, repeat: int):
+    model = create_model(backend)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix='bench-backend-') as tmp:
+        # Uncompressed and memory-mapped, as ModelRegistry publishes and loads
+        path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, path)
+        size_kb = os.path.getsize(path) / 1024
+        load = percentiles(time_calls(lambda: joblib.load(path, mmap_mode='r'), max(3, repeat // 20)))
+
+    rows = iter(np.resize(np.arange(len(X_test)), repeat))
+    single = percentiles(time_calls(lambda: model.predict(X_test[next(rows)].reshape(1, -1)), repeat))
+
+    start = time.perf_counter()
+    predicted = model.predict(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'backend': backend,
+        'fit_s': round(fit_seconds, 2),
+        'size_kb': round(size_kb, 1),
+        'load_ms': load['p50'],
+        'predict_p50_ms': single['p50'],
+        'predict_p99_ms': single['p99'],
+        'batch_rows_per_s': round(len(X_test) / batch_seconds),
+        'mae': round(float(mean_absolute_error(y_test, predicted))),
+        'mape_pct': round(float(mean_absolute_percentage_error(y_test, predicted)) * 100, 2),
+        'r2': round(float(r2_score(y_test, predicted)), 4)
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=50_000, help='Synthetic listings to draw sold rows from')
+    parser.add_argument('--backends', default=','.join(MODEL_BACKENDS), help='Comma-separated backend names')
+    parser.add_argument('--test-fraction', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=200, help='Single-row predictions to time')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    X, y = training_data(args.listings, args.seed)
+    order = np.random.default_rng(args.seed).permutation(len(X))
+    split = int(len(X) * (1 - args.test_fraction))
+    train, test = order[:split], order[split:]
+
+    results = [
+        measure(backend, X[train], y[train], X[test], y[test], args.repeat)
+        for backend in args.backends.split(',')
+    ]
+    baseline = next((r for r in results if r['backend'] == 'forest'), results[0])
+    for result in results:
+        result['size_vs_baseline'] = round(result['size_kb'] / baseline['size_kb'], 3)
+        result['mae_vs_baseline_pct'] = round((result['mae'] / baseline['mae'] - 1) * 100, 1)
+
+    if args.json:
+        print(json.dumps({'train_rows': len(train), 'test_rows': len(test), 'results': results}, indent=2))
+        return 0
+
+    print(f"{len(train)} training rows, {len(test)} held out; baseline: {baseline['backend']}")
+    print(
+        f"{'backend':<15} {'fit s':>7} {'size KB':>10} {'x size':>7} {'load ms':>8} "
+        f"{'p50 ms':>7} {'p99 ms':>7} {'batch r/s':>10} {'MAE':>9} {'MAE +%':>7} {'MAPE %':>7} {'R2':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['backend']:<15} {r['fit_s']:>7} {r['size_kb']:>10} {r['size_vs_baseline']:>7} {r['load_ms']:>8} "
+            f"{r['predict_p50_ms']:>7} {r['predict_p99_ms']:>7} {r['batch_rows_per_s']:>10} "
+            f"{r['mae']:>9} {r['mae_vs_baseline_pct']:>7} {r['mape_pct']:>7} {r['r2']:>7}"
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Query-count regression benchmark for AnalyticsService.get_neighborhood_analysis.
+
+Seeds cities with a growing number of neighborhoods and checks that the
+number of database round trips per call stays constant.
+
+    python -m benchmarks.bench_neighborhood_analysis [--uri mongodb://...]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from benchmarks.common import QueryCounter, percentiles, time_calls, use_database
+
+def seed_neighborhoods(db, city: str, neighborhoods: int, sales_per_neighborhood: int = 6) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    docs = []
+    for n in range(neighborhoods):
+        for i in range(sales_per_neighborhood):
+            sold = now - timedelta(days=rng.randint(1, 360))
+            docs.append({
+                'address': f'{i} Bench St',
+                'city': city,
+                'neighborhood': f'Neighborhood {n}',
+                'price': rng.randint(500000, 1500000),
+                'square_feet': rng.randint(800, 3000),
+                'listed_date': sold - timedelta(days=rng.randint(5, 60)),
+                'sold_date': sold
+            })
+    db.properties.insert_many(docs)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uri', help='MongoDB URI (default: in-memory mongomock)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 140])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    counter = QueryCounter()
+    db = use_database(args.uri, counter)
+
+    from services.analytics_service import AnalyticsService
+    service = AnalyticsService()
+
+    query_counts = {}
+    print(f"{'neighborhoods':>14} {'queries':>8} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in args.sizes:
+        city = f'bench-city-{size}'
+        seed_neighborhoods(db, city, size)
+
+        counter.reset()
+        service.get_neighborhood_analysis(city)
+        query_counts[size] = counter.total
+
+        stats = percentiles(time_calls(lambda: service.get_neighborhood_analysis(city), args.repeat))
+        print(f"{size:>14} {query_counts[size]:>8} {stats['p50']:>10} {stats['p95']:>10}")
+
+    if len(set(query_counts.values())) != 1:
+        print('FAIL: query count grows with neighborhood count', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
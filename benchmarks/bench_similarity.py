@@ -0,0 +1,80 @@
+"""Microbenchmark: vectorized comparable scoring vs. the per-pair path.
+
+The reference functions reproduce the original ValuationService scoring,
+which re-extracted features and looped over them in Python for every pair.
+
+    python -m benchmarks.bench_similarity [--subjects 1000] [--comparables 3]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from services.similarity import similarity_scores, confidence_scores
+
+def reference_similarity(features1, features2) -> float:
+    distance = np.sqrt(sum((f1 - f2) ** 2 for f1, f2 in zip(features1, features2)))
+    max_distance = np.sqrt(sum(max(f1, f2) ** 2 for f1, f2 in zip(features1, features2)))
+    similarity = (1 - distance / max_distance) * 100
+    return round(similarity, 2)
+
+def reference_confidence(prices, similarities) -> float:
+    if not prices:
+        return 70.0
+    price_variance = np.std(prices) / np.mean(prices)
+    avg_similarity = np.mean(similarities)
+    confidence = 95 - (price_variance * 100) + (avg_similarity / 10)
+    return round(min(max(confidence, 70), 95), 2)
+
+def random_features(rng, shape) -> np.ndarray:
+    return np.stack([
+        rng.uniform(600, 4000, shape),    # square_feet
+        rng.integers(1, 6, shape),        # bedrooms
+        rng.integers(1, 4, shape),        # bathrooms
+        rng.uniform(0, 9000, shape),      # lot_size
+        rng.integers(1920, 2024, shape)   # year_built
+    ], axis=-1).astype(float)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subjects', type=int, default=1000)
+    parser.add_argument('--comparables', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    subjects = random_features(rng, (args.subjects,))
+    comparables = random_features(rng, (args.subjects, args.comparables))
+    prices = rng.uniform(400000, 2000000, (args.subjects, args.comparables))
+
+    def per_pair():
+        results = []
+        for subject, comps, comp_prices in zip(subjects.tolist(), comparables.tolist(), prices.tolist()):
+            sims = [reference_similarity(subject, c) for c in comps]
+            results.append(reference_confidence(comp_prices, sims))
+        return results
+
+    def vectorized():
+        sims = similarity_scores(subjects[:, np.newaxis, :], comparables)
+        return confidence_scores(prices, sims)
+
+    timings = {}
+    for name, fn in [('per-pair', per_pair), ('vectorized', vectorized)]:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best * 1000, np.asarray(result))
+
+    pairs = args.subjects * args.comparables
+    print(f"{'path':<12} {'best ms':>10} {'pairs/s':>14}")
+    for name, (ms, _) in timings.items():
+        print(f"{name:<12} {ms:>10.2f} {pairs / (ms / 1000):>14,.0f}")
+    print(f"speedup: {timings['per-pair'][0] / timings['vectorized'][0]:.1f}x")
+
+    max_diff = np.max(np.abs(timings['per-pair'][1] - timings['vectorized'][1]))
+    print(f"max confidence difference: {max_diff:.4f}")
+    return 0 if max_diff <= 0.01 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
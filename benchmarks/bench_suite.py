@@ -0,0 +1,211 @@
+"""Benchmark suite over the public service methods.
+
+Seeds a deterministic synthetic market at the chosen scale, then runs every
+public method of MarketAnalysis, AnalyticsService, ValuationService,
+PropertyService and InvestmentAdvisor. Each case reports latency
+percentiles, database round trips and peak Python memory for one call, and
+is compared against a stored baseline for the same backend and scale.
+
+    python -m benchmarks.bench_suite --scale 10k [--uri mongodb://...]
+    python -m benchmarks.bench_suite --scale 10k --save-baseline
+    python -m benchmarks.bench_suite --scale 100k --only valuation
+
+Exits non-zero when a case regresses past the tolerance.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.common import QueryCounter, percentiles, time_calls, use_database
+from benchmarks.generator import MarketGenerator, SCALES
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# A case regresses when it is this much slower (and at least MIN_SLOWDOWN_MS)
+# or uses this much more memory than its baseline, or issues more queries
+DEFAULT_TOLERANCE = 0.25
+MIN_SLOWDOWN_MS = 2.0
+
+Case = Tuple[str, Callable[[], Any], int]
+
+def build_cases(db: Any, generator: MarketGenerator, repeat: int) -> List[Case]:
+    """(name, call, repeat) for every public service method"""
+    from services.market_analysis import MarketAnalysis
+    from services.analytics_service import AnalyticsService
+    from services.valuation_service import ValuationService
+    from services.property_service import PropertyService
+    from models.investment_advisor import InvestmentAdvisor
+
+    market_analysis = MarketAnalysis()
+    analytics = AnalyticsService()
+    valuation = ValuationService()
+    properties = PropertyService()
+    advisor = InvestmentAdvisor()
+
+    city = generator.cities[0]
+    neighborhood = generator.neighborhoods(city)[0]
+    sample = db.properties.find_one({'city': city, 'property_type': 'house'})
+    subject = {k: sample[k] for k in (
+        'city', 'property_type', 'square_feet', 'bedrooms', 'bathrooms', 'lot_size', 'year_built'
+    )}
+    subjects = [
+        {k: p[k] for k in subject}
+        for p in db.properties.find({'city': city}).limit(100)
+    ]
+    second_page = properties.search_properties_page(city, limit=50)['next_cursor']
+
+    def add_and_remove():
+        result = properties.add_property({
+            'address': 'Benchmark Scratch Rd',
+            'city': city,
+            'price': 750000,
+            'property_type': 'condo'
+        })
+        db.properties.delete_one({'address': 'Benchmark Scratch Rd'})
+        return result
+
+    return [
+        ('market_analysis.get_market_overview', market_analysis.get_market_overview, repeat),
+        ('market_analysis.refresh_rollups', market_analysis.refresh_rollups, repeat),
+        ('analytics.get_market_trends', lambda: analytics.get_market_trends(city, '1y'), repeat),
+        ('analytics.get_neighborhood_analysis', lambda: analytics.get_neighborhood_analysis(city), repeat),
+        ('analytics.get_neighborhood_analysis[one]',
+         lambda: analytics.get_neighborhood_analysis(city, neighborhood), repeat),
+        ('analytics.get_investment_opportunities',
+         lambda: analytics.get_investment_opportunities(city, 1500000, min_roi=0), repeat),
+        ('valuation.get_valuation', lambda: valuation.get_valuation(dict(subject)), repeat),
+        ('valuation.get_valuations[100]', lambda: valuation.get_valuations([dict(s) for s in subjects]), repeat),
+        ('valuation.train_and_publish', valuation.train_and_publish, 1),
+        ('property.search_properties', lambda: properties.search_properties(city), repeat),
+        ('property.search_properties_page[2]',
+         lambda: properties.search_properties_page(city, limit=50, cursor=second_page), repeat),
+        ('property.export_properties',
+         lambda: sum(1 for _ in properties.export_properties(city, fields=['price'])), 1),
+        ('property.export_ndjson',
+         lambda: sum(len(chunk) for chunk in properties.export_ndjson(city)), 1),
+        ('property.get_property_details', lambda: properties.get_property_details(sample['_id']), repeat),
+        ('property.add_property', add_and_remove, repeat),
+        ('investment_advisor.get_investment_recommendations',
+         lambda: advisor.get_investment_recommendations(1000000, 'moderate', city, 5), repeat)
+    ]
+
+def run_case(call: Callable[[], Any], repeat: int, counter: QueryCounter) -> Dict[str, Any]:
+    """Measure one call for queries and peak memory, then time ``repeat`` calls"""
+    counter.reset()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queries = counter.total
+
+    latencies = time_calls(call, repeat)
+    return {
+        **percentiles(latencies),
+        'queries': queries,
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+def baseline_path(backend: str, scale: str) -> str:
+    return os.path.join(BASELINE_DIR, f'{backend}-{scale}.json')
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def compare(result: Dict[str, Any], base: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Reasons a case regressed against its baseline (empty when it did not)"""
+    if base is None:
+        return []
+    reasons = []
+    if result['queries'] > base['queries']:
+        reasons.append(f"queries {base['queries']} -> {result['queries']}")
+    slowdown = result['p50'] - base['p50']
+    if slowdown > MIN_SLOWDOWN_MS and result['p50'] > base['p50'] * (1 + tolerance):
+        reasons.append(f"p50 {base['p50']} -> {result['p50']} ms")
+    if result['peak_kb'] > base['peak_kb'] * (1 + tolerance) + 64:
+        reasons.append(f"peak {base['peak_kb']} -> {result['peak_kb']} KB")
+    return reasons
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uri', help='MongoDB URI (default: in-memory mongomock)')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='Run only cases whose name contains this text')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--baseline', help='Baseline file (default: benchmarks/baselines/<backend>-<scale>.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    # Keep published benchmark models out of the real registry
+    from config import Config
+    Config.MODEL_REGISTRY_DIR = tempfile.mkdtemp(prefix='bench-registry-')
+
+    counter = QueryCounter()
+    db = use_database(args.uri, counter)
+    backend = 'mongodb' if args.uri else 'mongomock'
+
+    generator = MarketGenerator(seed=args.seed)
+    start = time.perf_counter()
+    counts = generator.populate(db, SCALES[args.scale])
+    # Seeded listings bypass the services, so build their market series up front
+    from services.market_series import MarketSeries
+    series = MarketSeries()
+    for city in generator.cities:
+        series.rebuild(city)
+    if args.uri:
+        from database.indexes import ensure_indexes
+        ensure_indexes(db)
+    print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s ({backend}, scale {args.scale})")
+
+    path = args.baseline or baseline_path(backend, args.scale)
+    baseline = load_baseline(path)
+    base_cases = (baseline or {}).get('cases', {})
+
+    results = {}
+    regressions = {}
+    print(f"{'case':<52} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KB':>9}")
+    for name, call, repeat in build_cases(db, generator, args.repeat):
+        if args.only and args.only not in name:
+            continue
+        result = run_case(call, repeat, counter)
+        results[name] = result
+        reasons = compare(result, base_cases.get(name), args.tolerance)
+        if reasons:
+            regressions[name] = reasons
+        flag = '  REGRESSION: ' + '; '.join(reasons) if reasons else ''
+        print(
+            f"{name:<52} {result['p50']:>9} {result['p95']:>9} {result['p99']:>9} "
+            f"{result['queries']:>8} {result['peak_kb']:>9}{flag}"
+        )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        merged = dict(base_cases, **results)
+        with open(path, 'w') as f:
+            json.dump({
+                'backend': backend,
+                'scale': args.scale,
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'cases': dict(sorted(merged.items()))
+            }, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {path}")
+    elif baseline is None:
+        print(f"No baseline at {path}; run with --save-baseline to create one")
+
+    if regressions:
+        print(f"FAIL: {len(regressions)} case(s) regressed", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
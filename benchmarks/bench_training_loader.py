@@ -0,0 +1,71 @@
+"""Benchmark: valuation training data load, materialized vs. streamed.
+
+Seeds a synthetic market and loads the sold listings the way
+ValuationService used to (every full document in a list, then a list of
+feature lists) and with the chunked TrainingDataLoader, reporting rows per
+second and peak traced memory for each.
+
+    python -m benchmarks.bench_training_loader [--listings 200000] [--uri mongodb://...]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from benchmarks.common import use_database
+from benchmarks.generator import MarketGenerator
+from services.training_data import TrainingDataLoader
+from services.valuation_service import FEATURE_DEFAULTS, ValuationService
+
+def materialized(service: ValuationService):
+    """The previous _train_model load: full documents, then Python lists"""
+    properties = list(service.properties_collection.find({'sold_date': {'$exists': True}}))
+    X = [service._prepare_features(p) for p in properties]
+    y = [p['price'] for p in properties]
+    return len(properties), (X, y)
+
+def streamed(service: ValuationService, batch_size: int, max_rows=None):
+    loader = TrainingDataLoader(service.properties_collection, FEATURE_DEFAULTS, batch_size=batch_size)
+    X, y, stats = loader.load(max_rows=max_rows)
+    return stats['scanned'], (X, y)
+
+def measure(load):
+    """Rows read per second in an untraced run and peak MB of a traced one"""
+    start = time.perf_counter()
+    rows, result = load()
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return rows, rows / elapsed, peak / 1024 / 1024
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=200_000, help='Synthetic listings to seed')
+    parser.add_argument('--uri', help='MongoDB URI (default: in-memory mongomock)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--max-rows', type=int, default=20_000, help='Sample size for the sampled run')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    db = use_database(args.uri)
+    for batch in MarketGenerator(seed=args.seed).listings(args.listings):
+        db.properties.insert_many(batch, ordered=False)
+    service = ValuationService()
+
+    runs = [
+        ('materialized', lambda: materialized(service)),
+        (f'streamed (batch {args.batch_size})', lambda: streamed(service, args.batch_size)),
+        (f'streamed, max {args.max_rows} rows', lambda: streamed(service, args.batch_size, args.max_rows))
+    ]
+    print(f"{'load':<30} {'read':>9} {'rows/s':>10} {'peak MB':>9}")
+    for name, load in runs:
+        rows, rate, peak = measure(load)
+        print(f"{name:<30} {rows:>9} {rate:>10.0f} {peak:>9.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
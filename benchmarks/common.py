@@ -0,0 +1,127 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a real MongoDB when ``--uri`` is given and against an
+in-memory mongomock database otherwise. Either way the database is installed
+as the process-wide connection returned by ``database.mongodb.get_database``,
+so services constructed afterwards use it transparently.
+"""
+import inspect
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+QUERY_METHODS = {
+    'aggregate',
+    'bulk_write',
+    'count_documents',
+    'delete_many',
+    'delete_one',
+    'distinct',
+    'estimated_document_count',
+    'find',
+    'find_one',
+    'find_one_and_update',
+    'insert_many',
+    'insert_one',
+    'replace_one',
+    'update_many',
+    'update_one'
+}
+
+class QueryCounter:
+    """Counts database round trips, overall and per collection"""
+
+    def __init__(self):
+        self.by_collection = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_collection.values())
+
+    def record(self, collection: str, method: str) -> None:
+        self.by_collection[f'{collection}.{method}'] += 1
+
+    def reset(self) -> None:
+        self.by_collection.clear()
+
+class CountingCollection:
+    """Collection proxy that records every query method call"""
+
+    def __init__(self, collection: Any, counter: QueryCounter):
+        self._collection = collection
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if name not in QUERY_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._counter.record(self._collection.name, name)
+            return attr(*args, **kwargs)
+
+        return counted
+
+    def __getitem__(self, name: str) -> Any:
+        return CountingCollection(self._collection[name], self._counter)
+
+class CountingDatabase:
+    """Database proxy handing out counting collections"""
+
+    def __init__(self, db: Any, counter: QueryCounter):
+        self._db = db
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._db, name)
+        if _is_collection(attr):
+            return CountingCollection(attr, self._counter)
+        return attr
+
+    def __getitem__(self, name: str) -> Any:
+        return CountingCollection(self._db[name], self._counter)
+
+def use_database(uri: Optional[str] = None, counter: Optional[QueryCounter] = None) -> Any:
+    """Install the benchmark database as the application's connection"""
+    import database.mongodb as mongodb
+
+    if uri:
+        from pymongo import MongoClient
+        db = MongoClient(uri).get_database()
+    else:
+        import mongomock
+        db = mongomock.MongoClient().get_database('prophetestate_bench')
+
+    if counter is not None:
+        db = CountingDatabase(db, counter)
+
+    mongodb._db = db
+    return db
+
+def time_calls(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """Run fn repeatedly and return per-call latencies in milliseconds"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies as p50/p95/p99 in milliseconds"""
+    if not latencies:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    values = np.percentile(latencies, [50, 95, 99])
+    return {
+        'p50': round(float(values[0]), 3),
+        'p95': round(float(values[1]), 3),
+        'p99': round(float(values[2]), 3)
+    }
+
+def _is_collection(attr: Any) -> bool:
+    return (
+        not inspect.ismethod(attr)
+        and hasattr(attr, 'aggregate')
+        and hasattr(attr, 'find')
+    )
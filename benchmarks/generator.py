@@ -0,0 +1,218 @@
+"""Deterministic synthetic market generator for benchmarks.
+
+Produces listings (active and sold), neighborhood amenities and monthly
+market_data for a set of cities. Everything derives from a single seed, so
+the same scale and seed always produce the same documents, and listings
+are generated in fixed-size batches so 1M-row datasets never sit in memory
+at once.
+
+    from benchmarks.generator import MarketGenerator
+    MarketGenerator(seed=42).populate(db, listings=100_000)
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000
+}
+
+# name: (latitude, longitude, base price per sqft, neighborhoods)
+CITIES = {
+    'toronto': (43.6532, -79.3832, 850.0, [
+        'Annex', 'Leslieville', 'Liberty Village', 'Yorkville', 'The Beaches',
+        'High Park', 'Danforth', 'Roncesvalles', 'Leaside', 'Etobicoke Centre'
+    ]),
+    'vancouver': (49.2827, -123.1207, 1050.0, [
+        'Kitsilano', 'Mount Pleasant', 'Yaletown', 'West End', 'Point Grey',
+        'Commercial Drive', 'Dunbar', 'Riley Park'
+    ]),
+    'ottawa': (45.4215, -75.6972, 520.0, [
+        'Glebe', 'Westboro', 'Centretown', 'Byward Market', 'Old Ottawa South',
+        'New Edinburgh', 'Hintonburg'
+    ])
+}
+
+PROPERTY_TYPES = ['house', 'condo', 'townhouse', 'semi-detached', 'detached', 'multi-family']
+PROPERTY_TYPE_WEIGHTS = [0.3, 0.3, 0.15, 0.1, 0.1, 0.05]
+# Size ranges (sqft) and price multipliers per property type
+TYPE_PROFILES = {
+    'house': (1400, 3200, 1.00),
+    'condo': (450, 1400, 1.10),
+    'townhouse': (1100, 2200, 0.95),
+    'semi-detached': (1200, 2400, 0.95),
+    'detached': (1800, 4200, 1.05),
+    'multi-family': (2400, 5200, 0.85)
+}
+
+FEATURES = ['garage', 'basement', 'pool', 'fireplace', 'balcony', 'central_air', 'ensuite_laundry']
+AMENITY_TYPES = ['school', 'park', 'transit', 'shopping', 'restaurant']
+
+HISTORY_DAYS = 3 * 365
+BLOCK_SIZE = 1000
+SOLD_FRACTION = 0.6
+
+class MarketGenerator:
+    """Seeded generator of listings, amenities and market data"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        cities: Optional[List[str]] = None,
+        now: Optional[datetime] = None
+    ):
+        self.seed = seed
+        self.cities = cities or list(CITIES)
+        # Truncate to the day so runs on the same day produce the same dates
+        now = now or datetime.utcnow()
+        self.now = datetime(now.year, now.month, now.day)
+
+    def neighborhoods(self, city: str) -> List[str]:
+        return list(CITIES[city][3])
+
+    def listings(self, count: int, batch_size: int = 10_000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield ``count`` listings in batches of at most ``batch_size``
+
+        Rows are drawn in fixed blocks, each with its own seeded stream, so
+        listing i is the same whatever the batch size or total count.
+        """
+        pending = []
+        for start in range(0, count, BLOCK_SIZE):
+            rng = np.random.default_rng([self.seed, start // BLOCK_SIZE])
+            pending.extend(self._listing_batch(rng, start, min(BLOCK_SIZE, count - start)))
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                pending = pending[batch_size:]
+        if pending:
+            yield pending
+
+    def amenities(self) -> List[Dict[str, Any]]:
+        rng = np.random.default_rng(self.seed + 1)
+        docs = []
+        for city in self.cities:
+            lat, lon = CITIES[city][:2]
+            for neighborhood in self.neighborhoods(city):
+                for amenity_type in AMENITY_TYPES:
+                    for i in range(int(rng.integers(1, 8))):
+                        docs.append({
+                            'city': city,
+                            'neighborhood': neighborhood,
+                            'type': amenity_type,
+                            'name': f'{neighborhood} {amenity_type} {i + 1}',
+                            'location': {
+                                'type': 'Point',
+                                'coordinates': [
+                                    round(lon + rng.normal(0, 0.03), 6),
+                                    round(lat + rng.normal(0, 0.02), 6)
+                                ]
+                            }
+                        })
+        return docs
+
+    def market_data(self, months: int = 36) -> List[Dict[str, Any]]:
+        """Monthly market indicators per city, oldest first"""
+        rng = np.random.default_rng(self.seed + 2)
+        docs = []
+        for city in self.cities:
+            base_price = CITIES[city][2] * 1600
+            price = base_price
+            for m in range(months, 0, -1):
+                month = _add_months(datetime(self.now.year, self.now.month, 1), -m)
+                price *= 1 + rng.normal(0.004, 0.01)
+                sales = int(rng.integers(400, 1600))
+                docs.append({
+                    'city': city,
+                    'date': month,
+                    'avg_price': round(price, 2),
+                    'median_price': round(price * rng.uniform(0.88, 0.96), 2),
+                    'sales': sales,
+                    'new_listings': int(sales * rng.uniform(1.0, 1.6)),
+                    'inventory': int(rng.normal(1000, 200)),
+                    'interest_rate': round(float(rng.normal(0.05, 0.005)), 4),
+                    'avg_days_on_market': round(float(rng.uniform(12, 45)), 1)
+                })
+        return docs
+
+    def populate(self, db: Any, listings: int, batch_size: int = 10_000) -> Dict[str, int]:
+        """Insert a full synthetic market, returning documents per collection"""
+        counts = {'properties': 0}
+        for batch in self.listings(listings, batch_size):
+            db.properties.insert_many(batch, ordered=False)
+            counts['properties'] += len(batch)
+
+        amenities = self.amenities()
+        db.amenities.insert_many(amenities, ordered=False)
+        counts['amenities'] = len(amenities)
+
+        market_data = self.market_data()
+        db.market_data.insert_many(market_data, ordered=False)
+        counts['market_data'] = len(market_data)
+        return counts
+
+    def _listing_batch(self, rng: np.random.Generator, start: int, n: int) -> List[Dict[str, Any]]:
+        city_idx = rng.integers(0, len(self.cities), n)
+        type_idx = rng.choice(len(PROPERTY_TYPES), n, p=PROPERTY_TYPE_WEIGHTS)
+        size_draw = rng.random(n)
+        neighborhood_draw = rng.random(n)
+        lat_jitter = rng.normal(0, 0.03, n)
+        lon_jitter = rng.normal(0, 0.05, n)
+        price_noise = rng.lognormal(0, 0.12, n)
+        listed_days_ago = rng.integers(0, HISTORY_DAYS, n)
+        days_on_market = rng.gamma(2.0, 12.0, n).astype(int) + 1
+        sold = rng.random(n) < SOLD_FRACTION
+        sold_discount = rng.normal(0.99, 0.03, n)
+        year_built = rng.integers(1910, self.now.year + 1, n)
+        lot_factor = rng.uniform(1.2, 3.5, n)
+        feature_mask = rng.random((n, len(FEATURES))) < 0.35
+
+        docs = []
+        for i in range(n):
+            city = self.cities[city_idx[i]]
+            lat, lon, price_per_sqft, neighborhoods = CITIES[city]
+            n_idx = int(neighborhood_draw[i] * len(neighborhoods))
+            neighborhood = neighborhoods[n_idx]
+            # Neighborhoods are ordered from pricier to cheaper
+            neighborhood_factor = 1.3 - 0.6 * n_idx / max(1, len(neighborhoods) - 1)
+
+            property_type = PROPERTY_TYPES[type_idx[i]]
+            low, high, type_factor = TYPE_PROFILES[property_type]
+            square_feet = round(low + (high - low) * size_draw[i])
+            bedrooms = max(1, min(6, square_feet // 550))
+            bathrooms = max(1, min(5, bedrooms - 1 + int(size_draw[i] > 0.5)))
+            lot_size = 0 if property_type == 'condo' else round(square_feet * lot_factor[i])
+            price = round(square_feet * price_per_sqft * neighborhood_factor * type_factor * price_noise[i], -3)
+
+            listed_date = self.now - timedelta(days=int(listed_days_ago[i]), minutes=start + i)
+            doc = {
+                'address': f'{start + i + 1} {neighborhood} St',
+                'city': city,
+                'neighborhood': neighborhood,
+                'property_type': property_type,
+                'price': float(price),
+                'bedrooms': int(bedrooms),
+                'bathrooms': float(bathrooms),
+                'square_feet': float(square_feet),
+                'lot_size': float(lot_size),
+                'year_built': int(year_built[i]),
+                'location': {
+                    'type': 'Point',
+                    'coordinates': [round(lon + lon_jitter[i], 6), round(lat + lat_jitter[i], 6)]
+                },
+                'features': [f for f, present in zip(FEATURES, feature_mask[i]) if present],
+                'listed_date': listed_date,
+                'status': 'active'
+            }
+
+            sold_date = listed_date + timedelta(days=int(days_on_market[i]))
+            if sold[i] and sold_date < self.now:
+                doc['status'] = 'sold'
+                doc['sold_date'] = sold_date
+                doc['price'] = float(round(price * sold_discount[i], -3))
+            docs.append(doc)
+        return docs
+
+def _add_months(date: datetime, months: int) -> datetime:
+    month = date.month - 1 + months
+    return date.replace(year=date.year + month // 12, month=month % 12 + 1, day=1)
@@ -0,0 +1,217 @@
+"""HTTP load test for the Flask app.
+
+Starts the app from ``app.create_app`` on a local threaded WSGI server,
+backed by an in-memory mongomock database seeded with the synthetic market
+(or by a real MongoDB with ``--uri``), then drives a weighted mix of
+endpoints with open-loop Poisson arrivals: requests are issued on schedule
+whether or not earlier ones have finished, and latency is measured from
+the scheduled arrival, so queueing under overload shows up in the tail.
+
+    python -m benchmarks.load_test --rate 50 --duration 30
+    python -m benchmarks.load_test --mix "/api/market-stats=5,/api/market-trends=1"
+    python -m benchmarks.load_test --target http://localhost:5000 --rate 200
+
+Reports throughput, p50/p95/p99 latency and error rate per endpoint.
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from benchmarks.common import percentiles, use_database
+from benchmarks.generator import MarketGenerator, CITIES
+
+DEFAULT_MIX = {
+    '/': 1,
+    '/api/market-stats': 2,
+    '/api/market-trends': 3,
+    '/api/neighborhood-analysis': 2,
+    '/api/investment-opportunities': 2
+}
+
+# Query strings drawn per request, so caches see a realistic key spread
+ENDPOINT_PARAMS = {
+    '/api/market-trends': lambda rng: {
+        'city': rng.choice(list(CITIES)),
+        'period': rng.choice(['1m', '3m', '6m', '1y'])
+    },
+    '/api/neighborhood-analysis': lambda rng: {'city': rng.choice(list(CITIES))},
+    '/api/investment-opportunities': lambda rng: {
+        'city': rng.choice(list(CITIES)),
+        'budget': rng.choice([600000, 900000, 1200000, 2000000]),
+        'limit': 10
+    }
+}
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    """Parse "path=weight,path=weight" into a traffic mix"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(','):
+        path, _, weight = item.strip().partition('=')
+        mix[path] = float(weight or 1)
+    return mix
+
+def start_server(listings: int, uri: Optional[str] = None, seed: int = 42) -> Tuple[str, Any]:
+    """Seed the database, start the app on a free port and return its URL"""
+    from werkzeug.serving import make_server
+    from config import Config
+
+    # Keep models trained on synthetic data out of the real registry, and
+    # the per-request access log out of the report
+    Config.MODEL_REGISTRY_DIR = tempfile.mkdtemp(prefix='loadtest-registry-')
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    db = use_database(uri)
+    if not uri:
+        MarketGenerator(seed=seed).populate(db, listings)
+
+    from app import create_app
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+class LoadTest:
+    """Open-loop load generator over a weighted endpoint mix"""
+
+    def __init__(
+        self,
+        base_url: str,
+        mix: Dict[str, float],
+        rate: float,
+        duration: float,
+        concurrency: int = 64,
+        timeout: float = 30,
+        seed: int = 42
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.mix = mix
+        self.rate = rate
+        self.duration = duration
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._results = defaultdict(list)
+
+    def schedule(self) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Poisson arrival times (seconds from start) with their requests"""
+        paths = list(self.mix)
+        weights = [self.mix[p] for p in paths]
+        arrivals = []
+        at = self.rng.expovariate(self.rate)
+        while at < self.duration:
+            path = self.rng.choices(paths, weights)[0]
+            params = ENDPOINT_PARAMS.get(path, lambda rng: {})(self.rng)
+            arrivals.append((at, path, params))
+            at += self.rng.expovariate(self.rate)
+        return arrivals
+
+    def run(self) -> Dict[str, Any]:
+        arrivals = self.schedule()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for at, path, params in arrivals:
+                delay = start + at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._request, start + at, path, params)
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        everything = []
+        for path in self.mix:
+            results = self._results.get(path, [])
+            everything.extend(results)
+            endpoints[path] = _summarize(results, elapsed)
+        return {
+            'duration_s': round(elapsed, 2),
+            'offered_rps': self.rate,
+            'endpoints': endpoints,
+            'total': _summarize(everything, elapsed)
+        }
+
+    def _request(self, scheduled: float, path: str, params: Dict[str, Any]) -> None:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+
+        status = None
+        try:
+            response = session.get(self.base_url + path, params=params, timeout=self.timeout)
+            response.content  # include transfer of the body
+            status = response.status_code
+        except requests.RequestException:
+            pass
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+
+        with self._lock:
+            self._results[path].append((latency_ms, status))
+
+def _summarize(results: List[Tuple[float, Optional[int]]], elapsed: float) -> Dict[str, Any]:
+    errors = sum(1 for _, status in results if status is None or status >= 500)
+    return {
+        'requests': len(results),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(errors / len(results), 4) if results else 0.0,
+        **percentiles([latency for latency, _ in results])
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', help='Base URL of a running server (default: start one in-process)')
+    parser.add_argument('--uri', help='MongoDB URI for the in-process server (default: seeded mongomock)')
+    parser.add_argument('--listings', type=int, default=5000, help='Synthetic listings to seed')
+    parser.add_argument('--mix', help='Traffic mix as "path=weight,..." (default: all endpoints)')
+    parser.add_argument('--rate', type=float, default=20, help='Mean arrivals per second')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of traffic')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum requests in flight')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.target
+    if base_url is None:
+        base_url, server = start_server(args.listings, args.uri, args.seed)
+
+    try:
+        report = LoadTest(
+            base_url,
+            parse_mix(args.mix),
+            rate=args.rate,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            seed=args.seed
+        ).run()
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['duration_s']}s at {report['offered_rps']} req/s offered")
+    print(f"{'endpoint':<32} {'reqs':>6} {'rps':>8} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for path, stats in list(report['endpoints'].items()) + [('total', report['total'])]:
+        print(
+            f"{path:<32} {stats['requests']:>6} {stats['throughput_rps']:>8} "
+            f"{stats['error_rate']:>8.2%} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9}"
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
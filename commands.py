@@ -0,0 +1,151 @@
+import click
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('refresh-rollups')
+    @click.option('--city', 'cities', multiple=True, help='City to refresh (repeatable, default: all)')
+    def refresh_rollups(cities):
+        """Rebuild the materialized market rollups"""
+        from services.market_analysis import MarketAnalysis
+        from services.market_rollups import MarketRollupService
+
+        if cities:
+            counts = MarketRollupService().refresh(city.lower() for city in cities)
+        else:
+            counts = MarketAnalysis().refresh_rollups()
+
+        for city, neighborhoods in counts.items():
+            click.echo(f"{city}: {neighborhoods} neighborhoods")
+
+    @app.cli.command('rebuild-market-series')
+    @click.option('--city', 'cities', multiple=True, required=True, help='City to rebuild (repeatable)')
+    def rebuild_market_series(cities):
+        """Recompute the monthly market series from the properties collection"""
+        from services.market_series import MarketSeries
+
+        series = MarketSeries()
+        for city in cities:
+            rows = series.rebuild(city.lower())
+            if rows is None:
+                click.echo(f"{city.lower()}: skipped, another rebuild is running")
+            else:
+                click.echo(f"{city.lower()}: {rows} monthly rows")
+
+    @app.cli.command('train-valuation-model')
+    @click.option('--max-rows', type=int, help='Train on a uniform sample of at most this many sales')
+    @click.option('--window-days', type=int, help='Only train on sales from the last N days')
+    @click.option('--trace-memory', is_flag=True, help='Report peak memory of the training data load')
+    def train_valuation_model(max_rows, window_days, trace_memory):
+        """Train the valuation model and publish it to the registry"""
+        from services.valuation_service import ValuationService
+
+        service = ValuationService()
+        version = service.train_and_publish(
+            max_rows=max_rows,
+            window_days=window_days,
+            trace_memory=trace_memory
+        )
+        stats = service.training_stats
+        if stats:
+            peak = f", peak {stats['peak_mb']} MB" if 'peak_mb' in stats else ''
+            click.echo(
+                f"Loaded {stats['rows']} of {stats['scanned']} sales in {stats['seconds']}s "
+                f"({stats['rows_per_s']} rows/s, arrays {stats['array_mb']} MB{peak})"
+            )
+        click.echo(f"Published valuation model {version} to {service.registry.path}")
+
+    @app.cli.command('train-market-predictor')
+    def train_market_predictor():
+        """Train the market forecast models and publish them to the registry"""
+        from models.market_predictor import MarketPredictor
+
+        predictor = MarketPredictor()
+        version = predictor.train_and_publish()
+        click.echo(f"Published market predictor {version} to {predictor.registry.path}")
+
+    @app.cli.command('ingest-treb')
+    @click.option('--city', 'cities', multiple=True, required=True, help='City to ingest (repeatable)')
+    def ingest_treb(cities):
+        """Fetch TREB listings and upsert them into the properties collection"""
+        from services.treb_ingestion import TREBIngestionService
+
+        service = TREBIngestionService()
+        for city in cities:
+            stats = service.ingest(city)
+            click.echo(
+                f"{stats['city']}: {stats['fetched']} listings from {stats['pages']} pages "
+                f"({stats['upserted']} new, {stats['modified']} updated, {stats['rejected']} rejected) "
+                f"at {stats['listings_per_second']} listings/s"
+            )
+            if stats['failed_pages']:
+                click.echo(f"  failed pages: {', '.join(map(str, stats['failed_pages']))}")
+
+    @app.cli.command('sync-treb')
+    @click.option('--city', 'cities', multiple=True, required=True, help='City to sync (repeatable)')
+    def sync_treb(cities):
+        """Apply TREB listing changes since the last sync"""
+        from services.treb_ingestion import TREBIngestionService
+
+        service = TREBIngestionService()
+        for city in cities:
+            stats = service.sync(city)
+            click.echo(
+                f"{stats['city']} ({stats['mode']}): {stats['fetched']} changed listings, "
+                f"{stats['upserted']} new, {stats['modified']} updated, {stats['sold']} sold "
+                f"in {stats['elapsed_seconds']}s; watermark {stats['watermark']}"
+            )
+            if stats['failed_pages']:
+                click.echo(f"  failed pages: {', '.join(map(str, stats['failed_pages']))}")
+
+    @app.cli.group('indexes')
+    def indexes():
+        """Inspect and build the registered database indexes"""
+
+    @indexes.command('diff')
+    def indexes_diff():
+        """Show registered indexes missing from the database and unregistered extras"""
+        from database.mongodb import get_database
+        from database.indexes import diff_indexes
+
+        diff = diff_indexes(get_database())
+        for entry in diff['missing']:
+            click.echo(f"+ {entry['collection']}.{entry['name']}  ({entry['serves']})")
+        for entry in diff['extra']:
+            click.echo(f"- {entry['collection']}.{entry['name']}  (not registered)")
+        click.echo(f"{len(diff['present'])} present, {len(diff['missing'])} missing, {len(diff['extra'])} extra")
+
+    @indexes.command('build')
+    @click.option('--drop-extra', is_flag=True, help='Also drop indexes that are not registered')
+    def indexes_build(drop_extra):
+        """Create missing registered indexes"""
+        from database.mongodb import get_database
+        from database.indexes import build_missing
+
+        result = build_missing(get_database(), drop_extra=drop_extra)
+        for name in result['created']:
+            click.echo(f"created {name}")
+        for name in result['dropped']:
+            click.echo(f"dropped {name}")
+        if not result['created'] and not result['dropped']:
+            click.echo("Indexes are up to date")
+
+    @indexes.command('check')
+    def indexes_check():
+        """Explain every registered query shape and fail on collection scans"""
+        from database.mongodb import get_database
+        from database.indexes import explain_query_shapes
+
+        collscans = 0
+        for report in explain_query_shapes(get_database()):
+            if report['collscan'] is None:
+                status = f"unknown ({report['error']})"
+            elif report['collscan']:
+                status = 'COLLSCAN'
+                collscans += 1
+            else:
+                status = ', '.join(report['indexes']) or ' > '.join(report['stages'])
+            click.echo(f"{report['source']}: {status}")
+
+        if collscans:
+            raise click.ClickException(f"{collscans} query shape(s) scan the whole collection")
@@ -7,4 +7,64 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/prophetestate')
     TREB_API_KEY = os.getenv('TREB_API_KEY')
-    MAPS_API_KEY = os.getenv('MAPS_API_KEY')
\ No newline at end of file
+    TREB_BASE_URL = os.getenv('TREB_BASE_URL', 'https://api.treb.com/v1')
+    MAPS_API_KEY = os.getenv('MAPS_API_KEY')
+    ROLLUP_MAX_AGE = int(os.getenv('ROLLUP_MAX_AGE', 300))  # seconds
+    ROLLUP_REFRESH_CONCURRENCY = int(os.getenv('ROLLUP_REFRESH_CONCURRENCY', 4))
+    ROLLUP_QUERY_TIMEOUT_MS = int(os.getenv('ROLLUP_QUERY_TIMEOUT_MS', 5000))
+    
+    # API response cache
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # 'memory' or 'mongo'
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 300))  # seconds
+    CACHE_TTLS = {
+        'market_trends': int(os.getenv('CACHE_TTL_MARKET_TRENDS', 900)),
+        'neighborhood_analysis': int(os.getenv('CACHE_TTL_NEIGHBORHOOD_ANALYSIS', 900)),
+        'investment_opportunities': int(os.getenv('CACHE_TTL_INVESTMENT_OPPORTUNITIES', 300))
+    }
+    
+    # Cache pre-warming
+    CACHE_PREWARM_ENABLED = os.getenv('CACHE_PREWARM_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    CACHE_PREWARM_INTERVAL = int(os.getenv('CACHE_PREWARM_INTERVAL', 60))  # seconds
+    CACHE_PREWARM_TOP_KEYS = int(os.getenv('CACHE_PREWARM_TOP_KEYS', 20))
+    CACHE_PREWARM_CONCURRENCY = int(os.getenv('CACHE_PREWARM_CONCURRENCY', 2))
+    CACHE_PREWARM_LEAD = int(os.getenv('CACHE_PREWARM_LEAD', 120))  # seconds before expiry
+    CACHE_PREWARM_WINDOW = int(os.getenv('CACHE_PREWARM_WINDOW', 3600))  # seconds of request history
+    
+    # Model registry
+    MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', 'models/trained')
+    MODEL_RELOAD_INTERVAL = int(os.getenv('MODEL_RELOAD_INTERVAL', 30))  # seconds
+    VALUATION_MODEL_BACKEND = os.getenv('VALUATION_MODEL_BACKEND', 'forest')  # forest, compact_forest, hist_gb
+    
+    # Valuation training data (0 = no row limit / all history)
+    VALUATION_TRAINING_BATCH_SIZE = int(os.getenv('VALUATION_TRAINING_BATCH_SIZE', 5000))
+    VALUATION_TRAINING_MAX_ROWS = int(os.getenv('VALUATION_TRAINING_MAX_ROWS', 0))
+    VALUATION_TRAINING_WINDOW_DAYS = int(os.getenv('VALUATION_TRAINING_WINDOW_DAYS', 0))
+    
+    # Valuation inference micro-batching (max size 1 disables batching)
+    VALUATION_MICROBATCH_MAX_SIZE = int(os.getenv('VALUATION_MICROBATCH_MAX_SIZE', 64))
+    VALUATION_MICROBATCH_MAX_WAIT_MS = float(os.getenv('VALUATION_MICROBATCH_MAX_WAIT_MS', 2))
+    
+    # Comparables index
+    COMPARABLES_WINDOW_DAYS = int(os.getenv('COMPARABLES_WINDOW_DAYS', 180))
+    COMPARABLES_REFRESH_INTERVAL = int(os.getenv('COMPARABLES_REFRESH_INTERVAL', 60))  # seconds
+    
+    # Market forecasts
+    FORECAST_CACHE_TTL = int(os.getenv('FORECAST_CACHE_TTL', 86400))  # seconds
+    FORECAST_CACHE_MAX_ENTRIES = int(os.getenv('FORECAST_CACHE_MAX_ENTRIES', 256))
+    
+    # API request limits
+    VALUATION_BATCH_MAX_SIZE = int(os.getenv('VALUATION_BATCH_MAX_SIZE', 5000))
+    PROPERTY_SEARCH_MAX_LIMIT = int(os.getenv('PROPERTY_SEARCH_MAX_LIMIT', 100))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 64 * 1024))
+    INVESTMENT_OPPORTUNITIES_MAX_LIMIT = int(os.getenv('INVESTMENT_OPPORTUNITIES_MAX_LIMIT', 100))
+    
+    # TREB ingestion
+    TREB_TIMEOUT = float(os.getenv('TREB_TIMEOUT', 10))
+    TREB_MAX_RETRIES = int(os.getenv('TREB_MAX_RETRIES', 3))
+    TREB_BACKOFF_FACTOR = float(os.getenv('TREB_BACKOFF_FACTOR', 0.5))
+    TREB_INGEST_WORKERS = int(os.getenv('TREB_INGEST_WORKERS', 8))
+    TREB_INGEST_PAGE_SIZE = int(os.getenv('TREB_INGEST_PAGE_SIZE', 200))
+    TREB_INGEST_BATCH_SIZE = int(os.getenv('TREB_INGEST_BATCH_SIZE', 500))
+    TREB_SYNC_OVERLAP = int(os.getenv('TREB_SYNC_OVERLAP', 300))  # seconds
@@ -20,15 +20,8 @@ class MongoDB:
         return self.db.valuations
 
     def create_indexes(self):
-        # Create geospatial index for property locations
-        self.properties.create_index([("location", "2dsphere")])
-        
-        # Create indexes for common queries
-        self.properties.create_index([("city", 1)])
-        self.properties.create_index([("price", 1)])
-        self.properties.create_index([("property_type", 1)])
-        
-        # Create indexes for market data
-        self.market_data.create_index([("city", 1), ("date", -1)])
+        # Indexes are declared once, in the registry shared with get_database
+        from database.indexes import ensure_indexes
+        ensure_indexes(self.db)
 
 db = MongoDB()
\ No newline at end of file
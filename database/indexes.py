@@ -0,0 +1,238 @@
+"""Declarative index registry.
+
+Every index the application relies on is declared here next to the query
+shapes it serves, so the set can be diffed against a live database, built,
+and checked with explain() for collection scans. ``get_database`` applies
+the registry on first connection; ``flask indexes`` exposes the diff, build
+and check operations.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+# (collection, keys, options, what the index serves)
+INDEXES = [
+    # Sold-property analytics: market series rebuilds, trend engine windows,
+    # neighborhood market stats and valuation trends
+    ('properties', [('city', 1), ('sold_date', -1)], {}, 'city sold_date windows'),
+    # Neighborhood analysis
+    ('properties', [('city', 1), ('neighborhood', 1), ('sold_date', -1)], {}, 'neighborhood sold_date windows'),
+    # Comparables index refresh and valuation training set
+    ('properties', [('sold_date', -1)], {}, 'recent sales'),
+    # Investment screen and keyset search by price
+    ('properties', [('city', 1), ('property_type', 1), ('price', 1), ('_id', 1)], {}, 'typed price search'),
+    ('properties', [('city', 1), ('price', 1), ('_id', 1)], {}, 'price search'),
+    # Keyset search by listing date
+    ('properties', [('city', 1), ('property_type', 1), ('listed_date', -1), ('_id', -1)], {}, 'typed recent listings'),
+    ('properties', [('city', 1), ('listed_date', -1), ('_id', -1)], {}, 'recent listings'),
+    ('properties', [('location', '2dsphere')], {'sparse': True}, 'nearby search'),
+    ('properties', [('listing_id', 1)], {'unique': True, 'sparse': True}, 'feed upserts'),
+    ('market_data', [('city', 1), ('date', -1)], {}, 'market indicators'),
+    # Monthly sale aggregates: city, neighborhood and typed series, and
+    # the $inc upserts that maintain them
+    ('market_data', [('city', 1), ('neighborhood', 1), ('property_type', 1), ('month', 1)], {}, 'market series'),
+    ('sync_log', [('source', 1), ('city', 1), ('started_at', -1)], {}, 'sync history'),
+    ('api_cache', [('expires_at', 1)], {'expireAfterSeconds': 0}, 'cache expiry'),
+    ('api_cache', [('accessed_at', 1)], {}, 'cache eviction'),
+    ('cache_hot_keys', [('bucket', 1)], {'expireAfterSeconds': 2 * 86400}, 'hot key window and expiry'),
+]
+
+def query_shapes(now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Representative filters for the queries the services issue
+
+    Values are placeholders; only the shape matters to the planner.
+    """
+    now = now or datetime.utcnow()
+    year_ago = now - timedelta(days=365)
+    month_ago = now - timedelta(days=30)
+    return [
+        {
+            'source': 'MarketSeries.monthly',
+            'collection': 'market_data',
+            'filter': {
+                'city': 'toronto',
+                'neighborhood': None,
+                'property_type': None,
+                'month': {'$gte': year_ago, '$lte': now},
+                'sales': {'$gt': 0}
+            },
+            'sort': [('neighborhood', 1), ('month', 1)]
+        },
+        {
+            'source': 'MarketSeries.monthly (neighborhoods)',
+            'collection': 'market_data',
+            'filter': {
+                'city': 'toronto',
+                'neighborhood': {'$in': ['Downtown', 'Midtown']},
+                'property_type': None,
+                'month': {'$gte': year_ago},
+                'sales': {'$gt': 0}
+            },
+            'sort': [('neighborhood', 1), ('month', 1)]
+        },
+        {
+            'source': 'MarketSeries.rebuild',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'sold_date': {'$ne': None}}
+        },
+        {
+            'source': 'TrendEngine.get_trends',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'sold_date': {'$gte': now - timedelta(days=90)}}
+        },
+        {
+            'source': 'AnalyticsService._get_neighborhood_market_stats',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'sold_date': {'$gte': year_ago}, 'square_feet': {'$gt': 0}}
+        },
+        {
+            'source': 'AnalyticsService.get_neighborhood_analysis',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'neighborhood': 'Downtown'}
+        },
+        {
+            'source': 'AnalyticsService.get_investment_opportunities',
+            'collection': 'properties',
+            'filter': {
+                'city': 'toronto',
+                'property_type': 'house',
+                'price': {'$lte': 1000000},
+                'listed_date': {'$gte': month_ago}
+            }
+        },
+        {
+            'source': 'ComparablesIndex.refresh',
+            'collection': 'properties',
+            'filter': {'sold_date': {'$gte': now - timedelta(days=180)}}
+        },
+        {
+            'source': 'MarketRollupService.refresh_city',
+            'collection': 'properties',
+            'filter': {'city': 'toronto'}
+        },
+        {
+            'source': 'PropertyService.search_properties_page',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'property_type': 'house', 'price': {'$gte': 0, '$lte': 2000000}},
+            'sort': [('price', 1), ('_id', 1)]
+        },
+        {
+            'source': 'PropertyService.search_properties_page (listed_date)',
+            'collection': 'properties',
+            'filter': {'city': 'toronto', 'price': {'$gte': 0, '$lte': 2000000}},
+            'sort': [('listed_date', -1), ('_id', -1)]
+        },
+        {
+            'source': 'TREBIngestionService._write',
+            'collection': 'properties',
+            'filter': {'listing_id': '1000'}
+        },
+        {
+            'source': 'CachePrewarmer.hot_keys',
+            'collection': 'cache_hot_keys',
+            'filter': {'bucket': {'$gte': now - timedelta(hours=1)}}
+        },
+        {
+            'source': 'TREBIngestionService.sync_history',
+            'collection': 'sync_log',
+            'filter': {'source': 'treb', 'city': 'toronto'},
+            'sort': [('started_at', -1)]
+        }
+    ]
+
+def index_name(keys: Iterable[Tuple[str, Any]]) -> str:
+    """Default MongoDB name for an index key pattern"""
+    return '_'.join(f'{field}_{direction}' for field, direction in keys)
+
+def ensure_indexes(db: Any, collections: Optional[Iterable[str]] = None) -> List[str]:
+    """Create the registered indexes (optionally for some collections only)"""
+    collections = set(collections) if collections is not None else None
+    created = []
+    for collection, keys, options, _ in INDEXES:
+        if collections is None or collection in collections:
+            created.append(db[collection].create_index(keys, **options))
+    return created
+
+def diff_indexes(db: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """Compare registered indexes with those present in the database
+
+    Returns 'missing' (registered, absent), 'extra' (present, unregistered)
+    and 'present' entries, each with collection, name and keys.
+    """
+    existing = {}
+    for collection in {spec[0] for spec in INDEXES}:
+        for name, info in db[collection].index_information().items():
+            if name != '_id_':
+                existing[(collection, _key_tuple(info['key']))] = name
+
+    diff = {'missing': [], 'extra': [], 'present': []}
+    registered = set()
+    for collection, keys, options, serves in INDEXES:
+        key = (collection, _key_tuple(keys))
+        registered.add(key)
+        entry = {'collection': collection, 'name': index_name(keys), 'keys': keys, 'serves': serves}
+        diff['present' if key in existing else 'missing'].append(entry)
+
+    for (collection, keys), name in sorted(existing.items(), key=lambda item: (item[0][0], item[1])):
+        if (collection, keys) not in registered:
+            diff['extra'].append({'collection': collection, 'name': name, 'keys': list(keys)})
+
+    return diff
+
+def build_missing(db: Any, drop_extra: bool = False) -> Dict[str, List[str]]:
+    """Create missing registered indexes and optionally drop unregistered ones"""
+    diff = diff_indexes(db)
+    specs = {(c, _key_tuple(k)): (k, o) for c, k, o, _ in INDEXES}
+
+    result = {'created': [], 'dropped': []}
+    for entry in diff['missing']:
+        keys, options = specs[(entry['collection'], _key_tuple(entry['keys']))]
+        name = db[entry['collection']].create_index(keys, **options)
+        result['created'].append(f"{entry['collection']}.{name}")
+
+    if drop_extra:
+        for entry in diff['extra']:
+            db[entry['collection']].drop_index(entry['name'])
+            result['dropped'].append(f"{entry['collection']}.{entry['name']}")
+
+    return result
+
+def explain_query_shapes(db: Any) -> List[Dict[str, Any]]:
+    """Run explain() on every registered query shape and flag collection scans"""
+    reports = []
+    for shape in query_shapes():
+        cursor = db[shape['collection']].find(shape['filter'])
+        if shape.get('sort'):
+            cursor = cursor.sort(shape['sort'])
+
+        report = {'source': shape['source'], 'collection': shape['collection']}
+        try:
+            plan = cursor.explain()['queryPlanner']['winningPlan']
+        except Exception as e:
+            report.update(error=str(e), stages=[], indexes=[], collscan=None)
+        else:
+            stages = list(_plan_stages(plan))
+            report.update(
+                stages=[stage for stage, _ in stages],
+                indexes=sorted({index for _, index in stages if index}),
+                collscan='COLLSCAN' in (stage for stage, _ in stages)
+            )
+        reports.append(report)
+    return reports
+
+def _key_tuple(keys: Iterable[Tuple[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    # Servers may report directions as floats (1.0)
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in keys
+    )
+
+def _plan_stages(plan: Any) -> Iterable[Tuple[str, Optional[str]]]:
+    """Walk a winning plan (classic or slot-based) yielding (stage, index)"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage'], plan.get('indexName')
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
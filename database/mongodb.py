@@ -1,42 +1,45 @@
 from pymongo import MongoClient
-from typing import Any
+from typing import Any, Optional
+from database.monitoring import SlowQueryMonitor
 import os
 
 _db = None
+_monitor = None
 
 def get_database() -> Any:
     """Get MongoDB database connection"""
-    global _db
+    global _db, _monitor
     
     if _db is None:
-        client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/prophetestate'))
+        listeners = []
+        threshold = float(os.getenv('SLOW_QUERY_MS', 100))
+        if threshold > 0:
+            _monitor = SlowQueryMonitor(
+                threshold_ms=threshold,
+                capped_size=int(os.getenv('SLOW_QUERY_CAPPED_BYTES', 16 * 1024 * 1024))
+            )
+            listeners.append(_monitor)
+            
+        client = MongoClient(
+            os.getenv('MONGODB_URI', 'mongodb://localhost:27017/prophetestate'),
+            event_listeners=listeners
+        )
         _db = client.get_database()
         
+        if _monitor is not None:
+            _monitor.bind(_db)
+        
         # Ensure indexes
         _ensure_indexes(_db)
     
     return _db
 
+def get_query_monitor() -> Optional[SlowQueryMonitor]:
+    """Slow-query monitor attached to the client, if enabled"""
+    get_database()
+    return _monitor
+
 def _ensure_indexes(db: Any) -> None:
     """Create necessary database indexes"""
-    # Properties collection indexes
-    db.properties.create_index([('city', 1)])
-    db.properties.create_index([('property_type', 1)])
-    db.properties.create_index([('price', 1)])
-    db.properties.create_index([('listed_date', -1)])
-    db.properties.create_index([('sold_date', -1)])
-    db.properties.create_index([
-        ('location', '2dsphere')
-    ], sparse=True)
-    
-    # Compound indexes for common queries
-    db.properties.create_index([
-        ('city', 1),
-        ('property_type', 1),
-        ('price', 1)
-    ])
-    db.properties.create_index([
-        ('city', 1),
-        ('neighborhood', 1),
-        ('listed_date', -1)
-    ])
\ No newline at end of file
+    from database.indexes import ensure_indexes
+    ensure_indexes(db)
@@ -0,0 +1,243 @@
+"""Slow-query monitoring through pymongo command events.
+
+``SlowQueryMonitor`` is registered as an event listener on the client
+created by ``get_database``. Every command's duration is timed; commands
+slower than the threshold are logged with the service method that issued
+them, and explainable ones (find, aggregate, count, distinct) are re-run
+through ``explain`` on a background thread so the plan summary
+(docsExamined vs nReturned, stages, indexes) lands in a capped
+diagnostics collection.
+"""
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct'}
+
+# Driver-added fields that explain does not accept
+SESSION_FIELDS = {'lsid', '$db', '$clusterTime', '$readPreference', 'txnNumber', 'readConcern'}
+
+# Frames from these directories are reported as the origin of a command
+ORIGIN_PACKAGES = ('services', 'models', 'routes')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """Time every command and capture explain plans for slow ones"""
+
+    def __init__(
+        self,
+        threshold_ms: float = 100,
+        collection: str = 'slow_queries',
+        capped_size: int = 16 * 1024 * 1024,
+        max_pending: int = 100
+    ):
+        self.threshold_ms = threshold_ms
+        self.collection_name = collection
+        self.capped_size = capped_size
+        self.db = None
+        self._started = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = None
+
+    def bind(self, db: Any) -> None:
+        """Set the database that explains run against and captures go to"""
+        self.db = db
+        try:
+            db.create_collection(self.collection_name, capped=True, size=self.capped_size)
+        except CollectionInvalid:
+            pass  # already exists
+        except Exception as e:
+            # Diagnostics must not stop the app from connecting
+            logger.warning("Could not create capped %s collection: %s", self.collection_name, e)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if not self._is_monitored(event.command_name, event.command):
+            return
+        with self._lock:
+            self._started[_event_key(event)] = (
+                event.command if event.command_name in EXPLAINABLE else None,
+                _collection(event.command_name, event.command),
+                _origin(),
+                event.database_name
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, failure=None)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event, failure=str(event.failure))
+
+    def stats(self) -> Dict[str, Any]:
+        """Commands seen and slow commands captured since start-up"""
+        with self._lock:
+            return {
+                'threshold_ms': self.threshold_ms,
+                'commands': self._counts['commands'],
+                'slow': self._counts['slow'],
+                'captured': self._counts['captured'],
+                'dropped': self._counts['dropped']
+            }
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent captured slow queries, newest first"""
+        if self.db is None:
+            return []
+        return list(self.db[self.collection_name].find({}, {'_id': 0}).sort('$natural', -1).limit(limit))
+
+    def flush(self) -> None:
+        """Wait for queued explains to be written"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def _is_monitored(self, command_name: str, command: Dict[str, Any]) -> bool:
+        # Never monitor our own explains and writes, or we would feed back
+        if command_name == 'explain':
+            return False
+        return command.get(command_name) != self.collection_name
+
+    def _finished(self, event: Any, failure: Optional[str]) -> None:
+        with self._lock:
+            started = self._started.pop(_event_key(event), None)
+            if started is None:
+                return
+            self._counts['commands'] += 1
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        command, collection, origin, database_name = started
+        record = {
+            'command': event.command_name,
+            'collection': collection,
+            'database': database_name,
+            'origin': origin,
+            'duration_ms': round(duration_ms, 3),
+            'failure': failure,
+            'at': datetime.utcnow()
+        }
+        with self._lock:
+            self._counts['slow'] += 1
+        logger.warning(
+            "Slow %s on %s: %.1f ms from %s%s",
+            record['command'], record['collection'], duration_ms, origin or 'unknown',
+            f" ({failure})" if failure else ''
+        )
+
+        if self.db is None:
+            return
+        try:
+            self._queue.put_nowait((record, command))
+        except queue.Full:
+            with self._lock:
+                self._counts['dropped'] += 1
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            record, command = self._queue.get()
+            try:
+                self._capture(record, command)
+            except Exception:
+                logger.exception("Failed to capture slow query")
+            finally:
+                self._queue.task_done()
+
+    def _capture(self, record: Dict[str, Any], command: Optional[Dict[str, Any]]) -> None:
+        if command is not None and record['failure'] is None:
+            try:
+                plan = self.db.client[record['database']].command(
+                    'explain', _explainable(command), verbosity='executionStats'
+                )
+                record['plan'] = summarize_explain(plan)
+            except Exception as e:
+                record['plan'] = {'error': str(e)}
+        self.db[self.collection_name].insert_one(record)
+        with self._lock:
+            self._counts['captured'] += 1
+
+def summarize_explain(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an explain document to its execution counts and plan shape
+
+    Aggregations report execution stats per $cursor stage (or per shard),
+    so counts from every executionStats block are summed.
+    """
+    stats = list(_find_key(plan, 'executionStats'))
+    stages = []
+    for winning_plan in _find_key(plan, 'winningPlan'):
+        stages.extend(_find_key(winning_plan, 'stage'))
+    indexes = set()
+    for winning_plan in _find_key(plan, 'winningPlan'):
+        indexes.update(_find_key(winning_plan, 'indexName'))
+
+    docs_examined = sum(s.get('totalDocsExamined', 0) for s in stats)
+    keys_examined = sum(s.get('totalKeysExamined', 0) for s in stats)
+    returned = sum(s.get('nReturned', 0) for s in stats)
+    return {
+        'docs_examined': docs_examined,
+        'keys_examined': keys_examined,
+        'n_returned': returned,
+        'examined_per_returned': round(docs_examined / returned, 2) if returned else None,
+        'stages': stages,
+        'indexes': sorted(indexes),
+        'collscan': 'COLLSCAN' in stages
+    }
+
+def _find_key(value: Any, key: str):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if k == key:
+                yield v
+            else:
+                yield from _find_key(v, key)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _find_key(item, key)
+
+def _event_key(event: Any) -> Tuple[Any, int]:
+    return event.connection_id, event.request_id
+
+def _collection(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    # getMore names its collection separately; aggregate: 1 is database-level
+    value = command.get('collection') if command_name == 'getMore' else command.get(command_name)
+    return value if isinstance(value, str) else None
+
+def _explainable(command: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in command.items() if k not in SESSION_FIELDS}
+
+def _origin() -> Optional[str]:
+    """Innermost application frame on the calling stack, as Class.method"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(ROOT):
+            package = os.path.relpath(path, ROOT).split(os.sep)[0]
+            if package in ORIGIN_PACKAGES:
+                owner = frame.f_locals.get('self')
+                name = frame.f_code.co_name
+                if owner is not None:
+                    return f'{type(owner).__name__}.{name}'
+                module = os.path.splitext(os.path.relpath(path, ROOT))[0].replace(os.sep, '.')
+                return f'{module}.{name}'
+        frame = frame.f_back
+    return None
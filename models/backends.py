@@ -0,0 +1,34 @@
+from typing import Any, Callable, Dict, Optional
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from config import Config
+
+def _forest() -> RandomForestRegressor:
+    # Fully grown trees: the most accurate backend, but the pickle grows with the
+    # training set and every prediction walks 100 deep trees
+    return RandomForestRegressor(n_estimators=100, random_state=42)
+
+def _compact_forest() -> RandomForestRegressor:
+    # Fewer, depth-limited trees with a minimum leaf size cap the node count
+    return RandomForestRegressor(n_estimators=40, max_depth=12, min_samples_leaf=5, random_state=42)
+
+def _hist_gradient_boosting() -> HistGradientBoostingRegressor:
+    # Binned features and small trees; the artifact stays a few hundred KB
+    # regardless of how many rows it was trained on
+    return HistGradientBoostingRegressor(max_iter=200, max_leaf_nodes=31, random_state=42)
+
+# Valuation model backends by name, selected with VALUATION_MODEL_BACKEND
+MODEL_BACKENDS: Dict[str, Callable[[], Any]] = {
+    'forest': _forest,
+    'compact_forest': _compact_forest,
+    'hist_gb': _hist_gradient_boosting
+}
+
+def create_model(backend: Optional[str] = None) -> Any:
+    """Create an unfitted valuation regressor for a backend (default from config)"""
+    backend = backend or Config.VALUATION_MODEL_BACKEND
+    try:
+        return MODEL_BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown valuation model backend: {backend} (expected one of {', '.join(MODEL_BACKENDS)})"
+        ) from None
@@ -0,0 +1,101 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into batched calls.
+
+    Callers submit one feature row and block on a future. A worker thread
+    takes the first waiting row, keeps collecting until ``max_batch_size``
+    rows are queued or ``max_wait_ms`` has passed since that row arrived,
+    then runs ``predict_batch`` once on the stacked array and hands each
+    caller its own result. Under low load a request waits at most
+    ``max_wait_ms``; under high load the per-call overhead of the model is
+    paid once per batch.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        name: str = 'micro-batcher'
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+
+    def predict(self, row: np.ndarray, timeout: Optional[float] = None) -> Any:
+        """Predict one row, batched with whatever else is in flight"""
+        if self.max_batch_size == 1:
+            return self._run_batch([row])[0]
+        return self.submit(row).result(timeout)
+
+    def submit(self, row: np.ndarray) -> Future:
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((row, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'rows': self._rows,
+                'avg_batch_size': round(self._rows / self._batches, 2) if self._batches else 0.0,
+                'largest_batch': self._largest_batch,
+                'queued': self._queue.qsize()
+            }
+
+    def _ensure_worker(self) -> None:
+        # Started lazily so a process forked after construction gets its own thread
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        pending.append(self._queue.get(timeout=remaining))
+                    else:
+                        pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: List[Tuple[np.ndarray, Future]]) -> None:
+        futures = [future for _, future in pending]
+        try:
+            results = self._run_batch([row for row, _ in pending])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def _run_batch(self, rows: List[np.ndarray]) -> np.ndarray:
+        results = self.predict_batch(np.vstack(rows))
+        with self._lock:
+            self._batches += 1
+            self._rows += len(rows)
+            self._largest_batch = max(self._largest_batch, len(rows))
+        return results
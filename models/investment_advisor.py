@@ -185,4 +185,4 @@ class InvestmentAdvisor:
                     'Infrastructure development'
                 ]
             }
-        }</content>
\ No newline at end of file
+        }
\ No newline at end of file
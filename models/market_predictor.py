@@ -1,106 +1,182 @@
+import copy
+import threading
+import zlib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import GradientBoostingRegressor
 from xgboost import XGBRegressor
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Optional
+from models.registry import ModelRegistry, LazyModel
+from memory_cache import MemoryCacheBackend
+from config import Config
+
+FEATURE_NAMES = ['inventory', 'interest_rate', 'unemployment', 'gdp_growth', 'month', 'year', 'season']
+
+SEASONS = {
+    12: 0, 1: 0, 2: 0,   # winter
+    3: 1, 4: 1, 5: 1,    # spring
+    6: 2, 7: 2, 8: 2,    # summer
+    9: 3, 10: 3, 11: 3   # fall
+}
+
+# Forecast points per month and pandas frequency for each resolution
+RESOLUTIONS = {
+    'daily': (30, 'D'),
+    'weekly': (30 / 7, 'W'),
+    'monthly': (1, 'MS')
+}
 
 class MarketPredictor:
-    def __init__(self):
-        self.price_model = XGBRegressor()
-        self.trend_model = GradientBoostingRegressor()
-        self.initialize_models()
-    
-    def initialize_models(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or ModelRegistry(Config.MODEL_REGISTRY_DIR, 'market_predictor')
+        self._models = LazyModel(
+            self.registry,
+            FEATURE_NAMES,
+            reload_interval=Config.MODEL_RELOAD_INTERVAL
+        )
+        self._forecasts = MemoryCacheBackend(max_entries=Config.FORECAST_CACHE_MAX_ENTRIES)
+        self._train_lock = threading.Lock()
+
+    @property
+    def model_version(self) -> str:
+        """Registry version of the models being served"""
+        self._get_models()
+        return self._models.version
+
+    def initialize_models(self) -> Dict[str, Any]:
         """Initialize and train models with historical data"""
         # In production, load real historical data
+        rng = np.random.default_rng(42)
         dates = pd.date_range(start='2020-01-01', end=datetime.now(), freq='D')
         n_samples = len(dates)
-        
+
         # Simulate historical data
         data = pd.DataFrame({
             'date': dates,
-            'price': np.random.normal(800000, 100000, n_samples) * 
+            'price': rng.normal(800000, 100000, n_samples) *
                     (1 + np.linspace(0, 0.3, n_samples)), # Upward trend
-            'inventory': np.random.normal(1000, 200, n_samples),
-            'interest_rate': np.random.normal(0.03, 0.005, n_samples),
-            'unemployment': np.random.normal(0.06, 0.01, n_samples),
-            'gdp_growth': np.random.normal(0.02, 0.005, n_samples)
+            **self._economic_features(rng, n_samples)
         })
-        
-        # Feature engineering
-        data['month'] = data['date'].dt.month
-        data['year'] = data['date'].dt.year
-        data['season'] = data['month'].map({
-            12: 'winter', 1: 'winter', 2: 'winter',
-            3: 'spring', 4: 'spring', 5: 'spring',
-            6: 'summer', 7: 'summer', 8: 'summer',
-            9: 'fall', 10: 'fall', 11: 'fall'
-        })
-        
+        self._add_calendar_features(data)
+
         # Train price prediction model
-        X = data.drop(['date', 'price'], axis=1)
+        X = data[FEATURE_NAMES]
         y = data['price']
-        self.price_model.fit(X, y)
-        
+        price_model = XGBRegressor()
+        price_model.fit(X, y)
+
         # Train trend prediction model
         data['price_trend'] = data['price'].pct_change(periods=30)  # 30-day trend
-        X_trend = data.drop(['date', 'price', 'price_trend'], axis=1)
-        y_trend = data['price_trend']
-        self.trend_model.fit(X_trend, y_trend)
-    
-    def predict_market(self, city: str, months_ahead: int = 12) -> Dict[str, Any]:
-        """Predict market conditions for the specified number of months"""
+        trend_data = data.dropna(subset=['price_trend'])
+        trend_model = GradientBoostingRegressor()
+        trend_model.fit(trend_data[FEATURE_NAMES], trend_data['price_trend'])
+
+        return {'price_model': price_model, 'trend_model': trend_model}
+
+    def train_and_publish(self) -> str:
+        """Train the models and publish them to the registry"""
+        return self.registry.publish(self.initialize_models(), FEATURE_NAMES)
+
+    def predict_market(
+        self,
+        city: str,
+        months_ahead: int = 12,
+        resolution: str = 'monthly'
+    ) -> Dict[str, Any]:
+        """Predict market conditions for the specified number of months
+
+        ``resolution`` is 'daily', 'weekly' or 'monthly'. Forecasts are
+        deterministic per (city, horizon, resolution) and cached per model
+        version, so repeat calls are served from memory.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        models = self._get_models()
+        key = f'{city}:{months_ahead}:{resolution}:{datetime.now().date()}:{self._models.version}'
+        forecast = self._forecasts.get(key)
+        if forecast is None:
+            forecast = self._forecast(models, city, months_ahead, resolution)
+            self._forecasts.set(key, forecast, Config.FORECAST_CACHE_TTL)
+
+        return copy.deepcopy(forecast)
+
+    def _get_models(self) -> Dict[str, Any]:
+        if self._models.version is None and self.registry.latest_version() is None:
+            with self._train_lock:
+                # Concurrent first requests train and publish once
+                if self.registry.latest_version() is None:
+                    self.train_and_publish()
+        return self._models.get()
+
+    def _forecast(
+        self,
+        models: Dict[str, Any],
+        city: str,
+        months_ahead: int,
+        resolution: str
+    ) -> Dict[str, Any]:
+        points_per_month, freq = RESOLUTIONS[resolution]
         future_dates = pd.date_range(
-            start=datetime.now(),
-            periods=months_ahead * 30,
-            freq='D'
+            start=datetime.now().date(),
+            periods=max(1, int(round(months_ahead * points_per_month))),
+            freq=freq
         )
-        
+
+        # Seed from the request so the same forecast is produced every time
+        seed = zlib.crc32(f'{city}:{months_ahead}:{resolution}'.encode())
+        rng = np.random.default_rng(seed)
+
         # Generate future features
         future_data = pd.DataFrame({
             'date': future_dates,
-            'inventory': np.random.normal(1000, 200, len(future_dates)),
-            'interest_rate': np.random.normal(0.03, 0.005, len(future_dates)),
-            'unemployment': np.random.normal(0.06, 0.01, len(future_dates)),
-            'gdp_growth': np.random.normal(0.02, 0.005, len(future_dates))
+            **self._economic_features(rng, len(future_dates))
         })
-        
-        future_data['month'] = future_data['date'].dt.month
-        future_data['year'] = future_data['date'].dt.year
-        future_data['season'] = future_data['month'].map({
-            12: 'winter', 1: 'winter', 2: 'winter',
-            3: 'spring', 4: 'spring', 5: 'spring',
-            6: 'summer', 7: 'summer', 8: 'summer',
-            9: 'fall', 10: 'fall', 11: 'fall'
-        })
-        
+        self._add_calendar_features(future_data)
+
         # Make predictions
-        X_future = future_data.drop('date', axis=1)
-        price_predictions = self.price_model.predict(X_future)
-        trend_predictions = self.trend_model.predict(X_future)
-        
+        X_future = future_data[FEATURE_NAMES]
+        price_predictions = models['price_model'].predict(X_future)
+        trend_predictions = models['trend_model'].predict(X_future)
+
         # Calculate confidence intervals (simplified)
         confidence = 0.95
         std_dev = np.std(price_predictions)
         margin = std_dev * 1.96  # 95% confidence interval
-        
+
         return {
             'predictions': [
                 {
                     'date': date.strftime('%Y-%m-%d'),
-                    'price': round(price, 2),
-                    'trend': round(trend * 100, 2),  # Convert to percentage
-                    'lower_bound': round(price - margin, 2),
-                    'upper_bound': round(price + margin, 2)
+                    'price': round(float(price), 2),
+                    'trend': round(float(trend) * 100, 2),  # Convert to percentage
+                    'lower_bound': round(float(price - margin), 2),
+                    'upper_bound': round(float(price + margin), 2)
                 }
                 for date, price, trend in zip(future_dates, price_predictions, trend_predictions)
             ],
             'summary': {
-                'avg_price': round(np.mean(price_predictions), 2),
-                'price_change': round((price_predictions[-1] - price_predictions[0]) / 
-                                   price_predictions[0] * 100, 2),
+                'avg_price': round(float(np.mean(price_predictions)), 2),
+                'price_change': round(float((price_predictions[-1] - price_predictions[0]) /
+                                   price_predictions[0] * 100), 2),
                 'confidence': confidence * 100,
-                'volatility': round(np.std(trend_predictions) * 100, 2)
+                'volatility': round(float(np.std(trend_predictions)) * 100, 2),
+                'resolution': resolution,
+                'model_version': self._models.version
             }
-        }</content>
\ No newline at end of file
+        }
+
+    def _economic_features(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        return {
+            'inventory': rng.normal(1000, 200, n),
+            'interest_rate': rng.normal(0.03, 0.005, n),
+            'unemployment': rng.normal(0.06, 0.01, n),
+            'gdp_growth': rng.normal(0.02, 0.005, n)
+        }
+
+    def _add_calendar_features(self, data: pd.DataFrame) -> None:
+        # Feature engineering
+        data['month'] = data['date'].dt.month
+        data['year'] = data['date'].dt.year
+        data['season'] = data['month'].map(SEASONS)
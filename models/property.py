@@ -4,8 +4,9 @@ from database import db
 
 class Property:
     @staticmethod
-    def create(data: Dict[str, Any]) -> Dict[str, Any]:
-        property_doc = {
+    def normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a properties document from raw listing data"""
+        return {
             'address': data['address'],
             'city': data['city'].lower(),
             'price': float(data['price']),
@@ -24,6 +25,10 @@ class Property:
             'description': data.get('description', ''),
             'images': data.get('images', [])
         }
+
+    @staticmethod
+    def create(data: Dict[str, Any]) -> Dict[str, Any]:
+        property_doc = Property.normalize(data)
         
         result = db.properties.insert_one(property_doc)
         property_doc['_id'] = str(result.inserted_id)
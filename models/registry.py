@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import joblib
+
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.joblib'
+LATEST_FILE = 'LATEST'
+
+class ModelRegistry:
+    """File-based registry of versioned model artifacts.
+
+    Layout::
+
+        <root>/<name>/<version>/model.joblib
+        <root>/<name>/<version>/manifest.json
+        <root>/<name>/LATEST          # version currently served
+
+    Artifacts are written uncompressed so they can be memory-mapped on load,
+    letting workers on the same host share the forest's arrays through the
+    page cache instead of each holding a private copy.
+    """
+
+    def __init__(self, root: str, name: str):
+        self.root = root
+        self.name = name
+        self.path = os.path.join(root, name)
+
+    def publish(
+        self,
+        model: Any,
+        feature_schema: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Persist a model as a new version and point LATEST at it"""
+        version = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        version_path = os.path.join(self.path, version)
+        os.makedirs(version_path)
+
+        joblib.dump(model, os.path.join(version_path, MODEL_FILE))
+        manifest = {
+            'name': self.name,
+            'version': version,
+            'created_at': datetime.utcnow().isoformat(),
+            'model_class': f'{type(model).__module__}.{type(model).__name__}',
+            'feature_schema': list(feature_schema),
+            **(metadata or {})
+        }
+        self._write_atomic(os.path.join(version_path, MANIFEST_FILE), json.dumps(manifest, indent=2))
+        self._write_atomic(os.path.join(self.path, LATEST_FILE), version)
+
+        return version
+
+    def latest_version(self) -> Optional[str]:
+        """Get the version LATEST points at, or None if nothing is published"""
+        try:
+            with open(os.path.join(self.path, LATEST_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self) -> List[str]:
+        """List published versions, oldest first"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.path)
+            if os.path.isfile(os.path.join(self.path, entry, MANIFEST_FILE))
+        )
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        """Read the manifest of a version"""
+        with open(os.path.join(self.path, version, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def load(
+        self,
+        version: Optional[str] = None,
+        feature_schema: Optional[List[str]] = None,
+        mmap_mode: Optional[str] = 'r'
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Load a version (default: latest), checking its feature schema"""
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No published versions of model '{self.name}'")
+
+        manifest = self.manifest(version)
+        if feature_schema is not None and manifest['feature_schema'] != list(feature_schema):
+            raise ValueError(
+                f"Model {self.name}@{version} expects features {manifest['feature_schema']}, "
+                f"got {list(feature_schema)}"
+            )
+
+        model = joblib.load(os.path.join(self.path, version, MODEL_FILE), mmap_mode=mmap_mode)
+        return model, manifest
+
+    def _write_atomic(self, path: str, content: str) -> None:
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+class LazyModel:
+    """Loads the latest registry version on first use and hot-swaps newer ones.
+
+    The LATEST pointer is re-read at most once per ``reload_interval``
+    seconds; when it names a new version that version is loaded and swapped
+    in without a restart. If nothing has been published, ``fallback`` is
+    called once to build a model in-process.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        feature_schema: List[str],
+        fallback: Optional[Callable[[], Any]] = None,
+        reload_interval: float = 30
+    ):
+        self.registry = registry
+        self.feature_schema = list(feature_schema)
+        self.fallback = fallback
+        self.reload_interval = reload_interval
+        self.version = None
+        self.manifest = None
+        self._model = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """Get the current model, loading or swapping versions as needed"""
+        now = time.monotonic()
+        if self._model is not None and now - self._checked_at < self.reload_interval:
+            return self._model
+
+        with self._lock:
+            if self._model is None or now - self._checked_at >= self.reload_interval:
+                self._refresh()
+                self._checked_at = time.monotonic()
+            return self._model
+
+    def _refresh(self) -> None:
+        latest = self.registry.latest_version()
+
+        if latest is None:
+            if self._model is None and self.fallback is not None:
+                self._model = self.fallback()
+                self.version = None
+                self.manifest = None
+            return
+
+        if latest == self.version:
+            return
+
+        try:
+            model, manifest = self.registry.load(latest, self.feature_schema)
+        except ValueError:
+            # Incompatible artifact; keep serving what we have, if anything
+            if self._model is None and self.fallback is not None:
+                self._model = self.fallback()
+            return
+
+        self._model = model
+        self.version = latest
+        self.manifest = manifest
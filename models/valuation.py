@@ -1,20 +1,33 @@
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+from models.batching import MicroBatcher
+from models.backends import create_model
+from config import Config
+
+# Model inputs, in training column order
+FEATURES = ['square_feet', 'bedrooms', 'bathrooms', 'year_built', 'lot_size']
 
 class ValuationModel:
-    def __init__(self):
+    def __init__(self, model_dir: str = 'models/trained'):
+        self.model_dir = model_dir
         self.model = None
         self.scaler = None
         self.load_model()
+        # Concurrent predict() calls share one transform and forest pass
+        self.batcher = MicroBatcher(
+            self.predict_values,
+            max_batch_size=Config.VALUATION_MICROBATCH_MAX_SIZE,
+            max_wait_ms=Config.VALUATION_MICROBATCH_MAX_WAIT_MS,
+            name='valuation-batcher'
+        )
     
     def load_model(self):
         try:
-            self.model = joblib.load('models/trained/valuation_model.joblib')
-            self.scaler = joblib.load('models/trained/scaler.joblib')
+            self.model = joblib.load(os.path.join(self.model_dir, 'valuation_model.joblib'))
+            self.scaler = joblib.load(os.path.join(self.model_dir, 'scaler.joblib'))
         except:
             print("Training new model...")
             self.train_model()
@@ -37,18 +50,25 @@ class ValuationModel:
         self.scaler = StandardScaler()
         X_scaled = self.scaler.fit_transform(X)
         
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self.model = create_model()
         self.model.fit(X_scaled, y)
         
         # Save model
-        os.makedirs('models/trained', exist_ok=True)
-        joblib.dump(self.model, 'models/trained/valuation_model.joblib')
-        joblib.dump(self.scaler, 'models/trained/scaler.joblib')
+        os.makedirs(self.model_dir, exist_ok=True)
+        joblib.dump(self.model, os.path.join(self.model_dir, 'valuation_model.joblib'))
+        joblib.dump(self.scaler, os.path.join(self.model_dir, 'scaler.joblib'))
+    
+    def predict_values(self, X: np.ndarray) -> np.ndarray:
+        """Estimated values for rows of FEATURES, as one array pass"""
+        # StandardScaler.transform without its per-call DataFrame validation
+        X_scaled = (np.asarray(X, dtype=float) - self.scaler.mean_) / self.scaler.scale_
+        return self.model.predict(X_scaled)
+    
+    def feature_row(self, features) -> np.ndarray:
+        return np.array([float(features.get(name, 0) or 0) for name in FEATURES])
     
     def predict(self, features):
-        features_df = pd.DataFrame([features])
-        features_scaled = self.scaler.transform(features_df)
-        prediction = self.model.predict(features_scaled)[0]
+        prediction = float(self.batcher.predict(self.feature_row(features)))
         
         # Calculate confidence score (simplified)
         confidence = 95 - np.random.randint(0, 10)
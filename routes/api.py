@@ -1,14 +1,44 @@
-from flask import Blueprint, jsonify, request
+from typing import Dict, Any
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from services.market_analysis import MarketAnalysis
 from services.property_service import PropertyService
 from services.valuation_service import ValuationService
 from services.analytics_service import AnalyticsService
+from services.response_cache import ResponseCache
+from services.cache_prewarm import CachePrewarmer
+from database.mongodb import get_query_monitor
+from config import Config
 
 api_bp = Blueprint('api', __name__)
 market_analysis = MarketAnalysis()
 property_service = PropertyService()
 valuation_service = ValuationService()
 analytics_service = AnalyticsService()
+response_cache = ResponseCache.from_config(Config)
+
+# Cached computations by endpoint, shared by the routes and the pre-warmer
+CACHED_COMPUTATIONS = {
+    'market_trends': lambda args: analytics_service.get_market_trends(args['city'], args['period']),
+    'neighborhood_analysis': lambda args: analytics_service.get_neighborhood_analysis(
+        args['city'], args.get('neighborhood')
+    ),
+    'investment_opportunities': lambda args: analytics_service.get_investment_opportunities(
+        city=args['city'],
+        budget=args['budget'],
+        property_type=args['type'],
+        limit=args['limit'],
+        min_roi=args['min_roi']
+    )
+}
+cache_prewarmer = CachePrewarmer(response_cache, CACHED_COMPUTATIONS)
+
+def _cached(endpoint: str, args: Dict[str, Any]) -> Any:
+    return response_cache.get_or_compute(endpoint, args, lambda: CACHED_COMPUTATIONS[endpoint](args))
+
+def _server_error(e: Exception):
+    # Keep the traceback in the logs; the client only gets the message
+    current_app.logger.exception("Unhandled error in %s %s", request.method, request.path)
+    return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/market-stats')
 def get_market_stats():
@@ -16,27 +46,27 @@ def get_market_stats():
         stats = market_analysis.get_market_overview()
         return jsonify(stats)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _server_error(e)
 
 @api_bp.route('/market-trends')
 def get_market_trends():
     try:
         city = request.args.get('city', 'toronto')
         period = request.args.get('period', '1y')
-        trends = analytics_service.get_market_trends(city, period)
+        trends = _cached('market_trends', {'city': city, 'period': period})
         return jsonify(trends)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _server_error(e)
 
 @api_bp.route('/neighborhood-analysis')
 def get_neighborhood_analysis():
     try:
         city = request.args.get('city', 'toronto')
         neighborhood = request.args.get('neighborhood')
-        analysis = analytics_service.get_neighborhood_analysis(city, neighborhood)
+        analysis = _cached('neighborhood_analysis', {'city': city, 'neighborhood': neighborhood})
         return jsonify(analysis)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _server_error(e)
 
 @api_bp.route('/investment-opportunities')
 def get_investment_opportunities():
@@ -44,12 +74,116 @@ def get_investment_opportunities():
         city = request.args.get('city', 'toronto')
         budget = float(request.args.get('budget', 1000000))
         property_type = request.args.get('type', 'all')
+        limit = max(min(int(request.args.get('limit', 10)), Config.INVESTMENT_OPPORTUNITIES_MAX_LIMIT), 1)
+        min_roi = float(request.args.get('min_roi', 5))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
         
-        opportunities = analytics_service.get_investment_opportunities(
-            city=city,
-            budget=budget,
-            property_type=property_type
+    try:
+        opportunities = _cached(
+            'investment_opportunities',
+            {'city': city, 'budget': budget, 'type': property_type, 'limit': limit, 'min_roi': min_roi}
         )
         return jsonify(opportunities)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return _server_error(e)
+
+@api_bp.route('/properties')
+def search_properties():
+    try:
+        city = request.args.get('city', 'toronto')
+        property_type = request.args.get('type', 'all')
+        min_price = float(request.args.get('min_price', 0))
+        max_price = float(request.args.get('max_price', float('inf')))
+        limit = min(int(request.args.get('limit', 20)), Config.PROPERTY_SEARCH_MAX_LIMIT)
+        fields = request.args.get('fields')
+        
+        page = property_service.search_properties_page(
+            city=city,
+            property_type=property_type,
+            price_range=(min_price, max_price),
+            limit=max(limit, 1),
+            sort=request.args.get('sort', 'price'),
+            cursor=request.args.get('cursor'),
+            fields=fields.split(',') if fields else None
+        )
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return _server_error(e)
+
+@api_bp.route('/properties/export')
+def export_properties():
+    try:
+        city = request.args.get('city', 'toronto')
+        property_type = request.args.get('type', 'all')
+        min_price = float(request.args.get('min_price', 0))
+        max_price = float(request.args.get('max_price', float('inf')))
+        fields = request.args.get('fields')
+        compress = request.args.get('gzip', 'false').lower() in ('1', 'true')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+        
+    chunks = property_service.export_ndjson(
+        city=city,
+        property_type=property_type,
+        price_range=(min_price, max_price),
+        fields=fields.split(',') if fields else None,
+        batch_size=Config.EXPORT_BATCH_SIZE,
+        chunk_size=Config.EXPORT_CHUNK_SIZE,
+        compress=compress
+    )
+    
+    headers = {'Content-Disposition': f'attachment; filename="{city.lower()}-properties.ndjson"'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype='application/x-ndjson', headers=headers)
+
+@api_bp.route('/valuations/batch', methods=['POST'])
+def get_batch_valuations():
+    try:
+        payload = request.get_json(silent=True) or {}
+        properties = payload.get('properties') if isinstance(payload, dict) else None
+        if not isinstance(properties, list) or not properties:
+            raise ValueError("Request body must contain a non-empty 'properties' list")
+        if len(properties) > Config.VALUATION_BATCH_MAX_SIZE:
+            raise ValueError(f"Batch size exceeds {Config.VALUATION_BATCH_MAX_SIZE} properties")
+            
+        required_fields = ['city', 'property_type', 'square_feet']
+        for i, property_data in enumerate(properties):
+            if not isinstance(property_data, dict):
+                raise ValueError(f"Property {i}: must be an object")
+            for field in required_fields:
+                if field not in property_data:
+                    raise ValueError(f"Property {i}: missing required field: {field}")
+            if not isinstance(property_data['city'], str):
+                raise ValueError(f"Property {i}: city must be a string")
+            property_data['city'] = property_data['city'].lower()
+        
+        valuations = valuation_service.get_valuations(properties)
+        return jsonify({'valuations': valuations})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return _server_error(e)
+
+@api_bp.route('/cache-stats')
+def get_cache_stats():
+    return jsonify(response_cache.stats())
+
+@api_bp.route('/cache-prewarm')
+def get_cache_prewarm_status():
+    return jsonify(cache_prewarmer.status())
+
+@api_bp.route('/slow-queries')
+def get_slow_queries():
+    try:
+        limit = max(min(int(request.args.get('limit', 50)), 500), 1)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+        
+    monitor = get_query_monitor()
+    if monitor is None:
+        return jsonify({'enabled': False, 'queries': []})
+    return jsonify({'enabled': True, **monitor.stats(), 'queries': monitor.recent(limit)})
@@ -1,6 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+import heapq
 from database.mongodb import get_database
+from services.market_series import MarketSeries
 import numpy as np
 from sklearn.linear_model import LinearRegression
 
@@ -8,57 +10,32 @@ class AnalyticsService:
     def __init__(self):
         self.db = get_database()
         self.properties = self.db.properties
+        self.market_series = MarketSeries()
     
     def get_market_trends(self, city: str, period: str = '1y') -> Dict[str, Any]:
-        """Get detailed market trends analysis"""
+        """Get detailed market trends analysis
+
+        Reads the monthly rows of the market series, so the first month of
+        the period counts in full.
+        """
         end_date = datetime.utcnow()
         start_date = self._get_start_date(end_date, period)
         
-        pipeline = [
-            {
-                '$match': {
-                    'city': city,
-                    'sold_date': {
-                        '$gte': start_date,
-                        '$lte': end_date
-                    }
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        'year': {'$year': '$sold_date'},
-                        'month': {'$month': '$sold_date'}
-                    },
-                    'avg_price': {'$avg': '$price'},
-                    'total_sales': {'$sum': 1},
-                    'avg_days_on_market': {
-                        '$avg': {
-                            '$divide': [
-                                {'$subtract': ['$sold_date', '$listed_date']},
-                                24 * 60 * 60 * 1000
-                            ]
-                        }
-                    }
-                }
-            },
-            {'$sort': {'_id.year': 1, '_id.month': 1}}
-        ]
-        
-        results = list(self.properties.aggregate(pipeline))
+        # One pre-aggregated city-wide row per month
+        results = self.market_series.monthly(city, start_date, end_date)
         
         # Calculate price trends and predictions
         prices = [r['avg_price'] for r in results]
-        dates = [datetime(r['_id']['year'], r['_id']['month'], 1) for r in results]
+        dates = [r['month'] for r in results]
         
         predictions = self._predict_prices(dates, prices, 6)  # 6 months forecast
         
         return {
             'historical_data': [
                 {
-                    'date': f"{r['_id']['year']}-{r['_id']['month']:02d}",
+                    'date': r['month'].strftime('%Y-%m'),
                     'avg_price': r['avg_price'],
-                    'total_sales': r['total_sales'],
+                    'total_sales': r['sales'],
                     'avg_days_on_market': r['avg_days_on_market']
                 }
                 for r in results
@@ -109,6 +86,12 @@ class AnalyticsService:
         
         results = list(self.properties.aggregate(pipeline))
         
+        # One grouped aggregation covers the price series of every neighborhood
+        price_trends = self._get_neighborhood_price_trends(
+            city,
+            [r['_id'] for r in results]
+        )
+        
         return {
             'neighborhoods': [
                 {
@@ -120,7 +103,10 @@ class AnalyticsService:
                         'avg_days_on_market': r['avg_days_on_market']
                     },
                     'amenities': self._summarize_amenities(r['amenities']),
-                    'score': self._calculate_neighborhood_score(r)
+                    'score': self._calculate_neighborhood_score(
+                        r,
+                        price_trends.get(r['_id'], 0)
+                    )
                 }
                 for r in results
             ],
@@ -131,9 +117,21 @@ class AnalyticsService:
         self,
         city: str,
         budget: float,
-        property_type: str = 'all'
+        property_type: str = 'all',
+        limit: int = 10,
+        min_roi: float = 5.0,
+        batch_size: int = 500
     ) -> List[Dict[str, Any]]:
-        """Find investment opportunities based on criteria"""
+        """Find investment opportunities based on criteria
+
+        Listings whose ROI cannot reach ``min_roi`` are screened out in the
+        database using per-neighborhood price-per-sqft ceilings; the rest
+        are streamed in batches through a bounded heap, so memory stays at
+        ``limit`` entries however many listings match.
+        """
+        if limit <= 0:
+            return []
+            
         match_query = {
             'city': city,
             'price': {'$lte': budget},
@@ -143,39 +141,60 @@ class AnalyticsService:
         if property_type != 'all':
             match_query['property_type'] = property_type
             
+        neighborhood_stats = self._get_neighborhood_market_stats(city)
+        roi_screen = self._build_roi_screen(neighborhood_stats, min_roi, budget)
+        if roi_screen is None:
+            return []
+            
         pipeline = [
             {'$match': match_query},
             {
-                '$lookup': {
-                    'from': 'market_data',
-                    'localField': 'neighborhood',
-                    'foreignField': 'neighborhood',
-                    'as': 'market_data'
+                '$project': {
+                    'address': 1,
+                    'price': 1,
+                    'property_type': 1,
+                    'square_feet': 1,
+                    'neighborhood': 1,
+                    'price_per_sqft': {
+                        '$cond': [
+                            {'$gt': ['$square_feet', 0]},
+                            {'$divide': ['$price', '$square_feet']},
+                            None
+                        ]
+                    }
                 }
-            }
+            },
+            {'$match': roi_screen}
         ]
         
-        properties = list(self.properties.aggregate(pipeline))
-        
-        # Calculate investment metrics for each property
-        opportunities = []
-        for prop in properties:
-            metrics = self._calculate_investment_metrics(prop)
-            if metrics['roi_potential'] >= 5:  # Min 5% ROI potential
-                opportunities.append({
-                    'property': {
-                        'id': str(prop['_id']),
-                        'address': prop['address'],
-                        'price': prop['price'],
-                        'type': prop['property_type'],
-                        'square_feet': prop['square_feet']
-                    },
-                    'metrics': metrics
-                })
+        # Keep the top `limit` by ROI; earlier listings win ties
+        heap = []
+        cursor = self.properties.aggregate(pipeline, batchSize=batch_size)
+        for seq, prop in enumerate(cursor):
+            stats = neighborhood_stats.get(prop.get('neighborhood'), {})
+            metrics = self._calculate_investment_metrics(prop, stats)
+            if metrics['roi_potential'] < min_roi:
+                continue
+                
+            entry = (metrics['roi_potential'], -seq, prop, metrics)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
         
-        # Sort by ROI potential
-        opportunities.sort(key=lambda x: x['metrics']['roi_potential'], reverse=True)
-        return opportunities[:10]  # Top 10 opportunities
+        return [
+            {
+                'property': {
+                    'id': str(prop['_id']),
+                    'address': prop['address'],
+                    'price': prop['price'],
+                    'type': prop['property_type'],
+                    'square_feet': prop.get('square_feet')
+                },
+                'metrics': metrics
+            }
+            for _, _, prop, metrics in sorted(heap, key=lambda e: e[:2], reverse=True)
+        ]
     
     def _get_start_date(self, end_date: datetime, period: str) -> datetime:
         """Calculate start date based on period"""
@@ -245,7 +264,7 @@ class AnalyticsService:
         ]
         
         sales_changes = [
-            (r['total_sales'] - data[i-1]['total_sales']) / data[i-1]['total_sales']
+            (r['sales'] - data[i-1]['sales']) / data[i-1]['sales']
             for i, r in enumerate(recent) if i > 0
         ]
         
@@ -284,19 +303,19 @@ class AnalyticsService:
             'restaurants': sum(1 for a in amenities if a['type'] == 'restaurant')
         }
     
-    def _calculate_neighborhood_score(self, data: Dict[str, Any]) -> float:
+    def _calculate_neighborhood_score(self, data: Dict[str, Any], price_trend: float) -> float:
         """Calculate overall neighborhood score"""
         # Implement scoring logic based on various metrics
         scores = []
         
         # Price trend score (30%)
-        price_trend = self._calculate_price_trend(data['_id'])
         scores.append(min(100, max(0, price_trend * 20)) * 0.3)
         
         # Market activity score (20%)
         days_on_market = data['avg_days_on_market']
-        market_score = 100 * (1 - min(1, days_on_market / 90))
-        scores.append(market_score * 0.2)
+        if days_on_market is not None:
+            market_score = 100 * (1 - min(1, days_on_market / 90))
+            scores.append(market_score * 0.2)
         
         # Amenities score (30%)
         if data.get('amenities'):
@@ -305,52 +324,154 @@ class AnalyticsService:
             scores.append(amenity_score * 0.3)
         
         # Investment potential score (20%)
-        roi_potential = self._calculate_roi_potential(data)
+        roi_potential = self._calculate_roi_potential(data, price_trend)
         scores.append(min(100, roi_potential * 10) * 0.2)
         
         return round(sum(scores), 2)
     
-    def _calculate_price_trend(self, neighborhood: str) -> float:
+    def _calculate_price_trend(self, city: str, neighborhood: str) -> float:
         """Calculate price trend for a neighborhood"""
+        return self._get_neighborhood_price_trends(city, [neighborhood]).get(neighborhood, 0)
+    
+    def _get_neighborhood_price_trends(
+        self,
+        city: str,
+        neighborhoods: List[str]
+    ) -> Dict[str, float]:
+        """Calculate 1-year price trends for many neighborhoods from the market series"""
+        if not neighborhoods:
+            return {}
+            
+        one_year_ago = datetime.utcnow() - timedelta(days=365)
+        
+        series = {}
+        for r in self.market_series.monthly(city, one_year_ago, neighborhoods=neighborhoods):
+            series.setdefault(r['neighborhood'], []).append(r['avg_price'])
+        
+        trends = {}
+        for neighborhood, prices in series.items():
+            if len(prices) < 2:
+                trends[neighborhood] = 0
+                continue
+            trends[neighborhood] = (prices[-1] - prices[0]) / prices[0]
+            
+        return trends
+    
+    def _calculate_roi_potential(self, data: Dict[str, Any], price_trend: float) -> float:
+        """Calculate ROI potential based on various factors"""
+        # Implement ROI calculation logic
+        rental_yield = self._estimate_rental_yield(data)
+        
+        # Weight factors
+        roi = (price_trend * 0.6) + (rental_yield * 0.4)
+        return max(0, roi * 100)
+    
+    def _get_neighborhood_market_stats(self, city: str) -> Dict[str, Dict[str, float]]:
+        """Get 1-year price per sqft and price trend for every neighborhood in a city"""
         one_year_ago = datetime.utcnow() - timedelta(days=365)
         
         pipeline = [
             {
                 '$match': {
-                    'neighborhood': neighborhood,
-                    'sold_date': {'$gte': one_year_ago}
+                    'city': city,
+                    'sold_date': {'$gte': one_year_ago},
+                    'square_feet': {'$gt': 0}
                 }
             },
             {
                 '$group': {
-                    '_id': {
-                        'year': {'$year': '$sold_date'},
-                        'month': {'$month': '$sold_date'}
-                    },
-                    'avg_price': {'$avg': '$price'}
+                    '_id': '$neighborhood',
+                    'price_per_sqft': {
+                        '$avg': {'$divide': ['$price', '$square_feet']}
+                    }
                 }
-            },
-            {'$sort': {'_id.year': 1, '_id.month': 1}}
+            }
         ]
         
-        results = list(self.properties.aggregate(pipeline))
-        if len(results) < 2:
-            return 0
-            
-        first_price = results[0]['avg_price']
-        last_price = results[-1]['avg_price']
+        stats = {
+            r['_id']: {'price_per_sqft': r['price_per_sqft']}
+            for r in self.properties.aggregate(pipeline)
+        }
         
-        return (last_price - first_price) / first_price
+        price_trends = self._get_neighborhood_price_trends(city, list(stats))
+        for neighborhood, neighborhood_stats in stats.items():
+            neighborhood_stats['price_trend'] = price_trends.get(neighborhood, 0)
+            
+        return stats
     
-    def _calculate_roi_potential(self, data: Dict[str, Any]) -> float:
-        """Calculate ROI potential based on various factors"""
-        # Implement ROI calculation logic
-        price_trend = self._calculate_price_trend(data['_id'])
-        rental_yield = self._estimate_rental_yield(data)
+    def _calculate_investment_metrics(
+        self,
+        prop: Dict[str, Any],
+        neighborhood_stats: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Calculate investment metrics for a listing
+
+        ROI potential weighs the neighborhood price trend (60%), the rental
+        yield (40%) and half of the listing's discount to the neighborhood's
+        price per sqft.
+        """
+        price_trend = neighborhood_stats.get('price_trend', 0)
+        market_price_per_sqft = neighborhood_stats.get('price_per_sqft')
+        price_per_sqft = prop.get('price_per_sqft')
+        rental_yield = self._estimate_rental_yield({'avg_price': prop['price']})
         
-        # Weight factors
-        roi = (price_trend * 0.6) + (rental_yield * 0.4)
-        return max(0, roi * 100)
+        value_gap = 0
+        if price_per_sqft and market_price_per_sqft:
+            value_gap = (market_price_per_sqft - price_per_sqft) / market_price_per_sqft
+        
+        roi = (price_trend * 0.6) + (rental_yield * 0.4) + (value_gap * 0.5)
+        
+        return {
+            'roi_potential': round(max(0, roi * 100), 2),
+            'rental_yield': round(rental_yield * 100, 2),
+            'price_trend': round(price_trend * 100, 2),
+            'value_gap': round(value_gap * 100, 2),
+            'price_per_sqft': round(price_per_sqft, 2) if price_per_sqft else None,
+            'market_price_per_sqft': round(market_price_per_sqft, 2) if market_price_per_sqft else None
+        }
+    
+    def _build_roi_screen(
+        self,
+        neighborhood_stats: Dict[str, Dict[str, float]],
+        min_roi: float,
+        reference_price: float
+    ) -> Optional[Dict[str, Any]]:
+        """Build a $match that drops listings whose ROI cannot reach min_roi
+
+        Within a neighborhood ROI only varies with the listing's price per
+        sqft, so the threshold becomes a per-neighborhood price-per-sqft
+        ceiling. Returns None when no listing can qualify.
+        """
+        # The 0.4% rule makes the yield independent of the price
+        rental_yield = self._estimate_rental_yield({'avg_price': reference_price})
+        required = min_roi / 100
+        
+        def base_roi(price_trend):
+            return (price_trend * 0.6) + (rental_yield * 0.4)
+        
+        clauses = []
+        unconditional = []
+        for neighborhood, stats in neighborhood_stats.items():
+            base = base_roi(stats['price_trend'])
+            if base >= required:
+                unconditional.append(neighborhood)
+            elif stats['price_per_sqft']:
+                ceiling = stats['price_per_sqft'] * (1 - (required - base) / 0.5)
+                if ceiling > 0:
+                    clauses.append({
+                        'neighborhood': neighborhood,
+                        'price_per_sqft': {'$lte': ceiling}
+                    })
+        
+        # Neighborhoods without recent sales have no trend or price reference
+        if base_roi(0) >= required:
+            clauses.append({'neighborhood': {'$nin': list(neighborhood_stats)}})
+        if unconditional:
+            clauses.append({'neighborhood': {'$in': unconditional}})
+            
+        if not clauses:
+            return None
+        return {'$or': clauses}
     
     def _estimate_rental_yield(self, data: Dict[str, Any]) -> float:
         """Estimate rental yield for a property"""
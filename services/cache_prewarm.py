@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from database.mongodb import get_database
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+LOCK_ID = 'cache_prewarm_lock'
+
+class CachePrewarmer:
+    """Recomputes the most requested cache entries before they expire.
+
+    Every ``interval`` seconds each worker adds the requests its
+    ResponseCache saw to hourly counters in ``cache_hot_keys``. The
+    ``top_keys`` most requested (endpoint, args) pairs of the last
+    ``window`` seconds whose entry is missing or expires within ``lead``
+    seconds are then recomputed on ``concurrency`` threads.
+
+    With a shared cache backend only the worker holding the lease document
+    in ``cache_meta`` warms; with per-process caches every worker warms
+    its own.
+    """
+
+    def __init__(
+        self,
+        cache: Any,
+        computations: Dict[str, Callable[[Dict[str, Any]], Any]],
+        interval: Optional[int] = None,
+        top_keys: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        lead: Optional[int] = None,
+        window: Optional[int] = None
+    ):
+        self.cache = cache
+        self.computations = computations
+        self.interval = interval or Config.CACHE_PREWARM_INTERVAL
+        self.top_keys = top_keys or Config.CACHE_PREWARM_TOP_KEYS
+        self.concurrency = concurrency or Config.CACHE_PREWARM_CONCURRENCY
+        self.lead = lead if lead is not None else Config.CACHE_PREWARM_LEAD
+        self.window = window or Config.CACHE_PREWARM_WINDOW
+        self.db = get_database()
+        self.hot_keys_collection = self.db.cache_hot_keys
+        self.locks = self.db.cache_meta
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._queue_depth = 0
+        self._runs = 0
+        self._lock_held = None
+        self._last_run = None
+        self._keys = {}
+
+    def start(self) -> None:
+        """Start the background thread (once per process)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='cache-prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> Dict[str, Any]:
+        """Record request counts, then warm the hot keys that are due"""
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        self.record_requests()
+
+        run = {'started_at': started_at, 'candidates': 0, 'warmed': 0, 'failed': 0, 'fresh': 0}
+        self._lock_held = self._acquire_lock() if self.cache.backend.shared else None
+        if self._lock_held is False:
+            run['skipped'] = 'lease held by another worker'
+        else:
+            hot = self.hot_keys(self.top_keys)
+            run['candidates'] = len(hot)
+            due = []
+            for entry in hot:
+                remaining = self.cache.remaining_ttl(entry['endpoint'], entry['args'])
+                if remaining is None or remaining <= self.lead:
+                    due.append(entry)
+                else:
+                    run['fresh'] += 1
+            self._warm(due, run)
+            with self._lock:
+                self._keys = {
+                    _label(e): self._keys.get(_label(e), {'endpoint': e['endpoint'], 'args': e['args']})
+                    for e in hot
+                }
+                for entry in hot:
+                    self._keys[_label(entry)]['requests'] = entry['count']
+
+        run['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self._runs += 1
+            self._last_run = run
+        return run
+
+    def record_requests(self) -> int:
+        """Add this worker's request counts to the shared hourly counters"""
+        now = datetime.utcnow()
+        bucket = now.replace(minute=0, second=0, microsecond=0)
+        operations = []
+        for (endpoint, args), count in self.cache.drain_requests().items():
+            if endpoint not in self.computations:
+                continue
+            key = json.dumps([endpoint, args], separators=(',', ':'), default=str)
+            operations.append(UpdateOne(
+                {'_id': f'{key}@{bucket.isoformat()}'},
+                {
+                    '$inc': {'count': count},
+                    '$set': {'last_requested': now},
+                    '$setOnInsert': {'key': key, 'endpoint': endpoint, 'args': [list(a) for a in args], 'bucket': bucket}
+                },
+                upsert=True
+            ))
+        if operations:
+            self.hot_keys_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def hot_keys(self, limit: int) -> List[Dict[str, Any]]:
+        """Most requested (endpoint, args) over the window, busiest first"""
+        since = (datetime.utcnow() - timedelta(seconds=self.window)).replace(minute=0, second=0, microsecond=0)
+        pipeline = [
+            {'$match': {'bucket': {'$gte': since}}},
+            {
+                '$group': {
+                    '_id': '$key',
+                    'endpoint': {'$first': '$endpoint'},
+                    'args': {'$first': '$args'},
+                    'count': {'$sum': '$count'}
+                }
+            },
+            {'$sort': {'count': -1, '_id': 1}},
+            {'$limit': limit}
+        ]
+        return [
+            {'endpoint': r['endpoint'], 'args': dict(r['args']), 'count': r['count']}
+            for r in self.hot_keys_collection.aggregate(pipeline)
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'owner': self.owner,
+                'lock_held': self._lock_held,
+                'interval': self.interval,
+                'queue_depth': self._queue_depth,
+                'runs': self._runs,
+                'last_run': dict(self._last_run) if self._last_run else None,
+                'keys': sorted(
+                    (dict(info) for info in self._keys.values()),
+                    key=lambda info: -info.get('requests', 0)
+                )
+            }
+
+    def _warm(self, due: List[Dict[str, Any]], run: Dict[str, Any]) -> None:
+        with self._lock:
+            self._queue_depth = len(due)
+        if not due:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._warm_one, entry): entry for entry in due}
+            for future in as_completed(futures):
+                entry = futures[future]
+                duration_ms, error = future.result()
+                with self._lock:
+                    self._queue_depth -= 1
+                    info = self._keys.setdefault(_label(entry), {'endpoint': entry['endpoint'], 'args': entry['args']})
+                    info['last_duration_ms'] = duration_ms
+                    info['warmed_at'] = datetime.utcnow()
+                    info['error'] = error
+                run['failed' if error else 'warmed'] += 1
+
+    def _warm_one(self, entry: Dict[str, Any]):
+        """Runs on a worker thread; failures are reported, not raised"""
+        compute = self.computations[entry['endpoint']]
+        args = entry['args']
+        started = time.perf_counter()
+        error = None
+        try:
+            self.cache.refresh(entry['endpoint'], args, lambda: compute(args))
+        except Exception as e:
+            logger.warning("Pre-warming %s %s failed: %s", entry['endpoint'], args, e)
+            error = str(e)
+        return round((time.perf_counter() - started) * 1000, 1), error
+
+    def _acquire_lock(self) -> bool:
+        """Take or extend the lease; it outlives two missed runs"""
+        now = datetime.utcnow()
+        try:
+            self.locks.find_one_and_update(
+                {'_id': LOCK_ID, '$or': [{'owner': self.owner}, {'expires_at': {'$lte': now}}]},
+                {'$set': {'owner': self.owner, 'expires_at': now + timedelta(seconds=self.interval * 2)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Cache pre-warm run failed")
+
+def _label(entry: Dict[str, Any]) -> str:
+    return json.dumps([entry['endpoint'], sorted(entry['args'].items())], default=str)
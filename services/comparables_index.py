@@ -0,0 +1,292 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from sklearn.neighbors import KDTree
+from database.mongodb import get_database
+
+# Feature scaling: one unit of distance is roughly 250 sqft, one bedroom,
+# one bathroom, 1000 sqft of lot, ten years of age or two kilometres. The
+# scales are fixed rather than fitted so incremental inserts never change
+# the geometry of an existing tree.
+FEATURE_SCALES = {
+    'square_feet': 250.0,
+    'bedrooms': 1.0,
+    'bathrooms': 1.0,
+    'lot_size': 1000.0,
+    'year_built': 10.0
+}
+FEATURE_DEFAULTS = {'year_built': 2000}
+LOCATION_SCALE_KM = 2.0
+KM_PER_DEGREE = 111.32
+
+PROJECTION = [
+    'address', 'price', 'sold_date', 'city', 'property_type', 'location',
+    *FEATURE_SCALES
+]
+
+class _Partition:
+    """Recent sales of one (city, property type).
+
+    Rows ``[0, tree_size)`` are indexed by the KD-trees; rows appended since
+    the last rebuild sit in a small buffer that is searched by brute force.
+    Two trees are kept: one over features only, and one over features plus
+    coordinates for the rows that have a location.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.sold_at = np.empty(0)
+        self.features = np.empty((0, len(FEATURE_SCALES)))
+        self.coords = np.empty((0, 2))
+        self.tree_size = 0
+        self.feature_tree = None
+        self.geo_tree = None
+        self.geo_rows = np.empty(0, dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @property
+    def buffered(self) -> int:
+        return len(self.docs) - self.tree_size
+
+    def add(self, docs: List[Dict[str, Any]]) -> None:
+        self.docs.extend(docs)
+        self.sold_at = np.concatenate([self.sold_at, [d['sold_date'].timestamp() for d in docs]])
+        self.features = np.vstack([self.features, [_feature_vector(d) for d in docs]])
+        self.coords = np.vstack([self.coords, [_coordinate_vector(_doc_coordinates(d)) for d in docs]])
+
+    def expired(self, cutoff: float) -> int:
+        return int(np.count_nonzero(self.sold_at < cutoff))
+
+    def rebuild(self, cutoff: float) -> None:
+        """Drop expired sales and index every remaining row"""
+        keep = np.flatnonzero(self.sold_at >= cutoff)
+        self.docs = [self.docs[i] for i in keep]
+        self.sold_at = self.sold_at[keep]
+        self.features = self.features[keep]
+        self.coords = self.coords[keep]
+        self.tree_size = len(self.docs)
+
+        self.feature_tree = KDTree(self.features) if self.tree_size else None
+        self.geo_rows = np.flatnonzero(~np.isnan(self.coords[:, 0]))
+        self.geo_tree = (
+            KDTree(np.hstack([self.features[self.geo_rows], self.coords[self.geo_rows]]))
+            if len(self.geo_rows) else None
+        )
+
+    def query(
+        self,
+        features: np.ndarray,
+        coords: Optional[np.ndarray],
+        k: int,
+        cutoff: float
+    ) -> List[Tuple[float, int]]:
+        """Return (distance, row) for the k nearest unexpired rows
+
+        With coordinates, located rows are ranked by feature and location
+        distance; if fewer than k of them are live the rest are filled from
+        the feature-only search, so unlocated sales still count.
+        """
+        buffer_rows = np.arange(self.tree_size, len(self.docs))
+        nearest = []
+
+        if coords is not None:
+            located = buffer_rows[~np.isnan(self.coords[buffer_rows, 0])]
+            nearest = self._nearest(
+                np.concatenate([features, coords]),
+                self.geo_tree, self.geo_rows,
+                located, np.hstack([self.features[located], self.coords[located]]),
+                k, cutoff
+            )
+            if len(nearest) == k:
+                return nearest
+
+        chosen = {row for _, row in nearest}
+        fallback = self._nearest(
+            features,
+            self.feature_tree, np.arange(self.tree_size),
+            buffer_rows, self.features[buffer_rows],
+            k + len(chosen), cutoff
+        )
+        return nearest + [(d, row) for d, row in fallback if row not in chosen][:k - len(nearest)]
+
+    def _nearest(
+        self,
+        point: np.ndarray,
+        tree: Optional[KDTree],
+        tree_rows: np.ndarray,
+        buffer_rows: np.ndarray,
+        buffer_points: np.ndarray,
+        k: int,
+        cutoff: float
+    ) -> List[Tuple[float, int]]:
+        distances = [np.empty(0)]
+        rows = [np.empty(0, dtype=int)]
+
+        if tree is not None:
+            # Over-fetch by the number of expired rows so k live rows remain
+            fetch = min(len(tree_rows), k + self.expired(cutoff))
+            tree_distances, tree_idx = tree.query(point.reshape(1, -1), k=fetch)
+            distances.append(tree_distances[0])
+            rows.append(tree_rows[tree_idx[0]])
+
+        if len(buffer_rows):
+            distances.append(np.linalg.norm(buffer_points - point, axis=1))
+            rows.append(buffer_rows)
+
+        distances = np.concatenate(distances)
+        rows = np.concatenate(rows)
+        alive = self.sold_at[rows] >= cutoff
+        distances, rows = distances[alive], rows[alive]
+        order = np.argsort(distances, kind='stable')[:k]
+
+        return [(float(distances[i]), int(rows[i])) for i in order]
+
+class ComparablesIndex:
+    """Nearest-neighbour index over recent sales, per (city, property type).
+
+    The first query loads every sale in the window. After that the index is
+    refreshed at most once per ``refresh_interval`` seconds by fetching only
+    sales at or after the last seen ``sold_date`` (minus a small overlap for
+    late-arriving records, deduplicated by ``_id``). New rows are buffered
+    and a partition's trees are only rebuilt once its buffer or its expired
+    rows exceed ``compaction_ratio`` of its size.
+    """
+
+    def __init__(
+        self,
+        window_days: int = 180,
+        refresh_interval: float = 60,
+        compaction_ratio: float = 0.25,
+        min_buffer: int = 64,
+        overlap: timedelta = timedelta(days=1)
+    ):
+        self.db = get_database()
+        self.properties_collection = self.db.properties
+        self.window = timedelta(days=window_days)
+        self.refresh_interval = refresh_interval
+        self.compaction_ratio = compaction_ratio
+        self.min_buffer = min_buffer
+        self.overlap = overlap
+        self._partitions = {}
+        self._ids = set()
+        self._watermark = None
+        self._refreshed_at = None
+        self._lock = threading.RLock()
+
+    def query(self, property_data: Dict[str, Any], k: int = 3) -> List[Dict[str, Any]]:
+        """Get the k most similar recent sales of the same city and type"""
+        self._maybe_refresh()
+        cutoff = (datetime.utcnow() - self.window).timestamp()
+
+        with self._lock:
+            partition = self._partitions.get((property_data['city'], property_data['property_type']))
+            if partition is None or not len(partition):
+                return []
+
+            coords = _subject_coordinates(property_data)
+            neighbours = partition.query(
+                _feature_vector(property_data),
+                _coordinate_vector(coords) if coords else None,
+                k,
+                cutoff
+            )
+            return [partition.docs[row] for _, row in neighbours]
+
+    def refresh(self) -> int:
+        """Load sales since the watermark, returning the number added"""
+        with self._lock:
+            now = datetime.utcnow()
+            cutoff = now - self.window
+            since = cutoff
+            if self._watermark is not None:
+                since = max(cutoff, self._watermark - self.overlap)
+
+            new_docs = {}
+            for doc in self.properties_collection.find({'sold_date': {'$gte': since}}, PROJECTION):
+                if doc['_id'] in self._ids:
+                    continue
+                self._ids.add(doc['_id'])
+                if self._watermark is None or doc['sold_date'] > self._watermark:
+                    self._watermark = doc['sold_date']
+                # Sales without a city or type can never match a query, and
+                # without a floor area they cannot be compared
+                key = (doc.get('city'), doc.get('property_type'))
+                if None not in key and _has_floor_area(doc):
+                    new_docs.setdefault(key, []).append(doc)
+
+            for key, docs in new_docs.items():
+                self._partitions.setdefault(key, _Partition()).add(docs)
+
+            self._compact(cutoff.timestamp())
+            self._refreshed_at = time.monotonic()
+            return sum(len(docs) for docs in new_docs.values())
+
+    def rebuild(self) -> int:
+        """Discard the index and reload the whole window"""
+        with self._lock:
+            self._partitions = {}
+            self._ids = set()
+            self._watermark = None
+            return self.refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        """Partition sizes, buffered rows and the current watermark"""
+        with self._lock:
+            return {
+                'partitions': len(self._partitions),
+                'rows': sum(len(p) for p in self._partitions.values()),
+                'buffered': sum(p.buffered for p in self._partitions.values()),
+                'watermark': self._watermark
+            }
+
+    def _maybe_refresh(self) -> None:
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def _compact(self, cutoff: float) -> None:
+        for key, partition in list(self._partitions.items()):
+            threshold = max(self.min_buffer, self.compaction_ratio * len(partition))
+            if partition.tree_size == 0 or partition.buffered > threshold or partition.expired(cutoff) > threshold:
+                for doc in partition.docs:
+                    if doc['sold_date'].timestamp() < cutoff:
+                        self._ids.discard(doc['_id'])
+                partition.rebuild(cutoff)
+            if not len(partition):
+                del self._partitions[key]
+
+def _feature_vector(property_data: Dict[str, Any]) -> np.ndarray:
+    return np.array([
+        float(property_data.get(name) or FEATURE_DEFAULTS.get(name, 0)) / scale
+        for name, scale in FEATURE_SCALES.items()
+    ])
+
+def _has_floor_area(doc: Dict[str, Any]) -> bool:
+    square_feet = doc.get('square_feet')
+    return isinstance(square_feet, (int, float)) and not isinstance(square_feet, bool) and square_feet > 0
+
+def _doc_coordinates(doc: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    coordinates = (doc.get('location') or {}).get('coordinates')
+    if not coordinates:
+        return None
+    longitude, latitude = coordinates
+    return float(latitude), float(longitude)
+
+def _subject_coordinates(property_data: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    if property_data.get('latitude') is not None and property_data.get('longitude') is not None:
+        return float(property_data['latitude']), float(property_data['longitude'])
+    return _doc_coordinates(property_data)
+
+def _coordinate_vector(coords: Optional[Tuple[float, float]]) -> np.ndarray:
+    """Project (lat, lon) onto a local km grid, scaled like the features"""
+    if coords is None:
+        return np.array([np.nan, np.nan])
+    latitude, longitude = coords
+    return np.array([
+        latitude * KM_PER_DEGREE / LOCATION_SCALE_KM,
+        longitude * KM_PER_DEGREE * math.cos(math.radians(latitude)) / LOCATION_SCALE_KM
+    ])
@@ -0,0 +1,290 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from database.mongodb import get_database
+from services.response_cache import DataVersion
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Listing windows kept in every rollup document, in days ('all' is unbounded)
+ROLLUP_WINDOWS = {
+    'monthly': 30,
+    'quarterly': 90,
+    'yearly': 365
+}
+
+HOT_NEIGHBORHOOD_WINDOW = 'quarterly'
+HOT_NEIGHBORHOOD_LIMIT = 5
+
+class MarketRollupService:
+    """Materialized per-city and per-neighborhood listing rollups.
+
+    A refresh scans a city's listings once and stores one city document plus
+    one document per neighborhood in the ``market_rollups`` collection, so
+    the market overview is served from keyed lookups instead of collection
+    scans. Listing ages are stored relative to ``refreshed_at`` and shifted
+    to the read time, so days-on-market stay exact between refreshes.
+
+    Cities are independent, so refreshing several of them fans out over a
+    thread pool (sharing the pooled MongoClient) of at most ``concurrency``
+    workers, and each refresh aggregation is bounded by ``timeout_ms``
+    through maxTimeMS. Latency is then roughly that of the slowest city.
+    """
+
+    def __init__(
+        self,
+        max_age: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        self.db = get_database()
+        self.properties_collection = self.db.properties
+        self.rollups_collection = self.db.market_rollups
+        self.data_version = DataVersion()
+        self.max_age = timedelta(
+            seconds=Config.ROLLUP_MAX_AGE if max_age is None else max_age
+        )
+        self.concurrency = concurrency or Config.ROLLUP_REFRESH_CONCURRENCY
+        self.timeout_ms = Config.ROLLUP_QUERY_TIMEOUT_MS if timeout_ms is None else timeout_ms
+
+    def get_city_rollups(
+        self,
+        cities: Iterable[str],
+        refresh_stale: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get city rollups in one lookup, refreshing missing or stale ones"""
+        cities = list(cities)
+        now = datetime.utcnow()
+        docs = {
+            doc['city']: doc for doc in self.rollups_collection.find({
+                '_id': {'$in': [self._city_key(city) for city in cities]}
+            })
+        }
+        rollups = {
+            city: doc for city, doc in docs.items()
+            if not self.is_stale(doc, now)
+        }
+
+        if refresh_stale:
+            stale = [city for city in cities if city not in rollups]
+            for city, result in self._refresh_concurrently(stale).items():
+                if isinstance(result, Exception):
+                    # Serve the stale rollup rather than fail the whole page
+                    if city not in docs:
+                        raise result
+                    logger.warning("Error refreshing rollup for %s, serving the stale one: %s", city, result, exc_info=result)
+                    result = docs[city]
+                rollups[city] = result
+
+        return rollups
+
+    def get_city_rollup(self, city: str, refresh_stale: bool = True) -> Optional[Dict[str, Any]]:
+        """Get the rollup for a single city"""
+        return self.get_city_rollups([city], refresh_stale).get(city)
+
+    def get_neighborhood_rollup(self, city: str, neighborhood: str) -> Optional[Dict[str, Any]]:
+        """Get the stored rollup for a neighborhood, or None if absent or stale"""
+        doc = self.rollups_collection.find_one({
+            '_id': self._neighborhood_key(city, neighborhood)
+        })
+        if doc is None or self.is_stale(doc):
+            return None
+        return doc
+
+    def is_stale(self, rollup: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+        """Check whether a rollup is older than the staleness bound"""
+        now = now or datetime.utcnow()
+        return now - rollup['refreshed_at'] > self.max_age
+
+    def refresh(self, cities: Iterable[str]) -> Dict[str, int]:
+        """Rebuild rollups for the given cities, returning neighborhoods per city"""
+        counts = {}
+        for city, rollup in self._refresh_concurrently(list(cities)).items():
+            if isinstance(rollup, Exception):
+                raise rollup
+            counts[city] = rollup['neighborhood_count']
+        # An explicit refresh follows writes that bypassed the services
+        if counts:
+            self.data_version.bump()
+        return counts
+
+    def refresh_city(self, city: str) -> Dict[str, Any]:
+        """Rebuild the city and neighborhood rollups for a city in one pass"""
+        now = datetime.utcnow()
+        accumulators = self._window_accumulators(now)
+
+        pipeline = [
+            {'$match': {'city': city}},
+            {
+                '$project': {
+                    'neighborhood': 1,
+                    'price': 1,
+                    'listed_date': 1,
+                    'age_ms': {'$subtract': [now, '$listed_date']}
+                }
+            },
+            {
+                '$facet': {
+                    'city': [{'$group': {'_id': None, **accumulators}}],
+                    'neighborhoods': [{'$group': {'_id': '$neighborhood', **accumulators}}]
+                }
+            }
+        ]
+
+        options = {'maxTimeMS': self.timeout_ms} if self.timeout_ms else {}
+        result = list(self.properties_collection.aggregate(pipeline, **options))
+        facets = result[0] if result else {'city': [], 'neighborhoods': []}
+        city_group = facets['city'][0] if facets['city'] else {}
+        neighborhood_groups = facets['neighborhoods']
+
+        neighborhoods = [
+            {
+                '_id': self._neighborhood_key(city, group['_id']),
+                'kind': 'neighborhood',
+                'city': city,
+                'neighborhood': group['_id'],
+                'refreshed_at': now,
+                'windows': self._windows_from_group(group)
+            }
+            for group in neighborhood_groups
+        ]
+
+        rollup = {
+            '_id': self._city_key(city),
+            'kind': 'city',
+            'city': city,
+            'refreshed_at': now,
+            'windows': self._windows_from_group(city_group),
+            'hot_neighborhoods': self._rank_hot_neighborhoods(neighborhoods),
+            'neighborhood_count': len(neighborhoods)
+        }
+
+        if neighborhoods:
+            self.rollups_collection.bulk_write([
+                UpdateOne({'_id': doc['_id']}, {'$set': doc}, upsert=True)
+                for doc in neighborhoods
+            ], ordered=False)
+
+        # Drop neighborhoods that no longer have listings
+        self.rollups_collection.delete_many({
+            'kind': 'neighborhood',
+            'city': city,
+            'refreshed_at': {'$lt': now}
+        })
+        self.rollups_collection.replace_one({'_id': rollup['_id']}, rollup, upsert=True)
+
+        return rollup
+
+    def _refresh_concurrently(self, cities: List[str]) -> Dict[str, Any]:
+        """Refresh cities in parallel, returning each rollup or its error"""
+        if not cities:
+            return {}
+        if len(cities) == 1 or self.concurrency <= 1:
+            return {city: self._try_refresh(city) for city in cities}
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(cities))) as executor:
+            results = executor.map(self._try_refresh, cities)
+            return dict(zip(cities, results))
+
+    def _try_refresh(self, city: str) -> Any:
+        try:
+            return self.refresh_city(city)
+        except PyMongoError as e:
+            return e
+
+    @staticmethod
+    def city_metrics(rollup: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Format the all-time city metrics stored in a rollup"""
+        window = rollup['windows']['all']
+        return {
+            'avg_price': window['avg_price'],
+            'total_listings': window['total_listings'],
+            'avg_days_on_market': MarketRollupService._days_on_market(rollup, window, now)
+        }
+
+    @staticmethod
+    def price_trends(rollup: Dict[str, Any]) -> Dict[str, float]:
+        """Format the windowed average prices stored in a rollup"""
+        return {
+            name: rollup['windows'][name]['avg_price']
+            for name in ROLLUP_WINDOWS
+        }
+
+    @staticmethod
+    def hot_neighborhoods(rollup: Dict[str, Any], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Format the ranked hot neighborhoods stored in a rollup"""
+        return [
+            {
+                'name': n['name'],
+                'avg_price': n['avg_price'],
+                'total_listings': n['total_listings'],
+                'avg_days_on_market': MarketRollupService._days_on_market(rollup, n, now)
+            }
+            for n in rollup['hot_neighborhoods']
+        ]
+
+    def _window_accumulators(self, now: datetime) -> Dict[str, Any]:
+        """Build $group accumulators for every rollup window"""
+        accumulators = {
+            'all_avg_price': {'$avg': '$price'},
+            'all_total_listings': {'$sum': 1},
+            'all_avg_age_ms': {'$avg': '$age_ms'}
+        }
+
+        for name, days in ROLLUP_WINDOWS.items():
+            in_window = {'$gte': ['$listed_date', now - timedelta(days=days)]}
+            accumulators.update({
+                f'{name}_avg_price': {'$avg': {'$cond': [in_window, '$price', None]}},
+                f'{name}_total_listings': {'$sum': {'$cond': [in_window, 1, 0]}},
+                f'{name}_avg_age_ms': {'$avg': {'$cond': [in_window, '$age_ms', None]}}
+            })
+
+        return accumulators
+
+    def _windows_from_group(self, group: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Reshape flat $group output into per-window metrics"""
+        return {
+            name: {
+                'avg_price': group.get(f'{name}_avg_price') or 0,
+                'total_listings': group.get(f'{name}_total_listings') or 0,
+                'avg_age_ms': group.get(f'{name}_avg_age_ms') or 0
+            }
+            for name in ['all', *ROLLUP_WINDOWS]
+        }
+
+    def _rank_hot_neighborhoods(self, neighborhoods: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rank neighborhoods by recent listing volume, then by listing age"""
+        recent = [
+            {'name': n['neighborhood'], **n['windows'][HOT_NEIGHBORHOOD_WINDOW]}
+            for n in neighborhoods
+            if n['windows'][HOT_NEIGHBORHOOD_WINDOW]['total_listings'] > 0
+        ]
+        recent.sort(key=lambda n: (-n['total_listings'], n['avg_age_ms']))
+        return recent[:HOT_NEIGHBORHOOD_LIMIT]
+
+    @staticmethod
+    def _days_on_market(
+        rollup: Dict[str, Any],
+        window: Dict[str, Any],
+        now: Optional[datetime] = None
+    ) -> float:
+        """Shift a stored average listing age to the current time, in days"""
+        if not window['total_listings']:
+            return 0
+        now = now or datetime.utcnow()
+        elapsed_ms = (now - rollup['refreshed_at']).total_seconds() * 1000
+        return (window['avg_age_ms'] + elapsed_ms) / DAY_MS
+
+    @staticmethod
+    def _city_key(city: str) -> str:
+        return f'city:{city}'
+
+    @staticmethod
+    def _neighborhood_key(city: str, neighborhood: Optional[str]) -> str:
+        return f'neighborhood:{city}:{neighborhood}'
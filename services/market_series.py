@@ -0,0 +1,245 @@
+import os
+import socket
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from database.mongodb import get_database
+from services.response_cache import DataVersion
+
+# Fields of a properties document that contribute to the series
+SALE_FIELDS = {
+    'city': 1, 'neighborhood': 1, 'property_type': 1, 'price': 1,
+    'square_feet': 1, 'listed_date': 1, 'sold_date': 1
+}
+
+SUMS = ['sales', 'sum_price', 'sqft_sales', 'sum_price_per_sqft', 'dom_sales', 'sum_days_on_market']
+
+# A rebuild lease not released within this long is taken over
+REBUILD_LEASE = timedelta(minutes=10)
+
+SeriesKey = Tuple[str, Optional[str], Optional[str], datetime]
+
+class MarketSeries:
+    """Monthly sale aggregates kept in the ``market_data`` collection.
+
+    One row per (city, neighborhood, property_type, month) holds running
+    sums (sales, price, price per sqft, days on market) that are moved with
+    ``$inc`` as sales are recorded, changed or withdrawn. Each sale also
+    feeds the neighborhood-wide, type-wide and city-wide rows, stored with
+    ``None`` in the rolled-up dimension, so a city trend reads one row per
+    month instead of grouping raw listings.
+
+    A city is backfilled from the properties collection the first time it
+    is read; ``rebuild`` (``flask rebuild-market-series``) recomputes it
+    after listings are written without going through the services. A
+    rebuild replaces rows in place under a per-city lease in
+    ``sync_state``, so concurrent first reads never rebuild twice and
+    readers never see an empty series.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.market_data
+        self.properties_collection = self.db.properties
+        self.sync_state = self.db.sync_state
+        self.data_version = DataVersion()
+        self._built = set()
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    def monthly(
+        self,
+        city: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        neighborhoods: Optional[List[str]] = None,
+        property_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows for the months overlapping [start, end], oldest first
+
+        Without ``neighborhoods`` the city-wide rows are returned; with them,
+        one series per neighborhood (sorted by neighborhood, then month).
+        Each row carries the stored sums plus avg_price,
+        avg_price_per_sqft and avg_days_on_market. Listings without a
+        neighborhood only feed the rolled-up rows, so a ``None`` entry in
+        ``neighborhoods`` has no series of its own.
+        """
+        if neighborhoods is not None:
+            # neighborhood None marks the rolled-up rows; never match them here
+            neighborhoods = [n for n in neighborhoods if n is not None]
+            if not neighborhoods:
+                return []
+        self.ensure_built(city)
+
+        month_range = {'$gte': _month(start)}
+        if end is not None:
+            month_range['$lte'] = end
+        query = {
+            'city': city,
+            'neighborhood': {'$in': neighborhoods} if neighborhoods is not None else None,
+            'property_type': property_type,
+            'month': month_range,
+            'sales': {'$gt': 0}
+        }
+        rows = self.collection.find(query, {'_id': 0, 'updated_at': 0})
+        rows = rows.sort([('neighborhood', 1), ('month', 1)])
+        return [_with_averages(row) for row in rows]
+
+    def record_sale(self, property_data: Dict[str, Any]) -> None:
+        """Add one sold listing to the series"""
+        self.apply([], [property_data])
+
+    def apply(
+        self,
+        removed: Iterable[Dict[str, Any]],
+        added: Iterable[Dict[str, Any]]
+    ) -> int:
+        """Move the series from one state of some listings to another
+
+        ``removed`` are the listings as they were before a write and
+        ``added`` as they are after it; listings without a ``sold_date`` do
+        not count. Returns the number of rows touched.
+        """
+        increments = defaultdict(lambda: dict.fromkeys(SUMS, 0))
+        for sign, docs in ((-1, removed), (1, added)):
+            for doc in docs:
+                for key, sums in _contributions(doc):
+                    row = increments[key]
+                    for field, value in sums.items():
+                        row[field] += sign * value
+
+        operations = [
+            UpdateOne(
+                _row_filter(key),
+                {'$inc': sums, '$set': {'updated_at': datetime.utcnow()}},
+                upsert=True
+            )
+            for key, sums in increments.items()
+            if any(sums.values())
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def ensure_built(self, city: str) -> None:
+        if city in self._built:
+            return
+        if self.sync_state.find_one({'_id': self._state_id(city)}) is None:
+            if self.rebuild(city) is None:
+                # Another worker is building it; check again on the next read
+                return
+        self._built.add(city)
+
+    def rebuild(self, city: str) -> Optional[int]:
+        """Recompute every row of a city from its sold listings
+
+        Returns the number of rows, or None if another rebuild of the city
+        holds the lease.
+        """
+        if not self._acquire_lease(city):
+            return None
+        try:
+            rows = self._rebuild(city)
+            # Cached trends were computed from the rows just replaced
+            self.data_version.bump()
+            return rows
+        finally:
+            self.sync_state.delete_one({'_id': self._lease_id(city), 'owner': self.owner})
+
+    def _rebuild(self, city: str) -> int:
+        # BSON dates keep milliseconds; truncate so rows written now compare equal
+        started = datetime.utcnow()
+        started = started.replace(microsecond=started.microsecond // 1000 * 1000)
+
+        totals = defaultdict(lambda: dict.fromkeys(SUMS, 0))
+        sold = self.properties_collection.find(
+            {'city': city, 'sold_date': {'$ne': None}},
+            SALE_FIELDS,
+            batch_size=5000
+        )
+        for doc in sold:
+            for key, sums in _contributions(doc):
+                row = totals[key]
+                for field, value in sums.items():
+                    row[field] += value
+
+        # Replace by key, then drop rows that neither the recompute nor a
+        # concurrent apply() wrote since the rebuild started
+        if totals:
+            self.collection.bulk_write([
+                ReplaceOne(_row_filter(key), {**_row_filter(key), **sums, 'updated_at': started}, upsert=True)
+                for key, sums in totals.items()
+            ], ordered=False)
+        self.collection.delete_many({
+            'city': city,
+            'month': {'$exists': True},
+            'updated_at': {'$lt': started}
+        })
+        self.sync_state.update_one(
+            {'_id': self._state_id(city)},
+            {'$set': {'rows': len(totals), 'updated_at': started}},
+            upsert=True
+        )
+        self._built.add(city)
+        return len(totals)
+
+    def _acquire_lease(self, city: str) -> bool:
+        now = datetime.utcnow()
+        try:
+            self.sync_state.find_one_and_update(
+                {'_id': self._lease_id(city), 'expires_at': {'$lte': now}},
+                {'$set': {'owner': self.owner, 'expires_at': now + REBUILD_LEASE}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def _state_id(self, city: str) -> str:
+        return f'market_series:{city}'
+
+    def _lease_id(self, city: str) -> str:
+        return f'market_series_lock:{city}'
+
+def _contributions(doc: Dict[str, Any]) -> List[Tuple[SeriesKey, Dict[str, float]]]:
+    """Row keys a sale feeds and what it adds to each"""
+    sold_date = doc.get('sold_date')
+    if not isinstance(sold_date, datetime) or doc.get('price') is None:
+        return []
+
+    price = float(doc['price'])
+    sums = {'sales': 1, 'sum_price': price}
+    square_feet = doc.get('square_feet')
+    if square_feet:
+        sums['sqft_sales'] = 1
+        sums['sum_price_per_sqft'] = price / square_feet
+    listed_date = doc.get('listed_date')
+    if isinstance(listed_date, datetime):
+        sums['dom_sales'] = 1
+        sums['sum_days_on_market'] = (sold_date - listed_date).total_seconds() / 86400
+
+    city = doc['city']
+    month = _month(sold_date)
+    neighborhood = doc.get('neighborhood')
+    property_type = doc.get('property_type')
+    keys = {(city, n, t, month) for n in (neighborhood, None) for t in (property_type, None)}
+    return [(key, sums) for key in keys]
+
+def _row_filter(key: SeriesKey) -> Dict[str, Any]:
+    city, neighborhood, property_type, month = key
+    return {'city': city, 'neighborhood': neighborhood, 'property_type': property_type, 'month': month}
+
+def _with_averages(row: Dict[str, Any]) -> Dict[str, Any]:
+    row['avg_price'] = row['sum_price'] / row['sales']
+    row['avg_price_per_sqft'] = (
+        row['sum_price_per_sqft'] / row['sqft_sales'] if row.get('sqft_sales') else None
+    )
+    row['avg_days_on_market'] = (
+        row['sum_days_on_market'] / row['dom_sales'] if row.get('dom_sales') else None
+    )
+    return row
+
+def _month(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
@@ -1,11 +1,28 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional, Iterator
 from database.mongodb import get_database
+from services.response_cache import DataVersion
+from services.market_series import MarketSeries
+from services import serialization
 from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+import base64
+import hashlib
+import json
+import zlib
+
+# Keyset sort keys and their direction; _id breaks ties in the same direction
+SORT_ORDERS = {
+    'price': ASCENDING,
+    'listed_date': DESCENDING
+}
 
 class PropertyService:
     def __init__(self):
         self.db = get_database()
         self.properties_collection = self.db.properties
+        self.data_version = DataVersion()
+        self.market_series = MarketSeries()
 
     def search_properties(
         self,
@@ -15,6 +32,32 @@ class PropertyService:
         limit: int = 20
     ) -> List[Dict[str, Any]]:
         """Search properties based on criteria"""
+        return self.search_properties_page(city, property_type, price_range, limit)['properties']
+    
+    def search_properties_page(
+        self,
+        city: str,
+        property_type: str = 'all',
+        price_range: Tuple[float, float] = (0, float('inf')),
+        limit: int = 20,
+        sort: str = 'price',
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Search properties one page at a time using keyset pagination
+
+        Results are ordered by ``sort`` ('price' ascending or 'listed_date'
+        newest first) with ``_id`` as tie-breaker. ``next_cursor`` is an
+        opaque token encoding the last (sort value, _id) returned; passing
+        it back resumes with a range condition on the index instead of
+        skipping documents, so page N costs the same as page 1. ``fields``
+        limits the returned fields (the id is always included).
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        direction = SORT_ORDERS[sort]
+        limit = max(limit, 1)
+        
         query = {
             'city': city.lower(),
             'price': {'$gte': price_range[0], '$lte': price_range[1]}
@@ -23,11 +66,101 @@ class PropertyService:
         if property_type != 'all':
             query['property_type'] = property_type
             
+        fingerprint = self._query_fingerprint(query, sort)
+        if cursor:
+            value, last_id = self._decode_cursor(cursor, sort, fingerprint)
+            query = {'$and': [query, {'$or': self._after_cursor(sort, direction, value, last_id)}]}
+            
+        projection = None
+        if fields:
+            projection = {field: 1 for field in fields}
+            projection[sort] = 1
+            
+        # Fetch one extra document to learn whether another page exists
         properties = list(self.properties_collection
-            .find(query)
-            .limit(limit))
+            .find(query, projection)
+            .sort([(sort, direction), ('_id', direction)])
+            .limit(limit + 1))
+            
+        next_cursor = None
+        if len(properties) > limit:
+            properties = properties[:limit]
+            last = properties[-1]
+            next_cursor = self._encode_cursor(sort, last.get(sort), last['_id'], fingerprint)
+            
+        if fields and sort not in fields:
+            for p in properties:
+                p.pop(sort, None)
+                
+        return {
+            'properties': [self._format_property(p) for p in properties],
+            'next_cursor': next_cursor
+        }
+    
+    def export_properties(
+        self,
+        city: str,
+        property_type: str = 'all',
+        price_range: Tuple[float, float] = (0, float('inf')),
+        fields: Optional[List[str]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate every matching property without materializing the result set"""
+        query = {
+            'city': city.lower(),
+            'price': {'$gte': price_range[0], '$lte': price_range[1]}
+        }
+        
+        if property_type != 'all':
+            query['property_type'] = property_type
             
-        return [self._format_property(p) for p in properties]
+        projection = {field: 1 for field in fields} if fields else None
+        cursor = self.properties_collection.find(query, projection).batch_size(batch_size)
+        try:
+            for property_data in cursor:
+                yield self._format_property(property_data)
+        finally:
+            cursor.close()
+    
+    def export_ndjson(
+        self,
+        city: str,
+        property_type: str = 'all',
+        price_range: Tuple[float, float] = (0, float('inf')),
+        fields: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        chunk_size: int = 64 * 1024,
+        compress: bool = False
+    ) -> Iterator[bytes]:
+        """Stream matching properties as NDJSON, optionally gzip-compressed
+
+        Lines are buffered into chunks of roughly ``chunk_size`` bytes so
+        memory stays flat however many properties match; an empty first
+        chunk is yielded straight away so headers go out before the query
+        has returned anything.
+        """
+        compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+        buffer = []
+        buffered = 0
+        
+        yield b''
+        
+        for property_data in self.export_properties(city, property_type, price_range, fields, batch_size):
+            line = serialization.dumps(property_data) + b'\n'
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= chunk_size:
+                chunk = b''.join(buffer)
+                buffer, buffered = [], 0
+                chunk = compressor.compress(chunk) if compressor else chunk
+                if chunk:
+                    yield chunk
+                    
+        chunk = b''.join(buffer)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
     
     def get_property_details(self, property_id: str) -> Dict[str, Any]:
         """Get detailed information for a specific property"""
@@ -49,14 +182,59 @@ class PropertyService:
                 raise ValueError(f"Missing required field: {field}")
         
         result = self.properties_collection.insert_one(property_data)
+        if property_data.get('sold_date'):
+            self.market_series.record_sale(property_data)
+        self.data_version.bump()
         return self.get_property_details(result.inserted_id)
     
     def _format_property(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Format property data for API response"""
+        """Format property data for API response
+
+        Dates and other BSON values are left as they are; the JSON provider
+        encodes them when the response is written.
+        """
         property_data['id'] = str(property_data.pop('_id'))
-        
-        # Format dates
-        if 'listed_date' in property_data:
-            property_data['listed_date'] = property_data['listed_date'].isoformat()
+        return property_data
+    
+    def _query_fingerprint(self, query: Dict[str, Any], sort: str) -> str:
+        """Short hash tying a cursor to the query it was issued for"""
+        canonical = json.dumps([query, sort], sort_keys=True, default=str)
+        return hashlib.sha1(canonical.encode()).hexdigest()[:12]
+    
+    def _after_cursor(self, sort: str, direction: int, value: Any, last_id: Any) -> List[Dict[str, Any]]:
+        """Conditions for documents after (value, last_id) in sort order
+
+        Missing and null values sort before every other value, and range
+        operators never match them, so they get their own branches.
+        """
+        op = '$gt' if direction == ASCENDING else '$lt'
+        if value is None:
+            after = [{sort: None, '_id': {op: last_id}}]
+            if direction == ASCENDING:
+                after.append({sort: {'$ne': None}})
+            return after
+        after = [{sort: {op: value}}, {sort: value, '_id': {op: last_id}}]
+        if direction == DESCENDING:
+            after.append({sort: None})
+        return after
+    
+    def _encode_cursor(self, sort: str, value: Any, last_id: Any, fingerprint: str) -> str:
+        if isinstance(value, datetime):
+            value = {'$date': value.isoformat()}
+        payload = json.dumps({'v': value, 'id': str(last_id), 'q': fingerprint})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    def _decode_cursor(self, cursor: str, sort: str, fingerprint: str) -> Tuple[Any, Any]:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value = payload['v']
+            if isinstance(value, dict) and '$date' in value:
+                value = datetime.fromisoformat(value['$date'])
+            last_id = ObjectId(payload['id']) if ObjectId.is_valid(payload['id']) else payload['id']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
             
-        return property_data
\ No newline at end of file
+        if payload.get('q') != fingerprint:
+            raise ValueError("Cursor does not match the search criteria")
+        return value, last_id
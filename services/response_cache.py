@@ -0,0 +1,212 @@
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Optional, Tuple
+from pymongo import ReturnDocument
+from database.mongodb import get_database
+from database.indexes import ensure_indexes
+from services import serialization
+from memory_cache import MemoryCacheBackend
+
+class DataVersion:
+    """Monotonic counter bumped by every write to the listing data.
+
+    Cache keys embed the current version, so a bump makes every entry
+    computed from older data unreachable without scanning the cache.
+    """
+
+    _id = 'data_version'
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.cache_meta
+
+    def current(self) -> int:
+        doc = self.collection.find_one({'_id': self._id})
+        return doc['value'] if doc else 0
+
+    def bump(self) -> int:
+        doc = self.collection.find_one_and_update(
+            {'_id': self._id},
+            {'$inc': {'value': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['value']
+
+class MongoCacheBackend:
+    """Cache shared by all workers, stored in the api_cache collection.
+
+    Values are stored as JSON text. Expired documents are removed by a TTL
+    index; once the collection exceeds ``max_entries`` the least recently
+    read entries are evicted.
+    """
+
+    shared = True
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.db = get_database()
+        self.collection = self.db.api_cache
+        ensure_indexes(self.db, collections=['api_cache'])
+
+    def get(self, key: str) -> Optional[Any]:
+        now = datetime.utcnow()
+        doc = self.collection.find_one_and_update(
+            {'_id': key, 'expires_at': {'$gt': now}},
+            {'$set': {'accessed_at': now}},
+            projection={'value': 1}
+        )
+        if doc is None:
+            return None
+        return serialization.loads(doc['value'])
+
+    def remaining(self, key: str) -> Optional[float]:
+        """Seconds until an entry expires, or None when it is absent"""
+        doc = self.collection.find_one({'_id': key}, {'expires_at': 1})
+        if doc is None:
+            return None
+        return max(0.0, (doc['expires_at'] - datetime.utcnow()).total_seconds())
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        now = datetime.utcnow()
+        self.collection.replace_one(
+            {'_id': key},
+            {
+                'value': serialization.dumps(value).decode(),
+                'expires_at': now + timedelta(seconds=ttl),
+                'accessed_at': now
+            },
+            upsert=True
+        )
+        self._evict()
+
+    def clear(self) -> None:
+        self.collection.delete_many({})
+
+    def __len__(self) -> int:
+        return self.collection.estimated_document_count()
+
+    def _evict(self) -> None:
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return
+        stale = self.collection.find({}, {'_id': 1}).sort('accessed_at', 1).limit(excess)
+        self.collection.delete_many({'_id': {'$in': [doc['_id'] for doc in stale]}})
+
+class ResponseCache:
+    """Caches endpoint results keyed by endpoint, query args and data version"""
+
+    def __init__(
+        self,
+        backend: Any,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 300,
+        data_version: Optional[DataVersion] = None
+    ):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.data_version = data_version or DataVersion()
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+        self._requests = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'ResponseCache':
+        """Build a cache from the CACHE_* settings"""
+        backends = {
+            'memory': MemoryCacheBackend,
+            'mongo': MongoCacheBackend
+        }
+        if config.CACHE_BACKEND not in backends:
+            raise ValueError(f"Unknown cache backend: {config.CACHE_BACKEND}")
+
+        return cls(
+            backends[config.CACHE_BACKEND](max_entries=config.CACHE_MAX_ENTRIES),
+            ttls=config.CACHE_TTLS,
+            default_ttl=config.CACHE_DEFAULT_TTL
+        )
+
+    def make_key(self, endpoint: str, args: Dict[str, Any], version: int) -> str:
+        """Build a cache key from the endpoint and normalized arguments"""
+        normalized = sorted(
+            (name, str(value).strip())
+            for name, value in args.items()
+            if value is not None
+        )
+        return json.dumps([endpoint, version, normalized], separators=(',', ':'))
+
+    def get_or_compute(
+        self,
+        endpoint: str,
+        args: Dict[str, Any],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return a cached result for the arguments, computing it on a miss"""
+        key = self.make_key(endpoint, args, self.data_version.current())
+        self._record(self._requests, (endpoint, _frozen_args(args)))
+
+        value = self.backend.get(key)
+        if value is not None:
+            self._record(self._hits, endpoint)
+            return value
+
+        self._record(self._misses, endpoint)
+        value = compute()
+        self.backend.set(key, value, self.ttls.get(endpoint, self.default_ttl))
+        return value
+
+    def refresh(self, endpoint: str, args: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Recompute and store a result whether or not it is cached"""
+        key = self.make_key(endpoint, args, self.data_version.current())
+        value = compute()
+        self.backend.set(key, value, self.ttls.get(endpoint, self.default_ttl))
+        return value
+
+    def remaining_ttl(self, endpoint: str, args: Dict[str, Any]) -> Optional[float]:
+        """Seconds until the current entry for the arguments expires (None when absent)"""
+        return self.backend.remaining(self.make_key(endpoint, args, self.data_version.current()))
+
+    def drain_requests(self) -> Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], int]:
+        """Request counts per (endpoint, args) since the last drain"""
+        with self._lock:
+            requests, self._requests = self._requests, defaultdict(int)
+        return dict(requests)
+
+    def invalidate(self) -> int:
+        """Invalidate every cached entry by bumping the data version"""
+        return self.data_version.bump()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process, overall and per endpoint"""
+        with self._lock:
+            endpoints = sorted(set(self._hits) | set(self._misses))
+            per_endpoint = {
+                endpoint: {
+                    'hits': self._hits[endpoint],
+                    'misses': self._misses[endpoint]
+                }
+                for endpoint in endpoints
+            }
+
+        hits = sum(e['hits'] for e in per_endpoint.values())
+        misses = sum(e['misses'] for e in per_endpoint.values())
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'data_version': self.data_version.current(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0,
+            'endpoints': per_endpoint
+        }
+
+    def _record(self, counter: Dict[Any, int], key: Any) -> None:
+        with self._lock:
+            counter[key] += 1
+
+def _frozen_args(args: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(sorted((name, value) for name, value in args.items() if value is not None))
@@ -0,0 +1,58 @@
+"""Vectorized similarity and confidence scoring for valuation comparables.
+
+The functions here keep the semantics of the original per-pair scoring in
+ValuationService but operate on whole arrays, broadcasting over any leading
+dimensions: a single subject against an (m, d) comparable matrix, or a batch
+of n subjects of shape (n, 1, d) against padded comparables of shape
+(n, m, d).
+"""
+import numpy as np
+
+BASE_CONFIDENCE = 70.0
+MAX_CONFIDENCE = 95.0
+
+def similarity_scores(subject: np.ndarray, comparables: np.ndarray) -> np.ndarray:
+    """Similarity (0-100) of a subject to each comparable, along the last axis
+
+    The Euclidean distance between feature vectors is normalized by the norm
+    of their element-wise maximum.
+    """
+    subject = np.asarray(subject, dtype=float)
+    comparables = np.asarray(comparables, dtype=float)
+
+    distance = np.sqrt(np.sum((subject - comparables) ** 2, axis=-1))
+    max_distance = np.sqrt(np.sum(np.maximum(subject, comparables) ** 2, axis=-1))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        similarity = (1 - distance / max_distance) * 100
+    return np.round(similarity, 2)
+
+def confidence_scores(
+    prices: np.ndarray,
+    similarities: np.ndarray,
+    mask: np.ndarray = None
+) -> np.ndarray:
+    """Valuation confidence per row of comparables
+
+    ``prices`` and ``similarities`` have shape (n, m); ``mask`` marks which
+    of the m slots hold a real comparable (all of them by default). Rows
+    with no comparables get the base confidence.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    similarities = np.atleast_2d(np.asarray(similarities, dtype=float))
+    mask = np.ones(prices.shape, dtype=bool) if mask is None else np.atleast_2d(mask)
+
+    counts = mask.sum(axis=-1)
+    safe_counts = np.maximum(counts, 1)
+
+    mean_price = np.where(mask, prices, 0).sum(axis=-1) / safe_counts
+    deviations = np.where(mask, prices - mean_price[..., None], 0)
+    price_std = np.sqrt((deviations ** 2).sum(axis=-1) / safe_counts)
+    mean_similarity = np.where(mask, similarities, 0).sum(axis=-1) / safe_counts
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price_variance = price_std / mean_price
+    confidence = MAX_CONFIDENCE - (price_variance * 100) + (mean_similarity / 10)
+    confidence = np.round(np.clip(confidence, BASE_CONFIDENCE, MAX_CONFIDENCE), 2)
+
+    return np.where(counts > 0, confidence, BASE_CONFIDENCE)
@@ -0,0 +1,152 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+class TrainingDataLoader:
+    """Streams sold properties into preallocated feature and target arrays.
+
+    Only the feature and target fields are projected. The cursor is read in
+    batches of ``batch_size`` and each batch is converted and copied into
+    the arrays before the next one is fetched, so peak memory is the final
+    arrays plus one batch of documents rather than every sale as a dict.
+
+    ``max_rows`` bounds the arrays with a uniform (reservoir) sample of the
+    matching sales and ``window_days`` only reads sales from that many days
+    back; both default to everything.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        features: Dict[str, float],
+        target: str = 'price',
+        batch_size: int = 5000,
+        seed: int = 42
+    ):
+        # features maps each field, in model column order, to its default
+        self.collection = collection
+        self.features = features
+        self.target = target
+        self.batch_size = max(1, batch_size)
+        self.seed = seed
+
+    def query(self, window_days: Optional[int] = None) -> Dict[str, Any]:
+        sold_date = {'$exists': True}
+        if window_days:
+            sold_date['$gte'] = datetime.utcnow() - timedelta(days=window_days)
+        return {'sold_date': sold_date}
+
+    def load(
+        self,
+        max_rows: Optional[int] = None,
+        window_days: Optional[int] = None,
+        trace_memory: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Load (X, y, stats) for the matching sales
+
+        With ``trace_memory`` the stats include the peak Python allocation
+        during the load, measured with tracemalloc (which slows the load).
+        """
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+
+        query = self.query(window_days)
+        limit = max_rows or None
+        capacity = self.collection.count_documents(query)
+        if limit:
+            capacity = min(capacity, limit)
+
+        # Trees compare features as float32, so a float64 matrix would only be copied again
+        X = np.empty((capacity, len(self.features)), dtype=np.float32)
+        y = np.empty(capacity, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        filled = seen = scanned = 0
+
+        projection = {name: 1 for name in [*self.features, self.target]}
+        projection['_id'] = 0
+        cursor = self.collection.find(query, projection).batch_size(self.batch_size)
+        try:
+            for docs in self._batches(cursor):
+                scanned += len(docs)
+                chunk_X, chunk_y = self._convert(docs)
+                n = len(chunk_y)
+
+                # Sales written since the count grow the arrays, up to the limit
+                if filled + n > capacity and (not limit or capacity < limit):
+                    capacity = max(filled + n, capacity * 2)
+                    if limit:
+                        capacity = min(capacity, limit)
+                    X, y = self._grow(X, y, capacity)
+
+                take = min(n, capacity - filled)
+                X[filled:filled + take] = chunk_X[:take]
+                y[filled:filled + take] = chunk_y[:take]
+                filled += take
+
+                # Reservoir sampling: the k-th row replaces a random slot with probability capacity / (k + 1)
+                if take < n:
+                    slots = rng.integers(0, np.arange(seen + take, seen + n) + 1)
+                    keep = slots < capacity
+                    X[slots[keep]] = chunk_X[take:][keep]
+                    y[slots[keep]] = chunk_y[take:][keep]
+                seen += n
+        finally:
+            cursor.close()
+
+        elapsed = time.perf_counter() - start
+        X, y = X[:filled], y[:filled]
+        stats = {
+            'rows': filled,
+            'scanned': scanned,
+            'skipped': scanned - seen,
+            'sampled': seen > filled,
+            'window_days': window_days or None,
+            'seconds': round(elapsed, 3),
+            'rows_per_s': round(scanned / elapsed) if elapsed else 0,
+            'array_mb': round((X.nbytes + y.nbytes) / 1024 / 1024, 2)
+        }
+        if trace_memory:
+            stats['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            if started_tracing:
+                tracemalloc.stop()
+        return X, y, stats
+
+    def _batches(self, cursor: Any) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _convert(self, docs: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature rows and targets of the documents that have a target"""
+        rows, targets = [], []
+        for doc in docs:
+            target = doc.get(self.target)
+            if target is None:
+                continue
+            rows.append([
+                default if doc.get(name) is None else doc[name]
+                for name, default in self.features.items()
+            ])
+            targets.append(target)
+        return (
+            np.array(rows, dtype=np.float32).reshape(-1, len(self.features)),
+            np.array(targets, dtype=np.float64)
+        )
+
+    def _grow(self, X: np.ndarray, y: np.ndarray, capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+        grown_X = np.empty((capacity, X.shape[1]), dtype=X.dtype)
+        grown_y = np.empty(capacity, dtype=y.dtype)
+        grown_X[:len(X)] = X
+        grown_y[:len(y)] = y
+        return grown_X, grown_y
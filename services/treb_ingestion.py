@@ -0,0 +1,242 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from pymongo import UpdateOne, DESCENDING
+from database.mongodb import get_database
+from services.treb_service import TREBService
+from services.response_cache import DataVersion
+from services.market_series import MarketSeries, SALE_FIELDS
+from models.property import Property
+from config import Config
+
+SOURCE = 'treb'
+
+logger = logging.getLogger(__name__)
+
+class TREBIngestionService:
+    """Pull TREB listings into the properties collection.
+
+    The first page is fetched to learn the page count; the remaining pages
+    are fetched concurrently through the TREBService pooled session (which
+    retries with backoff). Pages are normalized with Property.normalize as
+    they arrive and upserted in bulk_write batches keyed on ``listing_id``,
+    so re-running an ingestion updates listings in place. Each batch also
+    moves the MarketSeries rows by the sales it added or changed.
+
+    ``ingest`` pulls the whole feed for a city; ``sync`` pulls only the
+    listings modified since the city's stored watermark, so its cost scales
+    with churn rather than inventory. Both advance the watermark (unless a
+    page failed) and append an entry to the ``sync_log`` collection.
+    """
+
+    def __init__(
+        self,
+        treb_service: Optional[TREBService] = None,
+        workers: Optional[int] = None,
+        page_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.db = get_database()
+        self.properties_collection = self.db.properties
+        self.sync_state = self.db.sync_state
+        self.sync_log = self.db.sync_log
+        self.data_version = DataVersion()
+        self.market_series = MarketSeries()
+        self.workers = workers or Config.TREB_INGEST_WORKERS
+        self.treb_service = treb_service or TREBService(pool_size=self.workers)
+        self.page_size = page_size or Config.TREB_INGEST_PAGE_SIZE
+        self.batch_size = batch_size or Config.TREB_INGEST_BATCH_SIZE
+        self.overlap = timedelta(seconds=Config.TREB_SYNC_OVERLAP)
+
+    def ingest(self, city: str) -> Dict[str, Any]:
+        """Fetch and upsert every listing for a city, returning ingestion stats"""
+        return self._run(city, modified_since=None)
+
+    def sync(self, city: str) -> Dict[str, Any]:
+        """Apply only the listings changed since the last sync of a city
+
+        Falls back to a full ingest when the city has never been synced.
+        The watermark is rewound by ``TREB_SYNC_OVERLAP`` seconds to absorb
+        clock skew; re-applying a listing is harmless.
+        """
+        watermark = self.get_watermark(city)
+        if watermark is None:
+            return self._run(city, modified_since=None)
+        return self._run(city, modified_since=watermark - self.overlap)
+
+    def get_watermark(self, city: str) -> Optional[datetime]:
+        """Modification time up to which a city is known to be in sync"""
+        state = self.sync_state.find_one({'_id': self._state_id(city)})
+        return state['watermark'] if state else None
+
+    def sync_history(self, city: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent sync log entries, newest first"""
+        query = {'source': SOURCE}
+        if city:
+            query['city'] = city.lower()
+        return list(self.sync_log.find(query, {'_id': 0}).sort('started_at', DESCENDING).limit(limit))
+
+    def _run(self, city: str, modified_since: Optional[datetime]) -> Dict[str, Any]:
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        stats = {
+            'city': city.lower(),
+            'mode': 'full' if modified_since is None else 'delta',
+            'modified_since': modified_since,
+            'pages': 0,
+            'failed_pages': [],
+            'fetched': 0,
+            'rejected': 0,
+            'sold': 0,
+            'upserted': 0,
+            'modified': 0
+        }
+        pending = []
+        latest_change = []
+
+        first = self._record_page(1, self._fetch_page(city, 1, modified_since), stats)
+        if first is not None:
+            pending.extend(self._prepare_operations(first.get('listings', []), stats, latest_change))
+            total_pages = int(first.get('total_pages', 1))
+
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(self._fetch_page, city, page, modified_since): page
+                    for page in range(2, total_pages + 1)
+                }
+                for future in as_completed(futures):
+                    result = self._record_page(futures[future], future.result(), stats)
+                    if result is None:
+                        continue
+                    pending.extend(self._prepare_operations(result.get('listings', []), stats, latest_change))
+                    while len(pending) >= self.batch_size:
+                        self._write(pending[:self.batch_size], stats)
+                        pending = pending[self.batch_size:]
+
+        if pending:
+            self._write(pending, stats)
+        if stats['upserted'] or stats['modified']:
+            self.data_version.bump()
+
+        # A failed page may hold changes older than anything seen, so keep
+        # the old watermark and let the next sync fetch them again
+        if not stats['failed_pages'] and first is not None:
+            # Prefer the feed's own modification times; without any, a full
+            # pull is current as of its start and an empty delta changes nothing
+            watermark = max(latest_change) if latest_change else None
+            if watermark is None:
+                watermark = started_at if modified_since is None else self.get_watermark(city)
+            self.sync_state.update_one(
+                {'_id': self._state_id(city)},
+                {'$set': {'watermark': watermark, 'updated_at': datetime.utcnow()}},
+                upsert=True
+            )
+
+        elapsed = time.perf_counter() - started
+        stats['failed_pages'].sort()
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['listings_per_second'] = round(stats['fetched'] / elapsed, 1) if elapsed else 0.0
+        stats['watermark'] = self.get_watermark(city)
+
+        self.sync_log.insert_one(dict(stats, source=SOURCE, started_at=started_at))
+        return stats
+
+    def _fetch_page(
+        self,
+        city: str,
+        page: int,
+        modified_since: Optional[datetime]
+    ) -> Optional[Dict[str, Any]]:
+        """Runs on a worker thread; failures are reported, not raised"""
+        try:
+            return self.treb_service.fetch_listings_page(city, page, self.page_size, modified_since)
+        except Exception:
+            logger.exception("Error fetching TREB page %s for %s", page, city)
+            return None
+
+    def _record_page(
+        self,
+        page: int,
+        result: Optional[Dict[str, Any]],
+        stats: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        if result is None:
+            stats['failed_pages'].append(page)
+        else:
+            stats['pages'] += 1
+        return result
+
+    def _prepare_operations(
+        self,
+        listings: List[Dict[str, Any]],
+        stats: Dict[str, Any],
+        latest_change: List[datetime]
+    ) -> List[Tuple[str, UpdateOne]]:
+        """(listing_id, upsert) pairs for the listings that normalize"""
+        operations = []
+        for listing in listings:
+            stats['fetched'] += 1
+            try:
+                property_doc = Property.normalize(listing)
+                property_doc['listing_id'] = str(listing['id'])
+                property_doc.update(self._status_fields(listing))
+                if listing.get('modified_at'):
+                    latest_change.append(_parse_datetime(listing['modified_at']))
+            except (KeyError, TypeError, ValueError):
+                stats['rejected'] += 1
+                continue
+
+            if property_doc['status'] == 'sold':
+                stats['sold'] += 1
+
+            # Keep the date a listing was first seen across re-ingestions
+            listed_date = property_doc.pop('listed_date')
+            update = {'$set': property_doc, '$setOnInsert': {'listed_date': listed_date}}
+            if 'sold_date' not in property_doc:
+                update['$unset'] = {'sold_date': ''}  # relisted after a sale
+            operations.append((property_doc['listing_id'], UpdateOne(
+                {'listing_id': property_doc['listing_id']},
+                update,
+                upsert=True
+            )))
+        return operations
+
+    def _status_fields(self, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Map the feed status onto the properties schema
+
+        Sold listings carry ``sold_date`` and the sale price as ``price``,
+        which is what the valuation and market analytics read.
+        """
+        status = listing.get('status', 'active')
+        fields = {'status': status}
+        if status == 'sold':
+            fields['sold_date'] = _parse_datetime(listing['sold_date'])
+            if listing.get('sold_price') is not None:
+                fields['price'] = float(listing['sold_price'])
+        return fields
+
+    def _write(self, operations: List[Tuple[str, UpdateOne]], stats: Dict[str, Any]) -> None:
+        # Read the batch's listings on both sides of the write so the market
+        # series moves by exactly what changed, however often a listing is re-applied
+        batch = {'listing_id': {'$in': [listing_id for listing_id, _ in operations]}}
+        before = list(self.properties_collection.find(batch, SALE_FIELDS))
+        
+        result = self.properties_collection.bulk_write([op for _, op in operations], ordered=False)
+        stats['upserted'] += result.upserted_count
+        stats['modified'] += result.modified_count
+        
+        after = list(self.properties_collection.find(batch, SALE_FIELDS))
+        self.market_series.apply(before, after)
+
+    def _state_id(self, city: str) -> str:
+        return f'{SOURCE}:{city.lower()}'
+
+def _parse_datetime(value: Any) -> datetime:
+    """Parse an ISO timestamp from the feed into naive UTC"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
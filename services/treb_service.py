@@ -1,11 +1,59 @@
 import requests
 import os
-from typing import Tuple, List, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Tuple, List, Dict, Any, Optional
+from datetime import datetime
+from config import Config
 
 class TREBService:
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None, pool_size: Optional[int] = None):
         self.api_key = os.getenv('TREB_API_KEY')
-        self.base_url = 'https://api.treb.com/v1'
+        self.base_url = (base_url or Config.TREB_BASE_URL).rstrip('/')
+        self.timeout = Config.TREB_TIMEOUT
+        self.session = self._create_session(pool_size or Config.TREB_INGEST_WORKERS)
+    
+    def _create_session(self, pool_size: int) -> requests.Session:
+        """Pooled session that retries throttled and failed requests with backoff"""
+        retry = Retry(
+            total=Config.TREB_MAX_RETRIES,
+            backoff_factor=Config.TREB_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if self.api_key:
+            session.headers['Authorization'] = f'Bearer {self.api_key}'
+        return session
+    
+    def fetch_listings_page(
+        self,
+        city: str,
+        page: int = 1,
+        page_size: int = 200,
+        modified_since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of listings: {'listings': [...], 'total_pages': n}
+
+        With ``modified_since`` only listings changed at or after that time
+        are returned.
+        """
+        params = {'city': city, 'page': page, 'page_size': page_size}
+        if modified_since is not None:
+            params['modified_since'] = modified_since.isoformat()
+            
+        response = self.session.get(
+            f'{self.base_url}/listings',
+            params=params,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
     
     def search_properties(
         self,
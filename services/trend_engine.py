@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from database.mongodb import get_database
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+class TrendEngine:
+    """Computes several trend windows and monthly buckets in one aggregation.
+
+    Every window and the monthly series become branches of a single $facet
+    over the city's documents, so callers that used to issue one aggregation
+    per window pay for one round trip and one scan.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+        self.properties_collection = self.db.properties
+
+    def get_trends(
+        self,
+        city: str,
+        windows: Dict[str, int],
+        date_field: str = 'sold_date',
+        monthly_days: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Get per-window averages and optional monthly buckets for a city
+
+        ``windows`` maps a window name to its length in days. Each window
+        reports avg_price, avg_price_per_sqft, avg_days_on_market and
+        total (None averages when the window is empty). ``monthly_days``
+        adds a chronologically sorted list of year/month buckets.
+        """
+        now = now or datetime.utcnow()
+        spans = list(windows.values()) + ([monthly_days] if monthly_days else [])
+        if not spans:
+            return {'windows': {}, 'monthly': []}
+
+        date_path = f'${date_field}'
+        facets = {
+            f'window_{name}': [
+                {'$match': {date_field: {'$gte': now - timedelta(days=days)}}},
+                {'$group': {'_id': None, **self._accumulators(date_path)}}
+            ]
+            for name, days in windows.items()
+        }
+
+        if monthly_days:
+            facets['monthly'] = [
+                {'$match': {date_field: {'$gte': now - timedelta(days=monthly_days)}}},
+                {
+                    '$group': {
+                        '_id': {
+                            'year': {'$year': date_path},
+                            'month': {'$month': date_path}
+                        },
+                        **self._accumulators(date_path)
+                    }
+                },
+                {'$sort': {'_id.year': 1, '_id.month': 1}}
+            ]
+
+        pipeline = [
+            {
+                '$match': {
+                    'city': city,
+                    date_field: {'$gte': now - timedelta(days=max(spans))}
+                }
+            },
+            {'$facet': facets}
+        ]
+
+        result = list(self.properties_collection.aggregate(pipeline))
+        facet_results = result[0] if result else {}
+
+        trends = {'windows': {}, 'monthly': []}
+        for name in windows:
+            groups = facet_results.get(f'window_{name}', [])
+            trends['windows'][name] = self._format_group(groups[0] if groups else None)
+
+        for bucket in facet_results.get('monthly', []):
+            trends['monthly'].append({
+                'year': bucket['_id']['year'],
+                'month': bucket['_id']['month'],
+                **self._format_group(bucket)
+            })
+
+        return trends
+
+    @staticmethod
+    def price_change(monthly: List[Dict[str, Any]]) -> float:
+        """Percentage change between the first and last monthly average price"""
+        if len(monthly) < 2:
+            return 0.0
+
+        first_month = monthly[0]['avg_price']
+        last_month = monthly[-1]['avg_price']
+        return ((last_month - first_month) / first_month) * 100
+
+    def _accumulators(self, date_path: str) -> Dict[str, Any]:
+        return {
+            'avg_price': {'$avg': '$price'},
+            'avg_price_per_sqft': {
+                '$avg': {'$divide': ['$price', '$square_feet']}
+            },
+            'avg_days_on_market': {
+                '$avg': {
+                    '$divide': [
+                        {'$subtract': [date_path, '$listed_date']},
+                        DAY_MS
+                    ]
+                }
+            },
+            'total': {'$sum': 1}
+        }
+
+    def _format_group(self, group: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not group:
+            return {
+                'avg_price': None,
+                'avg_price_per_sqft': None,
+                'avg_days_on_market': None,
+                'total': 0
+            }
+
+        return {
+            'avg_price': group['avg_price'],
+            'avg_price_per_sqft': group['avg_price_per_sqft'],
+            'avg_days_on_market': group['avg_days_on_market'],
+            'total': group['total']
+        }
@@ -1,14 +1,47 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
 from database.mongodb import get_database
-from datetime import datetime, timedelta
+from services.trend_engine import TrendEngine
+from services.comparables_index import ComparablesIndex
+from services.similarity import similarity_scores, confidence_scores, BASE_CONFIDENCE
+from models.registry import ModelRegistry, LazyModel
+from models.backends import create_model
+from services.training_data import TrainingDataLoader
+from config import Config
+
+# Model input columns, in order, with the value used when a property lacks one
+FEATURE_DEFAULTS = {'square_feet': 0, 'bedrooms': 0, 'bathrooms': 0, 'lot_size': 0, 'year_built': 2000}
+FEATURE_NAMES = list(FEATURE_DEFAULTS)
 
 class ValuationService:
     def __init__(self):
         self.db = get_database()
         self.properties_collection = self.db.properties
-        self.model = self._train_model()
+        self.trend_engine = TrendEngine()
+        self.comparables_index = ComparablesIndex(
+            window_days=Config.COMPARABLES_WINDOW_DAYS,
+            refresh_interval=Config.COMPARABLES_REFRESH_INTERVAL
+        )
+        self.registry = ModelRegistry(Config.MODEL_REGISTRY_DIR, 'valuation')
+        self._model = LazyModel(
+            self.registry,
+            FEATURE_NAMES,
+            fallback=self._train_model,
+            reload_interval=Config.MODEL_RELOAD_INTERVAL
+        )
+        # Loader stats of the last training run, None for a synthetic model
+        self.training_stats = None
+
+    @property
+    def model(self) -> Any:
+        """Valuation model, loaded from the registry on first use"""
+        return self._model.get()
+
+    @property
+    def model_version(self) -> str:
+        """Registry version being served, or None for an in-process model"""
+        self._model.get()
+        return self._model.version
 
     def get_valuation(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get AI-powered valuation for a property"""
@@ -29,38 +62,83 @@ class ValuationService:
             'market_trends': self._get_market_trends(property_data['city'])
         }
     
-    def _train_model(self) -> RandomForestRegressor:
+    def get_valuations(self, properties: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Value many properties with one predict call and in-memory comparables"""
+        if not properties:
+            return []
+            
+        # One feature matrix and one predict call for the whole batch
+        X = np.array([self._prepare_features(p) for p in properties])
+        estimated_values = self.model.predict(X)
+        
+        comparables, confidences = self._score_comparables_batch(properties)
+        
+        # Market trends depend only on the city
+        market_trends = {
+            city: self._get_market_trends(city)
+            for city in {p['city'] for p in properties}
+        }
+        
+        return [
+            {
+                'estimated_value': round(float(estimated_value), 2),
+                'confidence_score': float(confidence_score),
+                'comparables': comps,
+                'market_trends': market_trends[property_data['city']]
+            }
+            for property_data, estimated_value, comps, confidence_score
+            in zip(properties, estimated_values, comparables, confidences)
+        ]
+    
+    def train_and_publish(self, **load_options) -> str:
+        """Train on the sold properties and publish the model to the registry
+
+        ``load_options`` (max_rows, window_days, trace_memory) override the
+        configured TrainingDataLoader limits.
+        """
+        self.training_stats = None
+        model = self._train_model(**load_options)
+        training_rows = self.training_stats['rows'] if self.training_stats else 0
+        return self.registry.publish(model, FEATURE_NAMES, {
+            'training_rows': training_rows,
+            'synthetic': training_rows == 0,
+            'backend': Config.VALUATION_MODEL_BACKEND,
+            'training_data': self.training_stats
+        })
+    
+    def _train_model(
+        self,
+        max_rows: Optional[int] = None,
+        window_days: Optional[int] = None,
+        trace_memory: bool = False
+    ) -> Any:
         """Train the valuation model using historical data"""
-        # Get training data from database
-        properties = list(self.properties_collection.find({
-            'sold_date': {'$exists': True}
-        }))
+        # Stream the sales into preallocated arrays instead of materializing every document
+        loader = TrainingDataLoader(
+            self.properties_collection,
+            FEATURE_DEFAULTS,
+            batch_size=Config.VALUATION_TRAINING_BATCH_SIZE
+        )
+        X, y, stats = loader.load(
+            max_rows=max_rows or Config.VALUATION_TRAINING_MAX_ROWS,
+            window_days=window_days or Config.VALUATION_TRAINING_WINDOW_DAYS,
+            trace_memory=trace_memory
+        )
         
-        if not properties:
+        if not len(y):
             # If no historical data, use basic model
             return self._create_basic_model()
-        
-        # Prepare features and target
-        X = [self._prepare_features(p) for p in properties]
-        y = [p['price'] for p in properties]
+        self.training_stats = stats
         
         # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        model = create_model()
         model.fit(X, y)
         
         return model
     
     def _prepare_features(self, property_data: Dict[str, Any]) -> List[float]:
         """Extract and normalize features for model input"""
-        features = [
-            float(property_data.get('square_feet', 0)),
-            float(property_data.get('bedrooms', 0)),
-            float(property_data.get('bathrooms', 0)),
-            float(property_data.get('lot_size', 0)),
-            float(property_data.get('year_built', 2000))
-        ]
-        
-        return features
+        return [float(property_data.get(name, default)) for name, default in FEATURE_DEFAULTS.items()]
     
     def _find_comparable_properties(
         self,
@@ -68,51 +146,74 @@ class ValuationService:
         limit: int = 3
     ) -> List[Dict[str, Any]]:
         """Find similar properties in the same area"""
-        query = {
-            'city': property_data['city'],
-            'property_type': property_data['property_type'],
-            'sold_date': {
-                '$gte': datetime.utcnow() - timedelta(days=180)
-            },
-            'square_feet': {
-                '$gte': float(property_data['square_feet']) * 0.8,
-                '$lte': float(property_data['square_feet']) * 1.2
-            }
-        }
-        
-        comparables = list(self.properties_collection
-            .find(query)
-            .limit(limit))
+        comparables = self.comparables_index.query(property_data, k=limit)
+        if not comparables:
+            return []
             
+        similarities = similarity_scores(
+            self._prepare_features(property_data),
+            [self._prepare_features(p) for p in comparables]
+        )
         return [
-            {
-                'address': p['address'],
-                'price': p['price'],
-                'sold_date': p['sold_date'].isoformat(),
-                'square_feet': p['square_feet'],
-                'similarity_score': self._calculate_similarity_score(
-                    property_data,
-                    p
-                )
-            }
-            for p in comparables
+            self._format_comparable(p, similarity)
+            for p, similarity in zip(comparables, similarities)
         ]
     
+    def _score_comparables_batch(
+        self,
+        properties: List[Dict[str, Any]],
+        limit: int = 3
+    ) -> Tuple[List[List[Dict[str, Any]]], np.ndarray]:
+        """Find and score comparables for many properties at once
+
+        Returns the formatted comparables per property and a confidence
+        score per property, computed over padded (n, limit) arrays.
+        """
+        n = len(properties)
+        subjects = np.array([self._prepare_features(p) for p in properties])
+        features = np.zeros((n, limit, len(FEATURE_NAMES)))
+        prices = np.zeros((n, limit))
+        mask = np.zeros((n, limit), dtype=bool)
+        
+        matches = [self.comparables_index.query(p, k=limit) for p in properties]
+        for i, comparables in enumerate(matches):
+            for j, p in enumerate(comparables):
+                features[i, j] = self._prepare_features(p)
+                prices[i, j] = p['price']
+                mask[i, j] = True
+        
+        similarities = similarity_scores(subjects[:, np.newaxis, :], features)
+        confidences = confidence_scores(prices, similarities, mask)
+        
+        formatted = [
+            [
+                self._format_comparable(p, similarities[i, j])
+                for j, p in enumerate(comparables)
+            ]
+            for i, comparables in enumerate(matches)
+        ]
+        return formatted, confidences
+    
+    def _format_comparable(self, comparable: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+        """Format a sold property as a comparable for API response"""
+        return {
+            'address': comparable['address'],
+            'price': comparable['price'],
+            'sold_date': comparable['sold_date'].isoformat(),
+            'square_feet': comparable['square_feet'],
+            'similarity_score': float(similarity)
+        }
+    
     def _calculate_similarity_score(
         self,
         property1: Dict[str, Any],
         property2: Dict[str, Any]
     ) -> float:
         """Calculate similarity score between two properties"""
-        features1 = self._prepare_features(property1)
-        features2 = self._prepare_features(property2)
-        
-        # Calculate Euclidean distance and convert to similarity score
-        distance = np.sqrt(sum((f1 - f2) ** 2 for f1, f2 in zip(features1, features2)))
-        max_distance = np.sqrt(sum(max(f1, f2) ** 2 for f1, f2 in zip(features1, features2)))
-        
-        similarity = (1 - distance / max_distance) * 100
-        return round(similarity, 2)
+        return float(similarity_scores(
+            self._prepare_features(property1),
+            self._prepare_features(property2)
+        ))
     
     def _calculate_confidence_score(
         self,
@@ -121,100 +222,42 @@ class ValuationService:
     ) -> float:
         """Calculate confidence score for the valuation"""
         if not comparables:
-            return 70.0  # Base confidence when no comparables
+            return BASE_CONFIDENCE  # Base confidence when no comparables
             
-        # Calculate variance in comparable prices
-        prices = [p['price'] for p in comparables]
-        price_variance = np.std(prices) / np.mean(prices)
-        
-        # Calculate average similarity score
-        similarity_scores = [p['similarity_score'] for p in comparables]
-        avg_similarity = np.mean(similarity_scores)
-        
-        # Combine factors for final confidence score
-        confidence = 95 - (price_variance * 100) + (avg_similarity / 10)
-        return round(min(max(confidence, 70), 95), 2)
+        return float(confidence_scores(
+            [p['price'] for p in comparables],
+            [p['similarity_score'] for p in comparables]
+        )[0])
     
     def _get_market_trends(self, city: str) -> Dict[str, Any]:
         """Get market trends for the area"""
-        now = datetime.utcnow()
-        three_months_ago = now - timedelta(days=90)
+        # One $facet covers the 3-month averages and the monthly price series
+        trends = self.trend_engine.get_trends(
+            city,
+            windows={'quarter': 90},
+            monthly_days=90
+        )
         
-        pipeline = [
-            {
-                '$match': {
-                    'city': city,
-                    'sold_date': {'$gte': three_months_ago}
-                }
-            },
-            {
-                '$group': {
-                    '_id': None,
-                    'avg_price': {'$avg': '$price'},
-                    'avg_price_per_sqft': {
-                        '$avg': {'$divide': ['$price', '$square_feet']}
-                    },
-                    'avg_days_on_market': {
-                        '$avg': {
-                            '$divide': [
-                                {'$subtract': ['$sold_date', '$listed_date']},
-                                24 * 60 * 60 * 1000
-                            ]
-                        }
-                    }
-                }
-            }
-        ]
-        
-        result = list(self.properties_collection.aggregate(pipeline))
-        if not result:
+        metrics = trends['windows']['quarter']
+        if not metrics['total']:
             return {
                 'price_trend': 0,
                 'avg_days_on_market': 30,
                 'price_per_sqft': 0
             }
             
-        metrics = result[0]
         return {
-            'price_trend': self._calculate_price_trend(city),
+            'price_trend': round(self.trend_engine.price_change(trends['monthly']), 2),
             'avg_days_on_market': round(metrics['avg_days_on_market'], 1),
             'price_per_sqft': round(metrics['avg_price_per_sqft'], 2)
         }
     
     def _calculate_price_trend(self, city: str) -> float:
         """Calculate price trend (percentage change) over last 3 months"""
-        now = datetime.utcnow()
-        three_months_ago = now - timedelta(days=90)
-        
-        pipeline = [
-            {
-                '$match': {
-                    'city': city,
-                    'sold_date': {'$gte': three_months_ago}
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        'month': {'$month': '$sold_date'}
-                    },
-                    'avg_price': {'$avg': '$price'}
-                }
-            },
-            {'$sort': {'_id.month': 1}}
-        ]
-        
-        results = list(self.properties_collection.aggregate(pipeline))
-        if len(results) < 2:
-            return 0.0
-            
-        first_month = results[0]['avg_price']
-        last_month = results[-1]['avg_price']
-        
-        price_change = ((last_month - first_month) / first_month) * 100
-        return round(price_change, 2)
+        trends = self.trend_engine.get_trends(city, windows={}, monthly_days=90)
+        return round(self.trend_engine.price_change(trends['monthly']), 2)
     
-    def _create_basic_model(self) -> RandomForestRegressor:
+    def _create_basic_model(self) -> Any:
         """Create a basic model when no historical data is available"""
         # Generate synthetic data for initial model
         n_samples = 1000
@@ -227,6 +270,6 @@ class ValuationService:
             X[:, 4] * 100     # year built
         ) * 1000  # Scale to realistic prices
         
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        model = create_model()
         model.fit(X, y)
         return model
\ No newline at end of file
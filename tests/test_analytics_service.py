@@ -0,0 +1,135 @@
+import pytest
+from datetime import datetime, timedelta
+from services.analytics_service import AnalyticsService
+from database.mongodb import get_database
+from benchmarks.common import QueryCounter, CountingCollection
+
+@pytest.fixture
+def analytics_service():
+    return AnalyticsService()
+
+def _sale(city, neighborhood, price, days_ago):
+    sold = datetime.utcnow() - timedelta(days=days_ago)
+    return {
+        'address': f'{price} Analytics St',
+        'city': city,
+        'neighborhood': neighborhood,
+        'price': price,
+        'square_feet': 2000,
+        'listed_date': sold - timedelta(days=20),
+        'sold_date': sold
+    }
+
+@pytest.fixture
+def sample_sales():
+    db = get_database()
+    sales = [
+        _sale('toronto', 'Downtown', 1000000, 200),
+        _sale('toronto', 'Downtown', 1100000, 10),
+        _sale('toronto', 'Riverdale', 900000, 100),
+        # Same neighborhood name in another city, with a falling price series
+        _sale('ottawa', 'Downtown', 800000, 200),
+        _sale('ottawa', 'Downtown', 400000, 10)
+    ]
+    db.properties.insert_many(sales)
+    yield sales
+    db.properties.delete_many({'address': {'$regex': 'Analytics St$'}})
+
+def test_get_neighborhood_analysis(analytics_service, sample_sales):
+    analysis = analytics_service.get_neighborhood_analysis('toronto')
+    
+    names = sorted(n['name'] for n in analysis['neighborhoods'])
+    assert names == ['Downtown', 'Riverdale']
+    assert analysis['city_summary']['total_listings'] == 3
+    for neighborhood in analysis['neighborhoods']:
+        assert neighborhood['score'] >= 0
+
+def test_neighborhood_price_trends_keyed_on_city(analytics_service, sample_sales):
+    trends = analytics_service._get_neighborhood_price_trends('toronto', ['Downtown', 'Riverdale'])
+    
+    assert trends['Downtown'] == pytest.approx(0.1)
+    assert trends['Riverdale'] == 0
+    assert analytics_service._calculate_price_trend('ottawa', 'Downtown') == pytest.approx(-0.5)
+
+def test_neighborhood_analysis_query_count_is_constant(analytics_service):
+    db = get_database()
+    counter = QueryCounter()
+    analytics_service.properties = CountingCollection(analytics_service.properties, counter)
+    series = analytics_service.market_series
+    series.collection = CountingCollection(series.collection, counter)
+    
+    query_counts = []
+    for size in [2, 20]:
+        city = f'city-{size}'
+        db.properties.insert_many([
+            _sale(city, f'Neighborhood {n}', 500000 + days * 1000, days)
+            for n in range(size)
+            for days in (30, 200)
+        ])
+        series.rebuild(city)
+        counter.reset()
+        analytics_service.get_neighborhood_analysis(city)
+        query_counts.append(counter.total)
+    
+    assert query_counts == [2, 2]
+
+@pytest.fixture
+def sample_listings():
+    db = get_database()
+    now = datetime.utcnow()
+    # Downtown sold at $500/sqft with prices up 10% over the year
+    db.properties.insert_many([
+        _sale('toronto', 'Downtown', 1000000, 200),
+        _sale('toronto', 'Downtown', 1100000, 10)
+    ])
+    listings = [
+        {
+            'address': f'{i} Listing Ave',
+            'city': 'toronto',
+            'neighborhood': 'Downtown',
+            'property_type': 'condo',
+            'price': 400000 + i * 50000,
+            'square_feet': 1000,
+            'listed_date': now - timedelta(days=5)
+        }
+        for i in range(10)
+    ]
+    db.properties.insert_many(listings)
+    yield listings
+    db.properties.delete_many({})
+
+def test_get_investment_opportunities_top_k(analytics_service, sample_listings):
+    opportunities = analytics_service.get_investment_opportunities(
+        'toronto', budget=2000000, limit=3
+    )
+    
+    # Cheapest per sqft first
+    assert [o['property']['price'] for o in opportunities] == [400000, 450000, 500000]
+    rois = [o['metrics']['roi_potential'] for o in opportunities]
+    assert rois == sorted(rois, reverse=True)
+    assert opportunities[0]['metrics']['market_price_per_sqft'] == pytest.approx(525)
+
+def test_get_investment_opportunities_min_roi(analytics_service, sample_listings):
+    opportunities = analytics_service.get_investment_opportunities(
+        'toronto', budget=2000000, limit=10, min_roi=15
+    )
+    
+    assert len(opportunities) == 2
+    assert all(o['metrics']['roi_potential'] >= 15 for o in opportunities)
+    
+    # Matches an unscreened in-memory evaluation of the same listings
+    stats = analytics_service._get_neighborhood_market_stats('toronto')
+    expected = [
+        l['price'] for l in sample_listings
+        if analytics_service._calculate_investment_metrics(
+            {**l, 'price_per_sqft': l['price'] / l['square_feet']}, stats['Downtown']
+        )['roi_potential'] >= 15
+    ]
+    assert sorted(o['property']['price'] for o in opportunities) == expected
+
+def test_get_investment_opportunities_screens_everything(analytics_service, sample_listings):
+    assert analytics_service.get_investment_opportunities('toronto', budget=2000000, min_roi=500) == []
+
+def test_get_investment_opportunities_non_positive_limit(analytics_service, sample_listings):
+    assert analytics_service.get_investment_opportunities('toronto', budget=2000000, limit=0) == []
+    assert analytics_service.get_investment_opportunities('toronto', budget=2000000, limit=-1) == []
@@ -0,0 +1,18 @@
+import pytest
+from app import create_app
+from config import Config
+
+class ApiConfig(Config):
+    TESTING = True
+    CACHE_PREWARM_ENABLED = False
+
+@pytest.fixture
+def client():
+    return create_app(ApiConfig).test_client()
+
+@pytest.mark.parametrize('query', ['limit=abc', 'min_roi=x', 'budget=lots'])
+def test_investment_opportunities_rejects_bad_params(client, query):
+    response = client.get(f'/api/investment-opportunities?{query}')
+    
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
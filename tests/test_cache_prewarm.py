@@ -0,0 +1,108 @@
+import pytest
+from datetime import datetime, timedelta
+from services.cache_prewarm import CachePrewarmer, LOCK_ID
+from services.response_cache import ResponseCache, MemoryCacheBackend, MongoCacheBackend
+from database.mongodb import get_database
+
+@pytest.fixture
+def computed():
+    return []
+
+@pytest.fixture
+def computations(computed):
+    def trends(args):
+        computed.append(('market_trends', args['city'], args['period']))
+        return {'city': args['city'], 'period': args['period']}
+
+    def broken(args):
+        raise RuntimeError('aggregation timed out')
+
+    return {'market_trends': trends, 'neighborhood_analysis': broken}
+
+def _request(cache, computations, endpoint, times=1, **args):
+    for _ in range(times):
+        cache.get_or_compute(endpoint, args, lambda: computations[endpoint](args))
+
+def test_hot_keys_are_ranked_by_requests(computations):
+    cache = ResponseCache(MemoryCacheBackend())
+    prewarmer = CachePrewarmer(cache, computations, top_keys=2, lead=0)
+    _request(cache, computations, 'market_trends', 5, city='toronto', period='1y')
+    _request(cache, computations, 'market_trends', 3, city='ottawa', period='1y')
+    _request(cache, computations, 'market_trends', 1, city='vancouver', period='3m')
+    # Endpoints the pre-warmer cannot compute are not tracked
+    for _ in range(9):
+        cache.get_or_compute('investment_opportunities', {'city': 'toronto'}, lambda: [])
+
+    prewarmer.record_requests()
+
+    hot = prewarmer.hot_keys(2)
+    assert [(h['args']['city'], h['count']) for h in hot] == [('toronto', 5), ('ottawa', 3)]
+    assert all(h['endpoint'] == 'market_trends' for h in hot)
+
+def test_run_warms_only_entries_near_expiry(computations, computed):
+    cache = ResponseCache(MemoryCacheBackend(), default_ttl=300)
+    _request(cache, computations, 'market_trends', 2, city='toronto', period='1y')
+    computed.clear()
+
+    fresh = CachePrewarmer(cache, computations, lead=60).run_once()
+    assert fresh['fresh'] == 1 and fresh['warmed'] == 0
+    assert computed == []
+
+    prewarmer = CachePrewarmer(cache, computations, lead=600)
+    _request(cache, computations, 'market_trends', city='toronto', period='1y')
+    run = prewarmer.run_once()
+
+    assert run['warmed'] == 1
+    assert computed == [('market_trends', 'toronto', '1y')]
+    status = prewarmer.status()
+    assert status['queue_depth'] == 0
+    assert status['last_run']['warmed'] == 1
+    [key] = status['keys']
+    assert key['args'] == {'city': 'toronto', 'period': '1y'}
+    assert key['last_duration_ms'] >= 0
+    assert key['error'] is None
+
+def test_invalidated_entries_are_recomputed(computations, computed):
+    cache = ResponseCache(MemoryCacheBackend())
+    prewarmer = CachePrewarmer(cache, computations, lead=0)
+    _request(cache, computations, 'market_trends', city='toronto', period='1y')
+    cache.invalidate()
+    computed.clear()
+
+    assert prewarmer.run_once()['warmed'] == 1
+    assert cache.remaining_ttl('market_trends', {'city': 'toronto', 'period': '1y'}) > 0
+
+    # Served from the warmed entry
+    _request(cache, computations, 'market_trends', city='toronto', period='1y')
+    assert computed == [('market_trends', 'toronto', '1y')]
+
+def test_failures_are_reported(computations):
+    cache = ResponseCache(MemoryCacheBackend())
+    prewarmer = CachePrewarmer(cache, computations, lead=0)
+    cache.get_or_compute('neighborhood_analysis', {'city': 'toronto'}, lambda: {'ok': True})
+    cache.invalidate()
+
+    run = prewarmer.run_once()
+
+    assert run['failed'] == 1
+    assert 'timed out' in prewarmer.status()['keys'][0]['error']
+
+def test_shared_cache_is_warmed_by_one_lease_holder(computations):
+    cache = ResponseCache(MongoCacheBackend())
+    first = CachePrewarmer(cache, computations, interval=30, lead=0)
+    second = CachePrewarmer(cache, computations, interval=30, lead=0)
+    _request(cache, computations, 'market_trends', city='toronto', period='1y')
+    cache.invalidate()
+
+    assert first.run_once()['warmed'] == 1
+    assert 'skipped' in second.run_once()
+    assert second.status()['lock_held'] is False
+    assert 'skipped' not in first.run_once()
+
+    # A lease that is not renewed passes to another worker
+    get_database().cache_meta.update_one(
+        {'_id': LOCK_ID},
+        {'$set': {'expires_at': datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert 'skipped' not in second.run_once()
+    assert get_database().cache_meta.find_one({'_id': LOCK_ID})['owner'] == second.owner
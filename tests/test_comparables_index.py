@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime, timedelta
+from services.comparables_index import ComparablesIndex
+from database.mongodb import get_database
+
+def _sale(address, square_feet, days_ago=10, property_type='house', city='toronto', coords=None, **extra):
+    doc = {
+        'address': address,
+        'city': city,
+        'property_type': property_type,
+        'price': square_feet * 500,
+        'square_feet': square_feet,
+        'bedrooms': 3,
+        'bathrooms': 2,
+        'lot_size': 4000,
+        'year_built': 1990,
+        'listed_date': datetime.utcnow() - timedelta(days=days_ago + 20),
+        'sold_date': datetime.utcnow() - timedelta(days=days_ago),
+        **extra
+    }
+    if coords:
+        doc['location'] = {'type': 'Point', 'coordinates': [coords[1], coords[0]]}
+    return doc
+
+@pytest.fixture
+def index():
+    return ComparablesIndex(window_days=180, refresh_interval=0, min_buffer=2)
+
+@pytest.fixture
+def sample_sales():
+    db = get_database()
+    sales = [
+        _sale('1500 St', 1500),
+        _sale('1900 St', 1900),
+        _sale('2100 St', 2100),
+        _sale('3000 St', 3000),
+        _sale('Old St', 2000, days_ago=400),
+        _sale('Condo St', 2000, property_type='condo'),
+        _sale('Ottawa St', 2000, city='ottawa')
+    ]
+    db.properties.insert_many(sales)
+    yield sales
+    db.properties.delete_many({})
+
+SUBJECT = {
+    'city': 'toronto', 'property_type': 'house', 'square_feet': 2000,
+    'bedrooms': 3, 'bathrooms': 2, 'lot_size': 4000, 'year_built': 1990
+}
+
+def test_nearest_neighbours_in_partition(index, sample_sales):
+    results = index.query(SUBJECT, k=3)
+    
+    addresses = [r['address'] for r in results]
+    assert sorted(addresses[:2]) == ['1900 St', '2100 St']
+    assert addresses[2] == '1500 St'
+
+def test_excludes_sales_outside_window(index, sample_sales):
+    results = index.query(SUBJECT, k=10)
+    
+    assert 'Old St' not in [r['address'] for r in results]
+    assert len(results) == 4
+
+def test_incremental_refresh(index, sample_sales):
+    index.query(SUBJECT)
+    get_database().properties.insert_one(_sale('2000 St', 2000))
+    
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+    assert index.query(SUBJECT, k=1)[0]['address'] == '2000 St'
+    assert index.stats()['rows'] == 7
+
+def test_location_breaks_ties(index):
+    db = get_database()
+    db.properties.insert_many([
+        _sale('Far St', 2000, coords=(43.80, -79.10)),
+        _sale('Near St', 2000, coords=(43.65, -79.38))
+    ])
+    
+    subject = {**SUBJECT, 'latitude': 43.651, 'longitude': -79.381}
+    
+    assert index.query(subject, k=1)[0]['address'] == 'Near St'
+
+def test_unknown_partition(index, sample_sales):
+    assert index.query({**SUBJECT, 'city': 'vancouver'}) == []
+
+def test_sales_missing_city_or_type_are_skipped(index, sample_sales):
+    get_database().properties.insert_many([
+        {'city': 'toronto', 'price': 900000, 'sold_date': datetime.utcnow()},
+        {'property_type': 'house', 'price': 900000, 'sold_date': datetime.utcnow()}
+    ])
+    
+    results = index.query(SUBJECT, k=10)
+    
+    assert len(results) == 4
+    assert index.stats()['rows'] == 6
+
+def test_sales_without_floor_area_are_skipped(index, sample_sales):
+    db = get_database()
+    db.properties.insert_many([
+        {k: v for k, v in _sale('No Area St', 2000).items() if k != 'square_feet'},
+        _sale('Zero Area St', 0)
+    ])
+    
+    results = index.query(SUBJECT, k=10)
+    
+    assert {r['address'] for r in results} == {'1500 St', '1900 St', '2100 St', '3000 St'}
+    assert index.stats()['rows'] == 6
+
+def test_unlocated_sales_fill_located_query(index, sample_sales):
+    get_database().properties.insert_one(_sale('Near St', 2600, coords=(43.65, -79.38)))
+    subject = {**SUBJECT, 'latitude': 43.651, 'longitude': -79.381}
+    
+    addresses = [r['address'] for r in index.query(subject, k=3)]
+    
+    # The located sale ranks first, then the nearest unlocated ones by features
+    assert addresses[0] == 'Near St'
+    assert sorted(addresses[1:]) == ['1900 St', '2100 St']
+    assert len(index.query(subject, k=10)) == 5
@@ -0,0 +1,80 @@
+import pytest
+from database.indexes import (
+    INDEXES, query_shapes, ensure_indexes, diff_indexes, build_missing,
+    explain_query_shapes, _plan_stages
+)
+from database.mongodb import get_database
+
+@pytest.fixture
+def scratch_db():
+    # A separate database, so diffs do not see indexes created at connect time
+    client = get_database().client
+    db = client.get_database('prophetestate_index_test')
+    
+    yield db
+    
+    client.drop_database('prophetestate_index_test')
+
+def test_registered_indexes_are_unique():
+    keys = [(collection, tuple(k)) for collection, k, _, _ in INDEXES]
+    assert len(keys) == len(set(keys))
+
+def test_diff_reports_missing_and_extra(scratch_db):
+    db = scratch_db
+    db.properties.create_index([('price', 1)])
+    
+    diff = diff_indexes(db)
+    
+    assert len(diff['missing']) == len(INDEXES)
+    assert diff['present'] == []
+    assert [(e['collection'], e['name']) for e in diff['extra']] == [('properties', 'price_1')]
+
+def test_build_missing_creates_registered_indexes(scratch_db):
+    db = scratch_db
+    db.properties.create_index([('price', 1)])
+    
+    result = build_missing(db, drop_extra=True)
+    
+    assert len(result['created']) == len(INDEXES)
+    assert 'properties.city_1_sold_date_-1' in result['created']
+    assert result['dropped'] == ['properties.price_1']
+    
+    diff = diff_indexes(db)
+    assert diff['missing'] == [] and diff['extra'] == []
+    assert build_missing(db) == {'created': [], 'dropped': []}
+
+def test_ensure_indexes_limited_to_collections(scratch_db):
+    db = scratch_db
+    ensure_indexes(db, collections=['api_cache'])
+    
+    present = {e['collection'] for e in diff_indexes(db)['present']}
+    assert present == {'api_cache'}
+
+def test_query_shapes_name_their_source():
+    shapes = query_shapes()
+    
+    assert all(shape['source'] and shape['filter'] for shape in shapes)
+    assert {shape['collection'] for shape in shapes} <= {spec[0] for spec in INDEXES}
+
+def test_explain_reports_every_shape(scratch_db):
+    reports = explain_query_shapes(scratch_db)
+    
+    assert len(reports) == len(query_shapes())
+    assert all('collscan' in report for report in reports)
+
+def test_plan_stages_detects_collscan():
+    plan = {
+        'stage': 'SORT',
+        'inputStage': {
+            'stage': 'OR',
+            'inputStages': [
+                {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'city_1_sold_date_-1'}},
+                {'stage': 'COLLSCAN'}
+            ]
+        }
+    }
+    
+    assert list(_plan_stages(plan)) == [
+        ('SORT', None), ('OR', None), ('FETCH', None),
+        ('IXSCAN', 'city_1_sold_date_-1'), ('COLLSCAN', None)
+    ]
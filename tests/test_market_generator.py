@@ -0,0 +1,45 @@
+from datetime import datetime
+from benchmarks.generator import MarketGenerator, CITIES, PROPERTY_TYPES
+from database.mongodb import get_database
+
+NOW = datetime(2024, 6, 15)
+
+def _first_batch(seed):
+    return next(MarketGenerator(seed=seed, now=NOW).listings(500, batch_size=500))
+
+def test_same_seed_same_listings():
+    assert _first_batch(7) == _first_batch(7)
+    assert _first_batch(7) != _first_batch(8)
+
+def test_batches_do_not_change_the_data():
+    generator = MarketGenerator(seed=3, now=NOW)
+    whole = next(generator.listings(300, batch_size=300))
+    batched = [doc for batch in generator.listings(300, batch_size=64) for doc in batch]
+
+    assert len(batched) == 300
+    assert [d['address'] for d in batched] == [d['address'] for d in whole]
+
+def test_listings_are_realistic():
+    listings = _first_batch(42)
+
+    sold = [d for d in listings if 'sold_date' in d]
+    assert 0.4 < len(sold) / len(listings) < 0.7
+    assert all(d['listed_date'] < d['sold_date'] <= NOW for d in sold)
+    assert all(d['status'] == ('sold' if 'sold_date' in d else 'active') for d in listings)
+
+    for doc in listings:
+        assert doc['city'] in CITIES
+        assert doc['neighborhood'] in CITIES[doc['city']][3]
+        assert doc['property_type'] in PROPERTY_TYPES
+        assert doc['price'] > 0 and doc['square_feet'] > 0
+        longitude, latitude = doc['location']['coordinates']
+        assert abs(latitude - CITIES[doc['city']][0]) < 0.5
+
+def test_populate_seeds_every_collection():
+    db = get_database()
+    counts = MarketGenerator(seed=1, now=NOW).populate(db, listings=250, batch_size=100)
+
+    assert counts['properties'] == 250
+    assert db.properties.count_documents({}) == 250
+    assert db.amenities.count_documents({}) == counts['amenities'] > 0
+    assert db.market_data.count_documents({'city': 'toronto'}) == 36
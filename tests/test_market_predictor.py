@@ -0,0 +1,70 @@
+import threading
+import time
+import pytest
+from models.market_predictor import MarketPredictor
+from models.registry import ModelRegistry
+
+@pytest.fixture(scope='module')
+def registry(tmp_path_factory):
+    registry = ModelRegistry(str(tmp_path_factory.mktemp('registry')), 'market_predictor')
+    MarketPredictor(registry).train_and_publish()
+    return registry
+
+@pytest.fixture
+def predictor(registry):
+    return MarketPredictor(registry)
+
+def test_monthly_resolution_by_default(predictor):
+    forecast = predictor.predict_market('toronto', months_ahead=12)
+    
+    assert len(forecast['predictions']) == 12
+    assert forecast['summary']['resolution'] == 'monthly'
+    assert forecast['summary']['model_version'] == predictor.model_version
+
+@pytest.mark.parametrize('resolution, points', [('daily', 180), ('weekly', 26)])
+def test_other_resolutions(predictor, resolution, points):
+    forecast = predictor.predict_market('toronto', months_ahead=6, resolution=resolution)
+    
+    assert len(forecast['predictions']) == points
+
+def test_unknown_resolution(predictor):
+    with pytest.raises(ValueError):
+        predictor.predict_market('toronto', resolution='hourly')
+
+def test_forecasts_are_deterministic_and_cached(predictor, registry, monkeypatch):
+    first = predictor.predict_market('toronto')
+    
+    # A fresh predictor loading the same version produces the same forecast
+    assert MarketPredictor(registry).predict_market('toronto') == first
+    
+    calls = []
+    monkeypatch.setattr(predictor, '_forecast', lambda *args: calls.append(args))
+    assert predictor.predict_market('toronto') == first
+    assert calls == []
+
+def test_trains_and_persists_when_registry_empty(tmp_path):
+    registry = ModelRegistry(str(tmp_path), 'market_predictor')
+    predictor = MarketPredictor(registry)
+    
+    predictor.predict_market('ottawa', months_ahead=3)
+    
+    assert registry.latest_version() == predictor.model_version
+
+def test_concurrent_first_requests_train_once(tmp_path, monkeypatch):
+    predictor = MarketPredictor(ModelRegistry(str(tmp_path), 'market_predictor'))
+    trained = []
+    
+    def initialize_models():
+        trained.append(1)
+        time.sleep(0.05)
+        return {'price_model': None, 'trend_model': None}
+    
+    monkeypatch.setattr(predictor, 'initialize_models', initialize_models)
+    threads = [threading.Thread(target=predictor._get_models) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert trained == [1]
+    assert len(predictor.registry.versions()) == 1
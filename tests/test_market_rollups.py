@@ -0,0 +1,131 @@
+import time
+import pytest
+from pymongo.errors import ExecutionTimeout
+from datetime import datetime, timedelta
+from services.market_rollups import MarketRollupService
+from database.mongodb import get_database
+
+@pytest.fixture
+def rollup_service():
+    return MarketRollupService(max_age=300)
+
+@pytest.fixture
+def sample_properties():
+    db = get_database()
+    now = datetime.utcnow()
+    properties = [
+        {'address': '1 Rollup St', 'city': 'toronto', 'price': 1000000,
+         'neighborhood': 'Downtown', 'listed_date': now - timedelta(days=10)},
+        {'address': '2 Rollup St', 'city': 'toronto', 'price': 1200000,
+         'neighborhood': 'Downtown', 'listed_date': now - timedelta(days=60)},
+        {'address': '3 Rollup St', 'city': 'toronto', 'price': 800000,
+         'neighborhood': 'Leslieville', 'listed_date': now - timedelta(days=200)},
+        {'address': '4 Rollup St', 'city': 'ottawa', 'price': 600000,
+         'neighborhood': 'Downtown', 'listed_date': now - timedelta(days=5)}
+    ]
+    db.properties.insert_many(properties)
+    yield properties
+    db.properties.delete_many({'address': {'$in': [p['address'] for p in properties]}})
+
+def test_refresh_city(rollup_service, sample_properties):
+    rollup = rollup_service.refresh_city('toronto')
+    
+    assert rollup['neighborhood_count'] == 2
+    assert rollup['windows']['all']['total_listings'] == 3
+    assert rollup['windows']['all']['avg_price'] == 1000000
+    assert rollup['windows']['monthly']['avg_price'] == 1000000
+    assert rollup['windows']['quarterly']['avg_price'] == 1100000
+    assert rollup['windows']['yearly']['total_listings'] == 3
+
+def test_hot_neighborhoods_use_recent_window(rollup_service, sample_properties):
+    rollup = rollup_service.refresh_city('toronto')
+    hot = rollup_service.hot_neighborhoods(rollup)
+    
+    # Leslieville has no listings in the last 90 days; Ottawa's Downtown is a different city
+    assert [n['name'] for n in hot] == ['Downtown']
+    assert hot[0]['total_listings'] == 2
+    assert 30 <= hot[0]['avg_days_on_market'] <= 40
+
+def test_days_on_market_shift_with_read_time(rollup_service, sample_properties):
+    rollup = rollup_service.refresh_city('toronto')
+    metrics_now = rollup_service.city_metrics(rollup, rollup['refreshed_at'])
+    metrics_later = rollup_service.city_metrics(rollup, rollup['refreshed_at'] + timedelta(days=2))
+    
+    assert metrics_later['avg_days_on_market'] == pytest.approx(metrics_now['avg_days_on_market'] + 2)
+
+def test_neighborhood_rollups_keyed_by_city(rollup_service, sample_properties):
+    rollup_service.refresh(['toronto', 'ottawa'])
+    
+    toronto = rollup_service.get_neighborhood_rollup('toronto', 'Downtown')
+    ottawa = rollup_service.get_neighborhood_rollup('ottawa', 'Downtown')
+    
+    assert toronto['windows']['all']['total_listings'] == 2
+    assert ottawa['windows']['all']['total_listings'] == 1
+
+def test_stale_rollups_are_refreshed(rollup_service, sample_properties):
+    db = get_database()
+    rollup_service.refresh_city('toronto')
+    db.properties.insert_one({'address': '5 Rollup St', 'city': 'toronto', 'price': 900000,
+                              'neighborhood': 'Downtown', 'listed_date': datetime.utcnow()})
+    
+    # Fresh rollups are served as stored
+    assert rollup_service.get_city_rollup('toronto')['windows']['all']['total_listings'] == 3
+    
+    db.market_rollups.update_one(
+        {'_id': 'city:toronto'},
+        {'$set': {'refreshed_at': datetime.utcnow() - timedelta(seconds=301)}}
+    )
+    assert rollup_service.get_city_rollup('toronto')['windows']['all']['total_listings'] == 4
+    db.properties.delete_one({'address': '5 Rollup St'})
+
+class _SlowAggregate:
+    """Collection proxy whose aggregations take a fixed time or time out"""
+
+    def __init__(self, collection, delay=0.0, error=None):
+        self._collection = collection
+        self.delay = delay
+        self.error = error
+        self.options = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.options.append(kwargs)
+        if self.error:
+            raise self.error
+        time.sleep(self.delay)
+        return self._collection.aggregate(pipeline, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+def test_refresh_fans_out_across_cities(sample_properties):
+    service = MarketRollupService(concurrency=3, timeout_ms=2000)
+    service.properties_collection = _SlowAggregate(service.properties_collection, delay=0.2)
+    
+    start = time.perf_counter()
+    counts = service.refresh(['toronto', 'ottawa', 'vancouver'])
+    elapsed = time.perf_counter() - start
+    
+    assert counts == {'toronto': 2, 'ottawa': 1, 'vancouver': 0}
+    assert elapsed < 0.5  # three 200ms aggregations overlap
+    assert all(options == {'maxTimeMS': 2000} for options in service.properties_collection.options)
+
+def test_timed_out_refresh_serves_stale_rollup(sample_properties):
+    service = MarketRollupService(max_age=0)
+    service.refresh(['toronto'])
+    service.properties_collection = _SlowAggregate(
+        service.properties_collection,
+        error=ExecutionTimeout('operation exceeded time limit')
+    )
+    
+    rollups = service.get_city_rollups(['toronto'])
+    assert rollups['toronto']['windows']['all']['total_listings'] == 3
+    
+    with pytest.raises(ExecutionTimeout):
+        service.get_city_rollups(['ottawa'])
+
+def test_refresh_invalidates_cached_responses(rollup_service, sample_properties):
+    before = rollup_service.data_version.current()
+    
+    rollup_service.refresh(['toronto'])
+    
+    assert rollup_service.data_version.current() == before + 1
@@ -0,0 +1,159 @@
+import pytest
+from datetime import datetime, timedelta
+from services.market_series import MarketSeries
+from services.analytics_service import AnalyticsService
+from services.property_service import PropertyService
+from database.mongodb import get_database
+
+MAY = datetime(2024, 5, 1)
+MARCH = datetime(2024, 3, 1)
+
+def _sale(neighborhood, property_type, price, sold, city='london'):
+    return {
+        'address': f'{price} Series St',
+        'city': city,
+        'neighborhood': neighborhood,
+        'property_type': property_type,
+        'price': price,
+        'square_feet': 1000,
+        'listed_date': sold - timedelta(days=10),
+        'sold_date': sold
+    }
+
+@pytest.fixture
+def series():
+    return MarketSeries()
+
+@pytest.fixture
+def sales():
+    sales = [
+        _sale('Wortley', 'house', 600000, datetime(2024, 5, 20)),
+        _sale('Wortley', 'condo', 400000, datetime(2024, 5, 3)),
+        _sale('Byron', 'house', 800000, datetime(2024, 5, 31, 23)),
+        _sale('Byron', 'house', 700000, datetime(2024, 3, 14)),
+        {**_sale('Byron', 'house', 500000, datetime(2024, 3, 2)), 'sold_date': None}
+    ]
+    get_database().properties.insert_many([dict(s) for s in sales])
+    return sales
+
+def _rows(series, city='london'):
+    return {
+        (r['neighborhood'], r['property_type'], r['month']): r
+        for r in series.collection.find({'city': city, 'month': {'$exists': True}}, {'_id': 0, 'updated_at': 0})
+    }
+
+def test_rebuild_rolls_up_every_dimension(series, sales):
+    series.rebuild('london')
+
+    [may] = series.monthly('london', datetime(2024, 5, 10), datetime(2024, 6, 1))
+    assert may['month'] == MAY
+    assert may['neighborhood'] is None and may['property_type'] is None
+    assert may['sales'] == 3
+    assert may['avg_price'] == pytest.approx(600000)
+    assert may['avg_price_per_sqft'] == pytest.approx(600)
+    assert may['avg_days_on_market'] == pytest.approx(10)
+
+    byron = series.monthly('london', MARCH, neighborhoods=['Byron', 'Wortley'])
+    assert [(r['neighborhood'], r['month'], r['sales']) for r in byron] == [
+        ('Byron', MARCH, 1), ('Byron', MAY, 1), ('Wortley', MAY, 2)
+    ]
+    assert series.monthly('london', MARCH, property_type='condo')[0]['sum_price'] == 400000
+
+def test_incremental_matches_rebuild(series, sales):
+    for sale in sales:
+        series.record_sale(sale)
+    incremental = _rows(series)
+
+    series.rebuild('london')
+
+    assert incremental.keys() == _rows(series).keys()
+    for key, row in _rows(series).items():
+        for field in ('sales', 'sum_price', 'sum_days_on_market'):
+            assert incremental[key][field] == pytest.approx(row[field])
+
+def test_apply_moves_only_what_changed(series, sales):
+    series.rebuild('london')
+    before = _rows(series)
+    sale = sales[0]
+
+    # Re-applying an unchanged listing touches nothing
+    assert series.apply([sale], [dict(sale)]) == 0
+    # A sale withdrawn (relisted) leaves every row it fed
+    series.apply([sale], [{**sale, 'sold_date': None}])
+
+    after = _rows(series)
+    for key in [('Wortley', 'house', MAY), ('Wortley', None, MAY), (None, 'house', MAY), (None, None, MAY)]:
+        assert after[key]['sales'] == before[key]['sales'] - 1
+        assert after[key]['sum_price'] == pytest.approx(before[key]['sum_price'] - 600000)
+    assert after[('Byron', 'house', MAY)] == before[('Byron', 'house', MAY)]
+
+def test_market_trends_read_the_series():
+    now = datetime.utcnow()
+    get_database().properties.insert_many([
+        _sale('Wortley', 'house', 600000 + days * 1000, now - timedelta(days=days))
+        for days in (3, 40, 75, 400)
+    ])
+
+    trends = AnalyticsService().get_market_trends('london', '6m')
+
+    history = trends['historical_data']
+    assert sum(r['total_sales'] for r in history) == 3
+    assert [r['date'] for r in history] == sorted(r['date'] for r in history)
+
+def test_added_sale_updates_a_built_city(series, sales):
+    series.rebuild('london')
+    PropertyService().add_property(
+        {**_sale('Wortley', 'house', 900000, datetime(2024, 5, 25)), 'address': '1 New Sale Rd'}
+    )
+
+    [wortley] = series.monthly('london', MAY, neighborhoods=['Wortley'])
+    assert wortley['sales'] == 3
+    assert wortley['sum_price'] == 1900000
+
+def test_rebuild_replaces_rows_in_place(series, sales):
+    series.rebuild('london')
+    series.collection.insert_one(
+        {'city': 'london', 'neighborhood': 'Gone', 'property_type': None, 'month': MARCH,
+         'sales': 1, 'updated_at': datetime(2024, 1, 1)}
+    )
+
+    assert series.rebuild('london') == MarketSeries().rebuild('london')
+
+    rows = list(series.collection.find({'city': 'london', 'month': {'$exists': True}}))
+    keys = [(r['neighborhood'], r['property_type'], r['month']) for r in rows]
+    assert len(keys) == len(set(keys))
+    assert ('Gone', None, MARCH) not in keys
+
+def test_rebuild_is_skipped_while_another_holds_the_lease(series, sales):
+    other = MarketSeries()
+    assert other._acquire_lease('london')
+
+    assert series.rebuild('london') is None
+    series.ensure_built('london')
+    assert 'london' not in series._built
+    assert _rows(series) == {}
+
+    get_database().sync_state.delete_one({'_id': series._lease_id('london')})
+    series.ensure_built('london')
+    assert 'london' in series._built
+    assert _rows(series)
+
+def test_unassigned_neighborhood_has_no_series(series, sales):
+    get_database().properties.insert_one(_sale(None, 'house', 2000000, datetime(2024, 5, 12)))
+    series.rebuild('london')
+
+    assert series.monthly('london', MAY, neighborhoods=[None]) == []
+    assert [r['neighborhood'] for r in series.monthly('london', MAY, neighborhoods=['Byron', None])] == ['Byron']
+    # The sale still counts city-wide
+    [may] = series.monthly('london', MAY, datetime(2024, 6, 1))
+    assert may['sales'] == 4
+
+    trends = AnalyticsService()._get_neighborhood_price_trends('london', ['Wortley', None])
+    assert None not in trends
+
+def test_rebuild_invalidates_cached_responses(series, sales):
+    before = series.data_version.current()
+
+    series.rebuild('london')
+
+    assert series.data_version.current() == before + 1
@@ -0,0 +1,68 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from models.batching import MicroBatcher
+from models.valuation import ValuationModel, FEATURES
+
+def _concurrently(fn, n):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def call(i):
+        barrier.wait()
+        results[i] = fn(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_rows_share_batches():
+    sizes = []
+
+    def predict_batch(X):
+        sizes.append(len(X))
+        return X[:, 0] * 10
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=50)
+    results = _concurrently(lambda i: batcher.predict(np.array([i, 0.0])), 20)
+
+    assert results == [i * 10 for i in range(20)]
+    assert max(sizes) <= 8
+    assert len(sizes) < 20
+    assert batcher.stats()['rows'] == 20
+
+def test_batch_errors_reach_every_caller():
+    def predict_batch(X):
+        raise ValueError('bad input')
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=20)
+    futures = [batcher.submit(np.array([float(i)])) for i in range(3)]
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+
+def test_batch_size_one_predicts_inline():
+    batcher = MicroBatcher(lambda X: X.sum(axis=1), max_batch_size=1)
+
+    assert batcher.predict(np.array([1.0, 2.0])) == 3.0
+    assert batcher._worker is None
+
+def test_valuation_model_batched_predict_matches_direct(tmp_path):
+    model = ValuationModel(model_dir=str(tmp_path))
+    properties = [
+        {'city': 'toronto', 'square_feet': 1500 + i * 100, 'bedrooms': 3, 'bathrooms': 2,
+         'year_built': 1990, 'lot_size': 4000}
+        for i in range(12)
+    ]
+    direct = model.model.predict(model.scaler.transform(
+        pd.DataFrame([model.feature_row(p) for p in properties], columns=FEATURES)
+    ))
+
+    results = _concurrently(lambda i: model.predict(properties[i]), len(properties))
+
+    assert [r['estimated_value'] for r in results] == pytest.approx(direct, abs=0.01)
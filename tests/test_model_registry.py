@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from models.registry import ModelRegistry, LazyModel
+from models.backends import create_model
+from services.valuation_service import ValuationService, FEATURE_NAMES
+from config import Config
+
+FEATURES = ['square_feet', 'bedrooms']
+
+def _fit(slope):
+    X = np.random.RandomState(0).rand(10, 2)
+    return LinearRegression().fit(X, X[:, 0] * slope)
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path), 'valuation')
+
+def test_publish_and_load(registry):
+    version = registry.publish(_fit(2), FEATURES, {'training_rows': 10})
+    
+    model, manifest = registry.load()
+    
+    assert registry.latest_version() == version
+    assert registry.versions() == [version]
+    assert manifest['feature_schema'] == FEATURES
+    assert manifest['training_rows'] == 10
+    assert model.predict([[4.0, 5.0]])[0] == pytest.approx(8.0)
+
+def test_load_rejects_feature_schema_mismatch(registry):
+    registry.publish(_fit(2), FEATURES)
+    
+    with pytest.raises(ValueError):
+        registry.load(feature_schema=['square_feet'])
+
+def test_lazy_model_hot_swaps_new_version(registry):
+    registry.publish(_fit(2), FEATURES)
+    lazy = LazyModel(registry, FEATURES, reload_interval=0)
+    
+    assert lazy.get().predict([[1.0, 0.0]])[0] == pytest.approx(2.0)
+    
+    new_version = registry.publish(_fit(3), FEATURES)
+    
+    assert lazy.get().predict([[1.0, 0.0]])[0] == pytest.approx(3.0)
+    assert lazy.version == new_version
+
+def test_lazy_model_uses_fallback_when_empty(registry):
+    calls = []
+    lazy = LazyModel(registry, FEATURES, fallback=lambda: calls.append(1) or 'fallback')
+    
+    assert lazy.get() == 'fallback'
+    assert lazy.get() == 'fallback'
+    assert len(calls) == 1
+
+def test_valuation_service_loads_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_REGISTRY_DIR', str(tmp_path))
+    trained = []
+    monkeypatch.setattr(
+        ValuationService, '_train_model',
+        lambda self: trained.append(1) or _fit_valuation()
+    )
+    
+    service = ValuationService()
+    assert trained == []
+    
+    version = service.train_and_publish()
+    assert service.model_version == version
+    assert len(trained) == 1
+
+def _fit_valuation():
+    X = np.random.RandomState(0).rand(20, len(FEATURE_NAMES))
+    return LinearRegression().fit(X, X.sum(axis=1))
+
+def test_valuation_backend_is_selected_by_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_REGISTRY_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'VALUATION_MODEL_BACKEND', 'hist_gb')
+    service = ValuationService()
+    
+    version = service.train_and_publish()
+    manifest = service.registry.manifest(version)
+    
+    assert manifest['backend'] == 'hist_gb'
+    assert manifest['model_class'].endswith('HistGradientBoostingRegressor')
+    assert service.model.predict([[2000, 3, 2, 5000, 1990]])[0] > 0
+
+def test_unknown_valuation_backend_is_rejected():
+    with pytest.raises(ValueError, match='Unknown valuation model backend'):
+        create_model('xgboost')
@@ -1,5 +1,7 @@
+import gzip
+import json
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from services.property_service import PropertyService
 from database.mongodb import get_database
 
@@ -79,4 +81,114 @@ def test_add_property_missing_fields(property_service):
     with pytest.raises(ValueError) as exc_info:
         property_service.add_property(invalid_property)
     
-    assert 'Missing required field' in str(exc_info.value)
\ No newline at end of file
+    assert 'Missing required field' in str(exc_info.value)
+
+@pytest.fixture
+def listing_pages():
+    db = get_database()
+    now = datetime.utcnow()
+    listings = [
+        {
+            'address': f'{i} Page St',
+            'city': 'kingston',
+            'price': 500000 + (i // 2) * 10000,  # pairs share a price
+            'property_type': 'house' if i % 3 else 'condo',
+            'square_feet': 1500,
+            'listed_date': now - timedelta(days=i % 7)
+        }
+        for i in range(25)
+    ]
+    db.properties.insert_many(listings)
+    
+    yield listings
+    
+    # Cleanup
+    db.properties.delete_many({'city': 'kingston'})
+
+def _collect_pages(property_service, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        page = property_service.search_properties_page('kingston', cursor=cursor, **kwargs)
+        pages.append(page['properties'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+def test_search_properties_page_walks_all_results(property_service, listing_pages):
+    pages = _collect_pages(property_service, limit=4)
+    results = [p for page in pages for p in page]
+    
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+    assert len({p['id'] for p in results}) == 25
+    assert [p['price'] for p in results] == sorted(p['price'] for p in listing_pages)
+
+def test_search_properties_page_by_listed_date(property_service, listing_pages):
+    pages = _collect_pages(property_service, limit=5, sort='listed_date', property_type='house')
+    results = [p for page in pages for p in page]
+    
+    houses = [p for p in listing_pages if p['property_type'] == 'house']
+    assert len({p['id'] for p in results}) == len(houses)
+    dates = [p['listed_date'] for p in results]
+    assert dates == sorted(dates, reverse=True)
+
+def test_search_properties_page_projection(property_service, listing_pages):
+    page = property_service.search_properties_page('kingston', limit=3, fields=['address'])
+    
+    assert page['next_cursor'] is not None
+    assert set(page['properties'][0]) == {'id', 'address'}
+    
+    page = property_service.search_properties_page(
+        'kingston', limit=3, fields=['address'], cursor=page['next_cursor']
+    )
+    assert len(page['properties']) == 3
+
+def test_search_properties_page_rejects_foreign_cursor(property_service, listing_pages):
+    page = property_service.search_properties_page('kingston', limit=3)
+    
+    with pytest.raises(ValueError):
+        property_service.search_properties_page(
+            'kingston', property_type='condo', limit=3, cursor=page['next_cursor']
+        )
+    with pytest.raises(ValueError):
+        property_service.search_properties_page('kingston', cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        property_service.search_properties_page('kingston', sort='address')
+
+def test_search_properties_page_missing_sort_values(property_service, listing_pages):
+    get_database().properties.insert_many([
+        {'address': f'{i} Undated St', 'city': 'kingston', 'price': 450000, 'property_type': 'house'}
+        for i in range(4)
+    ])
+    
+    pages = _collect_pages(property_service, limit=3, sort='listed_date')
+    results = [p for page in pages for p in page]
+    
+    assert len({p['id'] for p in results}) == 29
+    dated = [p['listed_date'] for p in results if 'listed_date' in p]
+    assert dated == sorted(dated, reverse=True)
+    assert all('listed_date' not in p for p in results[len(dated):])
+
+def test_search_properties_page_non_positive_limit(property_service, listing_pages):
+    page = property_service.search_properties_page('kingston', limit=0)
+    
+    assert len(page['properties']) == 1
+    assert page['next_cursor'] is not None
+
+def test_export_ndjson_streams_every_property(property_service, listing_pages):
+    chunks = list(property_service.export_ndjson('kingston', chunk_size=256))
+    
+    assert chunks[0] == b''
+    assert len(chunks) > 2
+    lines = b''.join(chunks).splitlines()
+    assert len(lines) == 25
+    assert {json.loads(line)['address'] for line in lines} == {p['address'] for p in listing_pages}
+
+def test_export_ndjson_gzip(property_service, listing_pages):
+    body = b''.join(property_service.export_ndjson(
+        'kingston', property_type='condo', fields=['address', 'price'], compress=True
+    ))
+    
+    records = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+    assert len(records) == sum(p['property_type'] == 'condo' for p in listing_pages)
+    assert set(records[0]) == {'id', 'address', 'price'}
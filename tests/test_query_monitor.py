@@ -0,0 +1,124 @@
+import pytest
+from types import SimpleNamespace
+from database.monitoring import SlowQueryMonitor, summarize_explain
+from database.mongodb import get_database
+from services.property_service import PropertyService
+
+def _started(request_id, command_name='find', collection='properties'):
+    return SimpleNamespace(
+        command_name=command_name,
+        command={command_name: collection, 'filter': {'city': 'toronto'}, 'lsid': {'id': 1}},
+        database_name=get_database().name,
+        connection_id=('localhost', 27017),
+        request_id=request_id
+    )
+
+def _succeeded(request_id, duration_ms, command_name='find'):
+    return SimpleNamespace(
+        command_name=command_name,
+        connection_id=('localhost', 27017),
+        request_id=request_id,
+        duration_micros=int(duration_ms * 1000)
+    )
+
+@pytest.fixture
+def monitor():
+    monitor = SlowQueryMonitor(threshold_ms=50)
+    monitor.bind(get_database())
+    return monitor
+
+def test_only_slow_commands_are_captured(monitor):
+    monitor.started(_started(1))
+    monitor.succeeded(_succeeded(1, 5))
+    monitor.started(_started(2, 'aggregate'))
+    monitor.succeeded(_succeeded(2, 120, 'aggregate'))
+    monitor.flush()
+
+    stats = monitor.stats()
+    assert stats['commands'] == 2
+    assert stats['slow'] == 1
+    assert stats['captured'] == 1
+
+    [record] = monitor.recent()
+    assert record['command'] == 'aggregate'
+    assert record['collection'] == 'properties'
+    assert record['duration_ms'] == 120
+    assert 'plan' in record
+
+def test_own_commands_are_not_monitored(monitor):
+    monitor.started(_started(1, 'insert', 'slow_queries'))
+    monitor.succeeded(_succeeded(1, 500, 'insert'))
+    monitor.started(_started(2, 'explain'))
+    monitor.succeeded(_succeeded(2, 500, 'explain'))
+
+    assert monitor.stats()['commands'] == 0
+
+def test_failed_commands_are_recorded_without_explain(monitor):
+    monitor.started(_started(1))
+    monitor.failed(SimpleNamespace(
+        command_name='find',
+        connection_id=('localhost', 27017),
+        request_id=1,
+        duration_micros=80000,
+        failure={'errmsg': 'operation exceeded time limit'}
+    ))
+    monitor.flush()
+
+    [record] = monitor.recent()
+    assert 'exceeded time limit' in record['failure']
+    assert 'plan' not in record
+
+def test_origin_is_the_calling_service_method(monitor):
+    class ObservedCollection:
+        def __init__(self, collection):
+            self._collection = collection
+
+        def find(self, *args, **kwargs):
+            monitor.started(_started(7))
+            monitor.succeeded(_succeeded(7, 75))
+            return self._collection.find(*args, **kwargs)
+
+    service = PropertyService()
+    service.properties_collection = ObservedCollection(service.properties_collection)
+    service.search_properties('toronto')
+    monitor.flush()
+
+    [record] = monitor.recent()
+    assert record['origin'] == 'PropertyService.search_properties_page'
+
+def test_summarize_find_explain():
+    plan = {
+        'queryPlanner': {
+            'winningPlan': {
+                'stage': 'FETCH',
+                'inputStage': {'stage': 'IXSCAN', 'indexName': 'city_1_sold_date_-1'}
+            }
+        },
+        'executionStats': {'nReturned': 40, 'totalDocsExamined': 40, 'totalKeysExamined': 41}
+    }
+
+    summary = summarize_explain(plan)
+
+    assert summary['docs_examined'] == 40
+    assert summary['n_returned'] == 40
+    assert summary['examined_per_returned'] == 1.0
+    assert summary['indexes'] == ['city_1_sold_date_-1']
+    assert summary['collscan'] is False
+
+def test_summarize_aggregate_explain():
+    plan = {
+        'stages': [
+            {
+                '$cursor': {
+                    'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN'}},
+                    'executionStats': {'nReturned': 10, 'totalDocsExamined': 5000, 'totalKeysExamined': 0}
+                }
+            },
+            {'$group': {'_id': '$neighborhood'}}
+        ]
+    }
+
+    summary = summarize_explain(plan)
+
+    assert summary['collscan'] is True
+    assert summary['examined_per_returned'] == 500.0
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from services.response_cache import (
+    ResponseCache,
+    MemoryCacheBackend,
+    MongoCacheBackend,
+    DataVersion
+)
+from services.property_service import PropertyService
+
+@pytest.fixture(params=[MemoryCacheBackend, MongoCacheBackend])
+def cache(request):
+    return ResponseCache(request.param(max_entries=2), ttls={'short': 60}, default_ttl=300)
+
+def test_hit_after_miss(cache):
+    calls = []
+    compute = lambda: calls.append(1) or {'avg_price': np.float64(1.5)}
+    
+    first = cache.get_or_compute('trends', {'city': 'toronto'}, compute)
+    second = cache.get_or_compute('trends', {'city': 'toronto'}, compute)
+    
+    assert len(calls) == 1
+    assert first == second == {'avg_price': 1.5}
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['endpoints']['trends'] == {'hits': 1, 'misses': 1}
+
+def test_key_normalization(cache):
+    key1 = cache.make_key('trends', {'period': '1y', 'city': 'toronto', 'neighborhood': None}, 0)
+    key2 = cache.make_key('trends', {'city': ' toronto', 'period': '1y'}, 0)
+    
+    assert key1 == key2
+    assert key1 != cache.make_key('trends', {'city': 'toronto', 'period': '1y'}, 1)
+    assert key1 != cache.make_key('other', {'city': 'toronto', 'period': '1y'}, 0)
+
+def test_bounded_size(cache):
+    for city in ['toronto', 'vancouver', 'ottawa']:
+        cache.get_or_compute('trends', {'city': city}, lambda: [city])
+    
+    assert len(cache.backend) == 2
+
+def test_data_version_invalidates(cache):
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    
+    assert cache.get_or_compute('trends', {'city': 'toronto'}, compute) == 1
+    cache.invalidate()
+    assert cache.get_or_compute('trends', {'city': 'toronto'}, compute) == 2
+
+def test_memory_backend_ttl(monkeypatch):
+    backend = MemoryCacheBackend()
+    clock = [1000.0]
+    monkeypatch.setattr('memory_cache.time.monotonic', lambda: clock[0])
+    
+    backend.set('key', 'value', ttl=60)
+    assert backend.get('key') == 'value'
+    clock[0] += 61
+    assert backend.get('key') is None
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')
+    backend.set('c', 3, ttl=60)
+    
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+
+def test_add_property_bumps_data_version():
+    data_version = DataVersion()
+    before = data_version.current()
+    
+    PropertyService().add_property({
+        'address': '1 Cache St',
+        'city': 'Toronto',
+        'price': 700000,
+        'property_type': 'condo'
+    })
+    
+    assert data_version.current() == before + 1
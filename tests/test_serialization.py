@@ -0,0 +1,44 @@
+import json
+from datetime import datetime
+import numpy as np
+from bson import ObjectId
+from flask import Flask
+from services import serialization
+from services.serialization import FastJSONProvider
+
+def test_dumps_handles_service_types():
+    object_id = ObjectId()
+    value = {
+        'avg_price': np.float64(812500.5),
+        'count': np.int64(42),
+        'prices': np.array([1.5, 2.5]),
+        'listed_date': datetime(2024, 3, 1, 9, 30),
+        'id': object_id,
+        2024: 'year key'
+    }
+
+    decoded = json.loads(serialization.dumps(value))
+
+    assert decoded == {
+        'avg_price': 812500.5,
+        'count': 42,
+        'prices': [1.5, 2.5],
+        'listed_date': '2024-03-01T09:30:00',
+        'id': str(object_id),
+        '2024': 'year key'
+    }
+
+def test_loads_round_trip():
+    value = {'city': 'toronto', 'prices': [1, 2.5], 'nested': {'ok': True}}
+    assert serialization.loads(serialization.dumps(value)) == value
+    assert serialization.loads(serialization.dumps(value).decode()) == value
+
+def test_provider_jsonify():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    with app.app_context():
+        response = app.json.response({'b': np.float32(0.5), 'a': datetime(2024, 1, 2)})
+
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'{"a":"2024-01-02T00:00:00","b":0.5}\n'
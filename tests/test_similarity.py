@@ -0,0 +1,45 @@
+import pytest
+import numpy as np
+from services.similarity import similarity_scores, confidence_scores
+from benchmarks.bench_similarity import reference_similarity, reference_confidence, random_features
+
+def test_similarity_matches_per_pair():
+    rng = np.random.default_rng(1)
+    subject = random_features(rng, ())
+    comparables = random_features(rng, (20,))
+    
+    scores = similarity_scores(subject, comparables)
+    
+    expected = [reference_similarity(subject.tolist(), c) for c in comparables.tolist()]
+    assert scores == pytest.approx(expected, abs=0.01)
+
+def test_similarity_identical():
+    features = np.array([2000, 3, 2, 5000, 1990], dtype=float)
+    
+    assert similarity_scores(features, features) == 100.0
+
+def test_batch_similarity_broadcasts():
+    rng = np.random.default_rng(2)
+    subjects = random_features(rng, (4,))
+    comparables = random_features(rng, (4, 3))
+    
+    scores = similarity_scores(subjects[:, np.newaxis, :], comparables)
+    
+    assert scores.shape == (4, 3)
+    for i in range(4):
+        assert scores[i] == pytest.approx(similarity_scores(subjects[i], comparables[i]))
+
+def test_confidence_matches_per_row():
+    prices = np.array([[1000000, 1050000, 975000], [800000, 900000, 0]])
+    similarities = np.array([[90, 85, 80], [70, 60, 0]])
+    mask = np.array([[True, True, True], [True, True, False]])
+    
+    scores = confidence_scores(prices, similarities, mask)
+    
+    assert scores[0] == pytest.approx(reference_confidence([1000000, 1050000, 975000], [90, 85, 80]))
+    assert scores[1] == pytest.approx(reference_confidence([800000, 900000], [70, 60]))
+
+def test_confidence_without_comparables():
+    scores = confidence_scores(np.zeros((2, 3)), np.zeros((2, 3)), np.zeros((2, 3), dtype=bool))
+    
+    assert scores.tolist() == [70.0, 70.0]
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from services.training_data import TrainingDataLoader
+from services.valuation_service import ValuationService, FEATURE_DEFAULTS
+from database.mongodb import get_database
+
+@pytest.fixture
+def sales():
+    db = get_database()
+    now = datetime.utcnow()
+    docs = [
+        {
+            'address': f'{i} Loader Ln',
+            'city': 'toronto',
+            'price': 500000 + i * 1000,
+            'square_feet': 1000 + i,
+            'bedrooms': 3,
+            'bathrooms': 2,
+            'lot_size': 4000,
+            'year_built': 1990,
+            'listed_date': now - timedelta(days=i + 30),
+            'sold_date': now - timedelta(days=i)
+        }
+        for i in range(50)
+    ]
+    docs.append({'address': 'No Price Ln', 'city': 'toronto', 'square_feet': 900, 'sold_date': now})
+    docs.append({'address': 'Active Ln', 'city': 'toronto', 'price': 700000, 'square_feet': 1500})
+    db.properties.insert_many(docs)
+    yield docs
+    db.properties.delete_many({'address': {'$in': [d['address'] for d in docs]}})
+
+def _loader(**kwargs):
+    return TrainingDataLoader(get_database().properties, FEATURE_DEFAULTS, **kwargs)
+
+def test_load_streams_sales_into_arrays(sales):
+    X, y, stats = _loader(batch_size=7).load()
+    
+    assert X.shape == (50, len(FEATURE_DEFAULTS))
+    assert sorted(y) == [500000 + i * 1000 for i in range(50)]
+    assert stats['rows'] == 50
+    assert stats['scanned'] == 51
+    assert stats['skipped'] == 1
+    assert stats['sampled'] is False
+    
+    # Rows match the columns the model is served with
+    service = ValuationService()
+    expected = {tuple(service._prepare_features(d)) for d in sales[:50]}
+    assert {tuple(row) for row in X.tolist()} == expected
+
+def test_missing_fields_use_feature_defaults(sales):
+    get_database().properties.insert_one(
+        {'address': 'Sparse Ln', 'price': 400000, 'square_feet': None, 'sold_date': datetime.utcnow()}
+    )
+    try:
+        X, y, _ = _loader().load(window_days=1)
+    finally:
+        get_database().properties.delete_one({'address': 'Sparse Ln'})
+    
+    row = X[list(y).index(400000)]
+    assert list(row) == [0, 0, 0, 0, 2000]
+
+def test_max_rows_samples_uniformly(sales):
+    X, y, stats = _loader(batch_size=8).load(max_rows=10)
+    
+    assert len(y) == 10 == len(set(y))
+    assert set(y) <= {d['price'] for d in sales if 'price' in d}
+    assert stats['sampled'] is True
+    # Not just the first rows of the cursor
+    assert max(y) > 500000 + 10 * 1000
+
+def test_window_days_limits_sales(sales):
+    _, y, stats = _loader().load(window_days=10)
+    
+    assert stats['rows'] == 10
+    assert stats['window_days'] == 10
+
+def test_trace_memory_reports_peak(sales):
+    _, _, stats = _loader().load(trace_memory=True)
+    
+    assert stats['peak_mb'] > 0
+    assert stats['peak_mb'] >= stats['array_mb']
+
+def test_train_model_records_training_stats(sales, tmp_path, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'MODEL_REGISTRY_DIR', str(tmp_path))
+    service = ValuationService()
+    
+    version = service.train_and_publish(max_rows=20)
+    manifest = service.registry.manifest(version)
+    
+    assert manifest['training_rows'] == 20
+    assert manifest['synthetic'] is False
+    assert manifest['training_data']['sampled'] is True
+    assert np.isfinite(service.model.predict([[1500, 3, 2, 4000, 1990]])[0])
@@ -0,0 +1,199 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from services.treb_service import TREBService
+from services.treb_ingestion import TREBIngestionService
+from database.mongodb import get_database
+
+TOTAL_LISTINGS = 95
+FEED_START = datetime(2024, 3, 1, 12, 0)
+
+def _listing(i, **changes):
+    return {
+        'id': 1000 + i,
+        'modified_at': (FEED_START + timedelta(minutes=i)).isoformat(),
+        'address': f'{i} Feed Ave',
+        'city': 'Toronto',
+        'price': 600000 + i * 1000,
+        'property_type': 'house' if i % 2 else 'condo',
+        'bedrooms': 3,
+        'bathrooms': 2,
+        'square_feet': 1800,
+        'latitude': 43.65,
+        'longitude': -79.38,
+        **changes
+    }
+
+class _StubTREB(BaseHTTPRequestHandler):
+    """Serves TOTAL_LISTINGS listings; the first request for page 3 fails once"""
+    listings = [_listing(i) for i in range(TOTAL_LISTINGS)]
+    failed_once = set()
+    requests_seen = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        page = int(params['page'][0])
+        page_size = int(params['page_size'][0])
+        listings = self.listings
+        if 'modified_since' in params:
+            since = params['modified_since'][0]
+            listings = [l for l in listings if l['modified_at'] >= since]
+
+        with self.lock:
+            self.requests_seen.append(params)
+            if page == 3 and page not in self.failed_once:
+                self.failed_once.add(page)
+                self.send_response(503)
+                self.end_headers()
+                return
+
+        start = (page - 1) * page_size
+        body = json.dumps({
+            'listings': listings[start:start + page_size],
+            'total_pages': max(1, -(-len(listings) // page_size))
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def treb_server():
+    _StubTREB.failed_once = set()
+    _StubTREB.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubTREB)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def ingestion_service(treb_server):
+    return TREBIngestionService(
+        treb_service=TREBService(base_url=treb_server, pool_size=4),
+        workers=4,
+        page_size=10,
+        batch_size=25
+    )
+
+def test_ingest_upserts_every_listing(ingestion_service):
+    stats = ingestion_service.ingest('toronto')
+
+    assert stats['pages'] == 10
+    assert stats['failed_pages'] == []  # page 3 succeeded on retry
+    assert stats['fetched'] == TOTAL_LISTINGS
+    assert stats['upserted'] == TOTAL_LISTINGS
+    assert stats['listings_per_second'] > 0
+
+    db = get_database()
+    assert db.properties.count_documents({'city': 'toronto'}) == TOTAL_LISTINGS
+    doc = db.properties.find_one({'listing_id': '1005'})
+    assert doc['price'] == 605000.0
+    assert doc['location']['coordinates'] == [-79.38, 43.65]
+    assert 'listed_date' in doc
+
+def test_reingest_updates_in_place(ingestion_service):
+    ingestion_service.ingest('toronto')
+    db = get_database()
+    first_seen = db.properties.find_one({'listing_id': '1000'})['listed_date']
+
+    _StubTREB.listings[0] = dict(_listing(0), price=123000)
+    try:
+        stats = ingestion_service.ingest('toronto')
+    finally:
+        _StubTREB.listings[0] = _listing(0)
+
+    assert stats['upserted'] == 0
+    assert stats['modified'] == 1
+    assert db.properties.count_documents({'city': 'toronto'}) == TOTAL_LISTINGS
+    doc = db.properties.find_one({'listing_id': '1000'})
+    assert doc['price'] == 123000.0
+    assert doc['listed_date'] == first_seen
+
+def test_ingest_rejects_malformed_listings(treb_server):
+    _StubTREB.listings.append({'id': 'bad', 'address': 'No Price Rd', 'city': 'toronto'})
+    try:
+        service = TREBIngestionService(
+            treb_service=TREBService(base_url=treb_server),
+            page_size=50
+        )
+        stats = service.ingest('toronto')
+    finally:
+        _StubTREB.listings.pop()
+
+    assert stats['fetched'] == TOTAL_LISTINGS + 1
+    assert stats['rejected'] == 1
+    assert stats['upserted'] == TOTAL_LISTINGS
+
+def test_sync_applies_only_changes_since_watermark(ingestion_service):
+    first = ingestion_service.sync('toronto')
+    assert first['mode'] == 'full'
+    ingestion_service.market_series.rebuild('toronto')
+    assert ingestion_service.get_watermark('toronto') == FEED_START + timedelta(minutes=TOTAL_LISTINGS - 1)
+
+    # One price change, one sale and one new listing arrive after the watermark
+    later = (FEED_START + timedelta(days=1)).isoformat()
+    originals = _StubTREB.listings[:]
+    _StubTREB.listings[10] = _listing(10, price=700000, modified_at=later)
+    _StubTREB.listings[20] = _listing(
+        20, status='sold', sold_date='2024-03-02T09:30:00Z', sold_price=640000, modified_at=later
+    )
+    _StubTREB.listings.append(_listing(TOTAL_LISTINGS, modified_at=later))
+    _StubTREB.requests_seen = []
+    try:
+        stats = ingestion_service.sync('toronto')
+    finally:
+        _StubTREB.listings[:] = originals
+
+    assert stats['mode'] == 'delta'
+    assert all('modified_since' in params for params in _StubTREB.requests_seen)
+    # The overlap re-fetches the last few minutes of the previous sync
+    assert 3 <= stats['fetched'] < 10
+    assert stats['upserted'] == 1
+    assert stats['modified'] == 2
+    assert stats['sold'] == 1
+    assert stats['watermark'] == FEED_START + timedelta(days=1)
+
+    db = get_database()
+    assert db.properties.count_documents({'city': 'toronto'}) == TOTAL_LISTINGS + 1
+    assert db.properties.find_one({'listing_id': '1010'})['price'] == 700000.0
+    sold = db.properties.find_one({'listing_id': '1020'})
+    assert sold['status'] == 'sold'
+    assert sold['price'] == 640000.0
+    assert sold['sold_date'] == datetime(2024, 3, 2, 9, 30)
+    march = ingestion_service.market_series.monthly('toronto', datetime(2024, 3, 1), datetime(2024, 3, 31))
+    assert [(r['sales'], r['sum_price']) for r in march] == [(1, 640000.0)]
+
+    history = ingestion_service.sync_history('toronto')
+    assert [entry['mode'] for entry in history] == ['delta', 'full']
+    assert history[0]['upserted'] == 1
+
+def test_sync_keeps_watermark_when_a_page_fails(ingestion_service):
+    ingestion_service.sync('toronto')
+    watermark = ingestion_service.get_watermark('toronto')
+
+    ingestion_service.treb_service.session.mount('http://', _failing_adapter())
+    stats = ingestion_service.sync('toronto')
+
+    assert stats['failed_pages'] == [1]
+    assert ingestion_service.get_watermark('toronto') == watermark
+
+def _failing_adapter():
+    from requests.adapters import HTTPAdapter
+
+    class FailingAdapter(HTTPAdapter):
+        def send(self, *args, **kwargs):
+            raise ConnectionError('feed unavailable')
+
+    return FailingAdapter()
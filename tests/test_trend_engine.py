@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from services.trend_engine import TrendEngine
+from database.mongodb import get_database
+
+NOW = datetime(2024, 1, 20)
+
+@pytest.fixture
+def trend_engine():
+    return TrendEngine()
+
+@pytest.fixture
+def sample_sales():
+    db = get_database()
+    sales = [
+        # (days before NOW, price, square feet, days on market)
+        (5, 1000000, 2000, 10),
+        (20, 900000, 1800, 20),
+        (45, 800000, 1600, 30),
+        (80, 700000, 1400, 40),
+        (200, 600000, 1200, 50)
+    ]
+    properties = [
+        {
+            'address': f'{i} Trend St',
+            'city': 'toronto',
+            'price': price,
+            'square_feet': sqft,
+            'listed_date': NOW - timedelta(days=days + dom),
+            'sold_date': NOW - timedelta(days=days)
+        }
+        for i, (days, price, sqft, dom) in enumerate(sales)
+    ]
+    db.properties.insert_many(properties)
+    yield properties
+    db.properties.delete_many({'address': {'$regex': 'Trend St$'}})
+
+def test_windows_in_single_aggregation(trend_engine, sample_sales, monkeypatch):
+    calls = []
+    aggregate = trend_engine.properties_collection.aggregate
+    
+    def counting_aggregate(pipeline):
+        calls.append(pipeline)
+        return aggregate(pipeline)
+    
+    monkeypatch.setattr(trend_engine.properties_collection, 'aggregate', counting_aggregate)
+    
+    trends = trend_engine.get_trends(
+        'toronto',
+        windows={'monthly': 30, 'quarterly': 90, 'yearly': 365},
+        monthly_days=90,
+        now=NOW
+    )
+    
+    assert len(calls) == 1
+    assert trends['windows']['monthly']['avg_price'] == 950000
+    assert trends['windows']['monthly']['total'] == 2
+    assert trends['windows']['quarterly']['total'] == 4
+    assert trends['windows']['yearly']['avg_price'] == 800000
+    assert trends['windows']['quarterly']['avg_price_per_sqft'] == pytest.approx(500)
+    assert trends['windows']['monthly']['avg_days_on_market'] == pytest.approx(15)
+
+def test_monthly_buckets_sorted_across_year_boundary(trend_engine, sample_sales):
+    trends = trend_engine.get_trends('toronto', windows={}, monthly_days=90, now=NOW)
+    
+    assert [(b['year'], b['month']) for b in trends['monthly']] == [
+        (2023, 11), (2023, 12), (2024, 1)
+    ]
+    assert trend_engine.price_change(trends['monthly']) == pytest.approx(
+        (1000000 - 700000) / 700000 * 100
+    )
+
+def test_empty_window(trend_engine):
+    trends = trend_engine.get_trends('toronto', windows={'monthly': 30}, now=NOW)
+    
+    assert trends['windows']['monthly']['total'] == 0
+    assert trends['windows']['monthly']['avg_price'] is None
+    assert trend_engine.price_change(trends['monthly']) == 0.0
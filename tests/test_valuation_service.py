@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from services.valuation_service import ValuationService
 from database.mongodb import get_database
+from benchmarks.common import QueryCounter, CountingCollection
 
 @pytest.fixture
 def valuation_service():
@@ -138,4 +139,72 @@ def test_calculate_confidence_score(valuation_service):
     
     # Test with no comparables
     base_score = valuation_service._calculate_confidence_score(1000000, [])
-    assert base_score == 70.0
\ No newline at end of file
+    assert base_score == 70.0
+
+def test_get_valuations_matches_single(valuation_service, sample_properties):
+    batch = [
+        {'city': 'toronto', 'property_type': 'house', 'square_feet': 2000,
+         'bedrooms': 3, 'bathrooms': 2, 'lot_size': 5000, 'year_built': 1990},
+        {'city': 'toronto', 'property_type': 'house', 'square_feet': 1500,
+         'bedrooms': 2, 'bathrooms': 1, 'lot_size': 3000, 'year_built': 1980},
+        {'city': 'ottawa', 'property_type': 'condo', 'square_feet': 900}
+    ]
+    
+    valuations = valuation_service.get_valuations(batch)
+    
+    assert len(valuations) == 3
+    for property_data, valuation in zip(batch, valuations):
+        single = valuation_service.get_valuation(property_data)
+        assert valuation['estimated_value'] == pytest.approx(single['estimated_value'])
+        assert valuation['comparables'] == single['comparables']
+        assert valuation['confidence_score'] == single['confidence_score']
+        assert valuation['market_trends'] == single['market_trends']
+    assert valuations[2]['comparables'] == []
+
+def test_get_valuations_bounded_queries(valuation_service, sample_properties):
+    valuation_service.model  # train outside the counted section
+    counter = QueryCounter()
+    valuation_service.properties_collection = CountingCollection(
+        valuation_service.properties_collection, counter
+    )
+    valuation_service.trend_engine.properties_collection = CountingCollection(
+        valuation_service.trend_engine.properties_collection, counter
+    )
+    valuation_service.comparables_index.properties_collection = CountingCollection(
+        valuation_service.comparables_index.properties_collection, counter
+    )
+    
+    batch = [
+        {'city': 'toronto', 'property_type': 'house', 'square_feet': 1000 + i * 10}
+        for i in range(50)
+    ]
+    valuations = valuation_service.get_valuations(batch)
+    
+    assert len(valuations) == 50
+    # One comparables index load plus one market trends aggregation for the single city
+    assert counter.total == 2
+
+def test_get_valuations_empty(valuation_service):
+    assert valuation_service.get_valuations([]) == []
+
+def test_valuation_ignores_sales_without_square_feet(valuation_service, sample_properties):
+    get_database().properties.insert_one({
+        'address': '333 No Area Rd',
+        'city': 'toronto',
+        'price': 900000,
+        'property_type': 'house',
+        'bedrooms': 3,
+        'sold_date': datetime.utcnow() - timedelta(days=5)
+    })
+    property_data = {
+        'city': 'toronto', 'property_type': 'house', 'square_feet': 2000,
+        'bedrooms': 3, 'bathrooms': 2, 'lot_size': 5000, 'year_built': 1990
+    }
+    try:
+        single = valuation_service.get_valuation(property_data)
+        [batch] = valuation_service.get_valuations([property_data])
+    finally:
+        get_database().properties.delete_one({'address': '333 No Area Rd'})
+    
+    for valuation in (single, batch):
+        assert '333 No Area Rd' not in [c['address'] for c in valuation['comparables']]